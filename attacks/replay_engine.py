@@ -0,0 +1,253 @@
+"""
+Asyncio Replay Engine
+
+This module replays captured MQTT traffic (see attacks/capture_store.py) on an
+asyncio event loop, either time-scaled or as fast as possible.
+
+Every message has an intended send time on the monotonic clock:
+
+    start + (message timestamp - first timestamp) / speed
+
+The engine always sleeps until the absolute intended time of the next message
+rather than for the gap since the previous one, so sleep overshoot and publish
+cost never accumulate into drift. Messages due within `batch_window` of each
+other are published together, then the loop yields once so the transport can
+write the whole batch.
+
+Given the gmqtt client behind `publish`, the engine also waits after a batch
+while the client's transport holds more than `max_buffered` bytes the socket
+has not taken, so a fast replay against a slow broker does not pile up in
+memory. The clock stops once the buffer has drained, so the reported rate
+counts messages written to the socket. If the socket takes nothing for
+`DRAIN_TIMEOUT` seconds, the replay stops early and reports the unsent bytes.
+
+After a run the engine reports how far the achieved send times were from the
+intended ones.
+
+Usage:
+    $ python attacks/replay_engine.py captured_data.jsonl --speed 100
+    $ python attacks/replay_engine.py captured_data.jsonl --speed max --topics tank/tank1/volume
+
+Classes:
+    ReplayEngine - Schedules and publishes a stream of captured messages.
+
+Functions:
+    replay_capture - Replays a capture file against an MQTT broker with gmqtt.
+    format_report - Formats a replay report as one line.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from array import array
+
+import numpy as np
+from gmqtt import Client as MQTTClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process_sim.interfaces.write_buffer import (MAX_BUFFERED_BYTES, DRAIN_TIMEOUT, buffered, wait_for_buffer,
+                                                 drain, disconnect)
+
+MIN_SPEED = 0.1
+MAX_SPEED = 1000.0
+
+
+def parse_speed(value):
+    """
+    Parses a speed multiplier; "max" (or None) means as fast as possible.
+
+    Raises:
+        ValueError: If the multiplier is outside MIN_SPEED..MAX_SPEED.
+    """
+    if value is None or value == "max":
+        return None
+    speed = float(value)
+    if not MIN_SPEED <= speed <= MAX_SPEED:
+        raise ValueError(f"Replay speed must be between {MIN_SPEED} and {MAX_SPEED}, or 'max'")
+    return speed
+
+
+class ReplayEngine:
+    """
+    Publishes captured messages on the running event loop.
+
+    The publish callable must not block; gmqtt's `Client.publish`, which only
+    writes to the transport buffer, is the intended target.
+    """
+
+    def __init__(self, publish, speed=1.0, batch_window=0.002, max_batch=500, clock=time.monotonic,
+                 client=None, max_buffered=MAX_BUFFERED_BYTES):
+        """
+        Args:
+            publish (callable): Called as publish(topic, payload) for every message.
+            speed (float or str): Time multiplier (0.1 to 1000), or "max"/None for as fast as possible.
+            batch_window (float): Messages due within this many seconds are sent in one batch.
+            max_batch (int): Maximum messages per batch.
+            clock (callable): Monotonic time source in seconds.
+            client (gmqtt.Client, optional): Client behind `publish`, whose write buffer bounds the replay.
+            max_buffered (int): Unsent bytes the client may hold before the replay waits.
+        """
+        self.publish = publish
+        self.speed = parse_speed(speed)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._clock = clock
+        self.client = client
+        self.max_buffered = max_buffered
+
+    async def run(self, messages):
+        """
+        Replays messages in order.
+
+        Args:
+            messages (iterable): Dicts with "timestamp", "topic" and "payload", in time order.
+
+        Returns:
+            dict: Replay report (see `format_report`).
+        """
+        messages = iter(messages)
+        pending = next(messages, None)
+        if pending is None:
+            return self._report(0, 0, 0.0, 0.0, array('d'))
+
+        base = pending["timestamp"]
+        speed = self.speed
+        start = self._clock()
+        errors = array('d')  # achieved minus intended send time, per message
+        count = batches = 0
+        last_timestamp = base
+
+        while pending is not None:
+            if speed is not None:
+                delay = start + (pending["timestamp"] - base) / speed - self._clock()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            horizon = self._clock() + self.batch_window
+            batch = []
+            while pending is not None and len(batch) < self.max_batch:
+                if speed is not None and start + (pending["timestamp"] - base) / speed > horizon:
+                    break
+                batch.append(pending)
+                pending = next(messages, None)
+
+            sent_at = self._clock()
+            for message in batch:
+                self.publish(message["topic"], message["payload"])
+                if speed is not None:
+                    errors.append(sent_at - (start + (message["timestamp"] - base) / speed))
+            count += len(batch)
+            batches += 1
+            last_timestamp = batch[-1]["timestamp"]
+            await asyncio.sleep(0)  # let the transport write the batch
+            if self.client is not None:
+                await wait_for_buffer(self.client, self.max_buffered, time.monotonic() + DRAIN_TIMEOUT)
+                if buffered(self.client) > self.max_buffered:
+                    break  # the broker stopped reading
+
+        unsent = 0
+        if self.client is not None:
+            unsent = buffered(self.client)
+            if unsent <= self.max_buffered:
+                unsent = await drain(self.client)
+        report = self._report(count, batches, last_timestamp - base, self._clock() - start, errors)
+        report["unsent_bytes"] = unsent
+        return report
+
+    def _report(self, count, batches, captured_duration, actual_duration, errors):
+        report = {
+            "messages": count,
+            "batches": batches,
+            "speed": self.speed,
+            "captured_duration": captured_duration,
+            "intended_duration": captured_duration / self.speed if self.speed else 0.0,
+            "actual_duration": actual_duration,
+            "rate": count / actual_duration if actual_duration > 0 else 0.0,
+            "unsent_bytes": 0,
+            "error_mean_ms": None,
+            "error_p50_ms": None,
+            "error_p99_ms": None,
+            "error_max_ms": None,
+        }
+        if len(errors):
+            abs_errors = np.abs(np.frombuffer(errors, dtype=np.float64)) * 1000.0
+            report["error_mean_ms"] = float(abs_errors.mean())
+            report["error_p50_ms"] = float(np.percentile(abs_errors, 50))
+            report["error_p99_ms"] = float(np.percentile(abs_errors, 99))
+            report["error_max_ms"] = float(abs_errors.max())
+        return report
+
+
+def format_report(report):
+    """
+    Formats a replay report as one line.
+
+    Args:
+        report (dict): Report returned by `ReplayEngine.run`.
+
+    Returns:
+        str: Summary of message count, durations, rate and timing error.
+    """
+    speed = f"{report['speed']:g}x" if report["speed"] else "max"
+    line = (f"{report['messages']} messages in {report['batches']} batches at {speed}: "
+            f"{report['actual_duration']:.2f}s (captured {report['captured_duration']:.2f}s, "
+            f"intended {report['intended_duration']:.2f}s), {report['rate']:.0f} msg/s")
+    if report["error_mean_ms"] is not None:
+        line += (f", timing error mean {report['error_mean_ms']:.2f} ms, p50 {report['error_p50_ms']:.2f} ms, "
+                 f"p99 {report['error_p99_ms']:.2f} ms, max {report['error_max_ms']:.2f} ms")
+    if report.get("unsent_bytes"):
+        line += f", {report['unsent_bytes']} bytes never left the buffer"
+    return line
+
+
+async def replay_capture(input_file="captured_data.jsonl", broker="127.0.0.1", port=1883, speed=1.0,
+                         start=None, end=None, topics=None, client_id="replay_attacker"):
+    """
+    Replays a capture file against an MQTT broker.
+
+    Args:
+        input_file (str): Capture written by `capture_messages` (or a legacy JSON capture).
+        broker (str): IP address of the MQTT broker.
+        port (int): Port number of the MQTT broker.
+        speed (float or str): Time multiplier, or "max" for as fast as possible.
+        start (float, optional): Only replay messages captured at or after this time (epoch seconds).
+        end (float, optional): Only replay messages captured at or before this time (epoch seconds).
+        topics (list, optional): Only replay messages on these topics.
+        client_id (str): Client identifier of the replaying client.
+
+    Returns:
+        dict: Replay report.
+    """
+    from attacks.Replay import open_capture  # Replay.py delegates to this module
+
+    client = MQTTClient(client_id)
+    await client.connect(broker, port)
+    messages = open_capture(input_file, start=start, end=end, topics=topics)
+    try:
+        engine = ReplayEngine(client.publish, speed=speed, client=client)
+        return await engine.run(messages)
+    finally:
+        messages.close()
+        await disconnect(client)
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Replay captured MQTT traffic")
+    parser.add_argument("input_file", nargs="?", default="captured_data.jsonl", help="Capture file")
+    parser.add_argument("--broker", default="127.0.0.1", help="MQTT broker address")
+    parser.add_argument("--port", type=int, default=1883, help="MQTT broker port")
+    parser.add_argument("--speed", type=parse_speed, default="1", help=f"Time multiplier ({MIN_SPEED:g} to {MAX_SPEED:g}) or 'max'")
+    parser.add_argument("--start", type=float, default=None, help="First capture time to replay (epoch seconds)")
+    parser.add_argument("--end", type=float, default=None, help="Last capture time to replay (epoch seconds)")
+    parser.add_argument("--topics", nargs="+", default=None, help="Only replay these topics")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    report = asyncio.run(replay_capture(args.input_file, args.broker, args.port, args.speed,
+                                        args.start, args.end, args.topics))
+    print(f"[REPLAY] {format_report(report)}")
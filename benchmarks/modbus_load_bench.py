@@ -0,0 +1,347 @@
+"""
+Modbus Load Tester
+
+Starts the simulation with its Modbus endpoints (one per PLC plus the SCADA,
+at the ports of the layout) and loads them from many concurrent Modbus TCP
+clients, like HMIs polling a plant. Each client keeps one request in flight and
+issues a mix of single-register reads, block reads, single writes and block
+writes.
+
+Writes only go to a scratch register range that no device or SCADA action is
+mapped to, so the load does not change the plant. Block writes (function 16)
+are left out against the threaded endpoints: the modbus_tcp_server package
+fails to parse them and drops the connection.
+
+The simulation's own tick timing is measured before and during the load, so
+the report shows what polling costs the simulation thread: tick interval
+jitter and step duration, next to the request throughput, latency percentiles
+and errors. With --attach, the clients load an already running simulation
+instead (no tick measurements).
+
+Usage:
+    python benchmarks/modbus_load_bench.py [--layout Process_sim.json] [--clients 20]
+        [--duration 10] [--mix 50,30,15,5] [--block 10] [--modbus-mode threaded]
+        [--interval 0.05] [--attach] [--output modbus_load_bench.json]
+
+Classes:
+    ModbusClient - Minimal asyncio Modbus TCP client (function codes 3, 6 and 16).
+    TickTimer - Records the start time and duration of every simulation step.
+
+Functions:
+    modbus_targets() - Lists the (host, port, unit ID) endpoints of a layout.
+    run_load() - Runs the client load and returns throughput and latency statistics.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from process_sim.layout_parser import load_layout
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from process_sim.simulation_runner import SimulationThread
+
+OPERATIONS = ("read", "read_block", "write", "write_block")
+SCRATCH_START = 50  # registers 50-89: unused by the layout's devices and SCADA actions
+SCRATCH_END = 90
+REQUEST_TIMEOUT = 2.0
+MBAP = struct.Struct(">HHHB")
+
+
+class ModbusError(Exception):
+    """A Modbus exception response."""
+
+
+class ModbusClient:
+    """
+    Minimal asyncio Modbus TCP client with one request in flight.
+    """
+
+    def __init__(self, host, port, unit_id=1):
+        """
+        Args:
+            host (str): Server address.
+            port (int): Server port.
+            unit_id (int): Unit ID sent with every request.
+        """
+        self.host = host
+        self.port = port
+        self.unit_id = unit_id
+        self._transaction = 0
+        self._reader = self._writer = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _request(self, pdu):
+        self._transaction = (self._transaction + 1) & 0xFFFF
+        self._writer.write(MBAP.pack(self._transaction, 0, len(pdu) + 1, self.unit_id) + pdu)
+        header = await self._reader.readexactly(MBAP.size)
+        length = MBAP.unpack(header)[2]
+        response = await self._reader.readexactly(length - 1)
+        if response[0] & 0x80:
+            raise ModbusError(f"exception code {response[1]} for function {pdu[0]}")
+        return response
+
+    async def read_registers(self, address, count=1):
+        """Reads `count` holding registers (function 3)."""
+        response = await self._request(struct.pack(">BHH", 3, address, count))
+        return struct.unpack(f">{count}H", response[2:2 + 2 * count])
+
+    async def write_register(self, address, value):
+        """Writes one holding register (function 6)."""
+        await self._request(struct.pack(">BHH", 6, address, value))
+
+    async def write_registers(self, address, values):
+        """Writes consecutive holding registers (function 16)."""
+        count = len(values)
+        await self._request(struct.pack(f">BHHB{count}H", 16, address, count, 2 * count, *values))
+
+
+class TickTimer:
+    """
+    Wraps a simulation's `step` to record when each tick starts and how long it takes.
+    """
+
+    def __init__(self, sim):
+        """
+        Args:
+            sim (SimulationThread): Simulation whose steps are timed.
+        """
+        self.starts = array('d')
+        self.durations = array('d')
+        self._step = sim.step
+        sim.step = self._timed_step
+
+    def _timed_step(self):
+        start = time.perf_counter()
+        self._step()
+        self.starts.append(start)
+        self.durations.append(time.perf_counter() - start)
+
+    def mark(self):
+        """Returns the number of ticks recorded so far, to split the run into phases."""
+        return len(self.starts)
+
+    def stats(self, interval, begin=0, end=None):
+        """
+        Summarizes the ticks between two marks.
+
+        Args:
+            interval (float): Configured tick interval in seconds.
+
+        Returns:
+            dict: Tick count, interval jitter (|actual - configured| interval) and step duration percentiles in ms.
+        """
+        starts = np.frombuffer(self.starts, dtype=np.float64)[begin:end]
+        durations = np.frombuffer(self.durations, dtype=np.float64)[begin:end] * 1000.0
+        if len(starts) < 2:
+            return {"ticks": len(starts)}
+        jitter = np.abs(np.diff(starts) - interval) * 1000.0
+        return {
+            "ticks": len(starts),
+            "jitter_p50_ms": float(np.percentile(jitter, 50)),
+            "jitter_p99_ms": float(np.percentile(jitter, 99)),
+            "jitter_max_ms": float(jitter.max()),
+            "step_p50_ms": float(np.percentile(durations, 50)),
+            "step_p99_ms": float(np.percentile(durations, 99)),
+            "step_max_ms": float(durations.max()),
+        }
+
+
+def modbus_targets(layout, modbus_mode="threaded"):
+    """
+    Lists the Modbus endpoints a simulation of the layout serves.
+
+    Args:
+        layout (dict): Parsed layout.
+        modbus_mode (str): "threaded" or "async" (one port per PLC/SCADA), or "shared"
+            (one port, endpoints selected by unit ID).
+
+    Returns:
+        list: (host, port, unit_id) tuples.
+    """
+    plcs = layout.get("plcs", [])
+    scada = layout.get("scada")
+    if modbus_mode == "shared":
+        config = layout.get("modbus", {})
+        host, port = config.get("host", "127.0.0.1"), config.get("port", 5020)
+        targets = [(host, port, plc.get("unit_id", i + 1)) for i, plc in enumerate(plcs)]
+        if scada:
+            targets.append((host, port, scada.get("unit_id", len(plcs) + 1)))
+        return targets
+    targets = [(plc.get("ip", "127.0.0.1"), plc.get("port", 5100), 1) for plc in plcs]
+    if scada:
+        targets.append((scada.get("ip", "127.0.0.1"), scada.get("port", 5200), 1))
+    return targets
+
+
+async def run_load(targets, clients=20, duration=10.0, mix=(50, 30, 15, 5), block=10, seed=None):
+    """
+    Runs concurrent clients against the targets (assigned round-robin).
+
+    Args:
+        targets (list): (host, port, unit_id) endpoints.
+        clients (int): Concurrent client connections.
+        duration (float): Seconds of load.
+        mix (tuple): Relative weights of single reads, block reads, single writes and block writes.
+        block (int): Registers per block read/write.
+        seed (int, optional): Seed for the operation mix.
+
+    Returns:
+        dict: Request count, throughput, errors, and overall and per-operation latency percentiles in ms.
+    """
+    latencies = {op: array('d') for op in OPERATIONS}
+    errors = {"exception_responses": 0, "timeouts": 0, "connection_errors": 0}
+    deadline = time.monotonic() + duration
+
+    async def client_loop(index):
+        host, port, unit_id = targets[index % len(targets)]
+        rng = random.Random(None if seed is None else seed + index)
+        client = ModbusClient(host, port, unit_id)
+        try:
+            await client.connect()
+        except OSError:
+            errors["connection_errors"] += 1
+            return
+        try:
+            while time.monotonic() < deadline:
+                op = rng.choices(OPERATIONS, weights=mix)[0]
+                address = rng.randrange(SCRATCH_START, SCRATCH_END - block)
+                if op == "read":
+                    request = client.read_registers(address)
+                elif op == "read_block":
+                    request = client.read_registers(address, block)
+                elif op == "write":
+                    request = client.write_register(address, rng.randrange(0x10000))
+                else:
+                    request = client.write_registers(address, [rng.randrange(0x10000) for _ in range(block)])
+                start = time.perf_counter()
+                try:
+                    await asyncio.wait_for(request, REQUEST_TIMEOUT)
+                except ModbusError:
+                    errors["exception_responses"] += 1
+                    continue
+                except asyncio.TimeoutError:
+                    errors["timeouts"] += 1
+                    return  # the connection is out of step with its responses
+                except (OSError, asyncio.IncompleteReadError):
+                    errors["connection_errors"] += 1
+                    return
+                latencies[op].append((time.perf_counter() - start) * 1000.0)
+        finally:
+            await client.close()
+
+    start = time.monotonic()
+    await asyncio.gather(*(client_loop(i) for i in range(clients)))
+    elapsed = time.monotonic() - start
+
+    def percentiles(values):
+        if not len(values):
+            return {"count": 0}
+        values = np.frombuffer(values, dtype=np.float64)
+        p50, p99, p999 = np.percentile(values, [50, 99, 99.9])
+        return {"count": len(values), "p50_ms": float(p50), "p99_ms": float(p99), "p999_ms": float(p999),
+                "max_ms": float(values.max())}
+
+    everything = array('d')
+    for values in latencies.values():
+        everything.extend(values)
+    return {
+        "clients": clients,
+        "targets": len(targets),
+        "duration": elapsed,
+        "requests": len(everything),
+        "requests_per_sec": len(everything) / elapsed if elapsed > 0 else 0.0,
+        "errors": errors,
+        "latency": percentiles(everything),
+        "operations": {op: percentiles(values) for op, values in latencies.items()},
+    }
+
+
+def print_report(load, ticks=None):
+    latency = load["latency"]
+    print(f"{load['requests']} requests from {load['clients']} clients to {load['targets']} endpoints in "
+          f"{load['duration']:.1f}s: {load['requests_per_sec']:,.0f} req/s, errors {load['errors']}")
+    if latency["count"]:
+        print(f"  latency p50 {latency['p50_ms']:.2f} p99 {latency['p99_ms']:.2f} "
+              f"p99.9 {latency['p999_ms']:.2f} max {latency['max_ms']:.2f} ms")
+    for op, stats in load["operations"].items():
+        if stats["count"]:
+            print(f"    {op:<12} {stats['count']:>8} requests, p50 {stats['p50_ms']:.2f} p99 {stats['p99_ms']:.2f} ms")
+    for phase, stats in (ticks or {}).items():
+        if "jitter_p50_ms" in stats:
+            print(f"  sim ticks {phase:<9} {stats['ticks']:>5} ticks, jitter p50 {stats['jitter_p50_ms']:.2f} "
+                  f"p99 {stats['jitter_p99_ms']:.2f} max {stats['jitter_max_ms']:.2f} ms, "
+                  f"step p50 {stats['step_p50_ms']:.2f} p99 {stats['step_p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Modbus load tester")
+    parser.add_argument("--layout", default="Process_sim.json", help="Layout whose PLC/SCADA ports are loaded")
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent Modbus clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--baseline", type=float, default=3.0, help="Seconds of tick timing before the load")
+    parser.add_argument("--mix", default="50,30,15,5", help="Weights: single read, block read, single write, block write")
+    parser.add_argument("--block", type=int, default=10, help="Registers per block read/write")
+    parser.add_argument("--modbus-mode", choices=["threaded", "async", "shared"], default="threaded",
+                        help="How the simulation hosts its Modbus endpoints")
+    parser.add_argument("--interval", type=float, default=0.05, help="Simulation tick interval in seconds")
+    parser.add_argument("--attach", action="store_true", help="Load an already running simulation")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # keep per-write PLC logs out of the measurement
+    mix = tuple(float(weight) for weight in args.mix.split(","))
+    if args.modbus_mode == "threaded" and mix[3]:
+        # modbus_tcp_server fails to parse function 16 and drops the connection
+        print("Threaded endpoints (modbus_tcp_server) do not support block writes; leaving them out of the mix")
+        mix = mix[:3] + (0.0,)
+    with open(args.layout) as f:
+        targets = modbus_targets(json.load(f), args.modbus_mode)
+
+    sim = timer = None
+    ticks = {}
+    if not args.attach:
+        graph = load_layout(args.layout, mqtt_factory=OfflineMQTTInterface)
+        sim = SimulationThread(graph, interval=args.interval, modbus_mode=args.modbus_mode)
+        timer = TickTimer(sim)
+        sim.daemon = True
+        sim.start()
+        time.sleep(args.baseline)
+    try:
+        loaded_from = timer.mark() if timer else 0
+        load = asyncio.run(run_load(targets, args.clients, args.duration, mix, args.block, args.seed))
+        if timer:
+            ticks = {"idle": timer.stats(args.interval, 1, loaded_from),
+                     "loaded": timer.stats(args.interval, loaded_from, timer.mark())}
+    finally:
+        if sim is not None:
+            sim.stop()
+
+    print_report(load, ticks)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"benchmark": "modbus_load", "layout": args.layout, "modbus_mode": args.modbus_mode,
+                       "interval": args.interval, "mix": mix, "block": args.block, "load": load, "ticks": ticks},
+                      f, indent=2)
+        print(f"Results written to {args.output}")
@@ -0,0 +1,270 @@
+"""
+MQTT Broker Throughput and Latency Benchmark
+
+Starts the local mqttools broker (servers/mqtt_server.py) in its own process
+and drives it with N publishers x M subscribers for every combination of the
+given publisher counts, subscriber counts, topic counts and payload sizes.
+
+Every subscriber subscribes to all topics of the scenario and every publisher
+publishes round-robin over them, so each published message is delivered M
+times. Payloads carry their send time; the end-to-end latency of every
+delivery is measured when the subscriber receives it. All clients share one
+asyncio event loop in this process, separate from the broker's.
+
+With --rate 0 (the default) publishers send as fast as the broker accepts, so
+the latencies include queueing at saturation; pass an aggregate --rate to
+measure latency below saturation. A publisher holds at most
+`MAX_BUFFERED_BYTES` that its socket has not taken yet and otherwise waits, so
+the rates follow the broker rather than the clients' write buffers and local
+queueing adds little to the latencies. The publish rate counts messages written
+to the socket (the publish time ends when the publishers' buffers have drained),
+and the window delivery rate counts the deliveries received within that time.
+
+Results are printed and written as JSON (--output) for comparing runs.
+
+Usage:
+    python benchmarks/mqtt_broker_bench.py [--publishers 1 4] [--subscribers 1 4]
+        [--topics 1 100] [--payload-sizes 64 1024] [--duration 3] [--rate 0]
+        [--broker HOST:PORT] [--output mqtt_broker_bench.json]
+
+Functions:
+    start_broker() - Starts servers/mqtt_server.py on a free port.
+    run_scenario() - Runs one publishers/subscribers/topics/payload combination.
+    run_benchmark() - Runs every combination and returns the results.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import socket
+import struct
+import subprocess
+import sys
+import time
+from array import array
+
+import numpy as np
+from gmqtt import Client as MQTTClient, Subscription
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from process_sim.interfaces.write_buffer import MAX_BUFFERED_BYTES, buffered, wait_for_buffer, drain, disconnect
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STAMP = struct.Struct("<Q")  # send time in perf_counter nanoseconds
+DRAIN_TIMEOUT = 5.0  # seconds to wait for the broker to deliver what it accepted
+
+
+def free_port():
+    """Returns a TCP port that is currently free on localhost."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_broker(port=None, timeout=10.0):
+    """
+    Starts servers/mqtt_server.py and waits until it accepts connections.
+
+    Args:
+        port (int, optional): Port to listen on. Defaults to a free port.
+        timeout (float): Seconds to wait for the broker.
+
+    Returns:
+        tuple: (subprocess.Popen, port)
+    """
+    port = port or free_port()
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "servers", "mqtt_server.py"), "--port", str(port)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"MQTT broker did not start on port {port}")
+
+
+async def _connect(host, port, client_id, on_message=None):
+    client = MQTTClient(client_id)
+    if on_message is not None:
+        client.on_message = on_message
+    await client.connect(host, port)
+    return client
+
+
+async def run_scenario(host, port, publishers, subscribers, topics, payload_size, duration=3.0, rate=None):
+    """
+    Runs one scenario and measures throughput and end-to-end latency.
+
+    Args:
+        host (str): Broker address.
+        port (int): Broker port.
+        publishers (int): Publishing clients.
+        subscribers (int): Subscribing clients, each subscribed to every topic.
+        topics (int): Distinct topics.
+        payload_size (int): Payload bytes (at least the 8-byte timestamp).
+        duration (float): Seconds of publishing.
+        rate (float, optional): Aggregate publish rate in msg/s. Defaults to as fast as possible.
+
+    Returns:
+        dict: Scenario parameters, publish and delivery rates, delivery ratio and latency
+        percentiles (ms).
+    """
+    topic_names = [f"bench/topic{i}" for i in range(topics)]
+    padding = b"\0" * max(payload_size - STAMP.size, 0)
+    latencies = array('d')
+
+    def on_message(client, topic, payload, qos, properties):
+        latencies.append((time.perf_counter_ns() - STAMP.unpack_from(payload)[0]) / 1e6)
+        return 0
+
+    subs = await asyncio.gather(*(_connect(host, port, f"bench_sub_{i}", on_message) for i in range(subscribers)))
+    for client in subs:
+        client.subscribe([Subscription(topic) for topic in topic_names])
+    pubs = await asyncio.gather(*(_connect(host, port, f"bench_pub_{i}") for i in range(publishers)))
+    await asyncio.sleep(0.5)  # let the subscriptions settle
+
+    published = 0
+    per_publisher = rate / publishers if rate else None
+    start = time.monotonic()
+    deadline = start + duration
+
+    async def publish_loop(client, index):
+        nonlocal published
+        topic_index = index % topics
+        due = start
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            if per_publisher is not None and due > now:
+                await asyncio.sleep(due - now)
+                continue
+            for _ in range(100):
+                client.publish(topic_names[topic_index], STAMP.pack(time.perf_counter_ns()) + padding)
+                topic_index = (topic_index + 1) % topics
+                published += 1
+                if per_publisher is not None:
+                    due += 1.0 / per_publisher
+                    if due > now:
+                        break
+                if buffered(client) > MAX_BUFFERED_BYTES:
+                    break
+            await asyncio.sleep(0)
+            await wait_for_buffer(client, MAX_BUFFERED_BYTES, deadline)
+
+    await asyncio.gather(*(publish_loop(client, i) for i, client in enumerate(pubs)))
+    await asyncio.gather(*(drain(client) for client in pubs))
+    publish_time = time.monotonic() - start
+    window_delivered = len(latencies)
+
+    # Wait for the broker to deliver what it accepted
+    expected = published * subscribers
+    drain_deadline = time.monotonic() + DRAIN_TIMEOUT
+    last = -1
+    while len(latencies) < expected and time.monotonic() < drain_deadline:
+        if len(latencies) == last:
+            break
+        last = len(latencies)
+        await asyncio.sleep(0.25)
+    total_time = time.monotonic() - start
+
+    await asyncio.gather(*(disconnect(client) for client in pubs + subs), return_exceptions=True)
+
+    values = np.frombuffer(latencies, dtype=np.float64) if len(latencies) else np.zeros(1)
+    p50, p99, p999 = np.percentile(values, [50, 99, 99.9])
+    return {
+        "publishers": publishers,
+        "subscribers": subscribers,
+        "topics": topics,
+        "payload_size": max(payload_size, STAMP.size),
+        "target_rate": rate,
+        "published": published,
+        "delivered": len(latencies),
+        "delivery_ratio": len(latencies) / expected if expected else 0.0,
+        "publish_rate": published / publish_time,
+        "window_delivery_rate": window_delivered / publish_time,
+        "delivery_rate": len(latencies) / total_time,
+        "latency_p50_ms": float(p50),
+        "latency_p99_ms": float(p99),
+        "latency_p999_ms": float(p999),
+        "latency_max_ms": float(values.max()),
+    }
+
+
+async def run_benchmark(host, port, publishers=(1, 4), subscribers=(1, 4), topics=(1, 100),
+                        payload_sizes=(64, 1024), duration=3.0, rate=None, progress=None):
+    """
+    Runs every combination of the scenario parameters.
+
+    Args:
+        progress (callable, optional): Called with each scenario result as it finishes.
+
+    Returns:
+        list: Scenario results (see `run_scenario`).
+    """
+    results = []
+    for n_pub, n_sub, n_topics, size in itertools.product(publishers, subscribers, topics, payload_sizes):
+        result = await run_scenario(host, port, n_pub, n_sub, n_topics, size, duration, rate)
+        results.append(result)
+        if progress:
+            progress(result)
+    return results
+
+
+def print_result(result):
+    print(f"  {result['publishers']:>3} pub {result['subscribers']:>3} sub {result['topics']:>5} topics "
+          f"{result['payload_size']:>6} B: {result['publish_rate']:>9,.0f} pub/s "
+          f"{result['window_delivery_rate']:>9,.0f} deliveries/s ({result['delivery_ratio']:.1%})  latency p50 {result['latency_p50_ms']:.2f} "
+          f"p99 {result['latency_p99_ms']:.2f} p99.9 {result['latency_p999_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MQTT broker throughput and latency benchmark")
+    parser.add_argument("--publishers", type=int, nargs="+", default=[1, 4], help="Publisher counts")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 4], help="Subscriber counts")
+    parser.add_argument("--topics", type=int, nargs="+", default=[1, 100], help="Topic counts")
+    parser.add_argument("--payload-sizes", type=int, nargs="+", default=[64, 1024], help="Payload sizes in bytes")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds of publishing per scenario")
+    parser.add_argument("--rate", type=float, default=0, help="Aggregate publish rate (0 for as fast as possible)")
+    parser.add_argument("--broker", default=None, help="HOST:PORT of a running broker (default: start one)")
+    parser.add_argument("--output", default="mqtt_broker_bench.json", help="JSON results file")
+    args = parser.parse_args()
+
+    started = time.strftime("%Y-%m-%dT%H:%M:%S")
+    broker_process = None
+    if args.broker:
+        host, port = args.broker.rsplit(":", 1)
+        port = int(port)
+    else:
+        broker_process, port = start_broker()
+        host = "127.0.0.1"
+
+    print(f"Broker {host}:{port}, {args.duration:g}s per scenario, "
+          f"rate {'max' if not args.rate else f'{args.rate:g} msg/s'}")
+    try:
+        results = asyncio.run(run_benchmark(host, port, args.publishers, args.subscribers, args.topics,
+                                            args.payload_sizes, args.duration, args.rate or None, print_result))
+    finally:
+        if broker_process is not None:
+            broker_process.terminate()
+            broker_process.wait()
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "benchmark": "mqtt_broker",
+            "started": started,
+            "broker": args.broker or "servers/mqtt_server.py (mqttools)",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duration": args.duration,
+            "rate": args.rate or None,
+            "scenarios": results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
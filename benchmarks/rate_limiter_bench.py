@@ -0,0 +1,110 @@
+"""
+Rate Limiter Microbenchmark
+
+Floods each rate limiter implementation with publish checks and reports how
+many checks per second it sustains, compared with the original list-rebuilding
+limiter. A fast fake clock advances between checks, so the limiters see a
+flood far above their configured rate and keep rejecting most messages.
+
+Usage:
+    python benchmarks/rate_limiter_bench.py [--checks N] [--rate R] [--topics T]
+
+Functions:
+    list_rebuild_limiter() - The original O(n) limiter, kept for comparison.
+    run_benchmark() - Times every limiter and returns the results.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from defences.rate_limiter import build_rate_limiter
+
+
+class FloodClock:
+    """Fake clock advancing by a fixed step on every read."""
+
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def list_rebuild_limiter(rate, clock):
+    """
+    The original limiter: rebuilds the timestamp list on every check.
+
+    Returns:
+        callable: Check function taking (topic, client_id).
+    """
+    timestamps = []
+
+    def allow_message(topic=None, client_id=None):
+        nonlocal timestamps
+        now = clock()
+        timestamps = [ts for ts in timestamps if now - ts < 1]
+        if len(timestamps) < rate:
+            timestamps.append(now)
+            return True
+        return False
+
+    return allow_message
+
+
+def run_benchmark(checks=200000, rate=1000, topics=50):
+    """
+    Times `checks` publish checks against every limiter.
+
+    Args:
+        checks (int): Number of checks per limiter.
+        rate (int): Configured messages per second.
+        topics (int): Number of distinct topics in the flood.
+
+    Returns:
+        list: (name, checks/sec, allowed) tuples.
+    """
+    topic_names = [f"tank/tank{i}/volume" for i in range(topics)]
+    configs = [
+        ("window (global)", {"algorithm": "window", "scope": "global"}),
+        ("token_bucket (global)", {"algorithm": "token_bucket", "scope": "global"}),
+        ("window (per topic)", {"algorithm": "window", "scope": "topic"}),
+        ("token_bucket (per topic)", {"algorithm": "token_bucket", "scope": "topic"}),
+        ("token_bucket (per client+topic)", {"algorithm": "token_bucket", "scope": "client_topic"}),
+    ]
+
+    results = []
+    # 100x the configured rate: a sustained flood
+    step = 1.0 / (rate * 100)
+
+    candidates = [("list rebuild (original)", list_rebuild_limiter(rate, FloodClock(step)))]
+    for name, config in configs:
+        limiter = build_rate_limiter({**config, "rate": rate}, clock=FloodClock(step))
+        candidates.append((name, limiter.allow_message))
+
+    for name, allow_message in candidates:
+        allowed = 0
+        start = time.perf_counter()
+        for i in range(checks):
+            if allow_message(topic_names[i % topics], "bench"):
+                allowed += 1
+        elapsed = time.perf_counter() - start
+        results.append((name, checks / elapsed, allowed))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate limiter microbenchmark")
+    parser.add_argument("--checks", type=int, default=200000, help="Checks per limiter")
+    parser.add_argument("--rate", type=int, default=1000, help="Configured messages per second")
+    parser.add_argument("--topics", type=int, default=50, help="Distinct topics in the flood")
+    args = parser.parse_args()
+
+    print(f"{args.checks} checks, limit {args.rate}/s, flood at {args.rate * 100}/s over {args.topics} topics")
+    for name, rate, allowed in run_benchmark(args.checks, args.rate, args.topics):
+        print(f"  {name:<34} {rate:>12,.0f} checks/s   allowed {allowed}")
@@ -0,0 +1,215 @@
+"""
+Tick Scaling Benchmark
+
+Generates synthetic layouts (process_sim/layout_generator.py) from 10 to
+100,000 components and measures, for each size:
+
+  - generation and load time (JSON parse plus graph construction)
+  - controller setup time (PLC and SCADA rule compilation)
+  - resident memory added by the loaded graph, and the peak
+  - per-tick cost of each phase of SimulationThread.step: PLC scans, SCADA
+    scan, graph update and graph publish (through offline MQTT interfaces, so
+    the cost of building the messages is measured without a broker)
+
+Each size runs in a fresh process so memory figures are not polluted by the
+previous size. Component counts include tanks, pumps, splitters and lines; the
+tank count is scaled to reach the requested size for the chosen topology.
+
+Usage:
+    python benchmarks/tick_scaling_bench.py [--sizes 10 100 1000 10000 100000]
+        [--topology chain] [--vectorized] [--ticks N] [--output tick_scaling_bench.json]
+
+Functions:
+    tanks_for() - Number of tanks that gives about the requested component count.
+    measure() - Loads and steps one generated layout and returns its measurements.
+    run_benchmark() - Measures every size in its own process.
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from process_sim.layout_generator import TOPOLOGIES, generate_layout, layout_stats
+from process_sim.layout_parser import load_layout
+from process_sim.simulation_runner import SimulationThread
+
+PHASES = ("plcs", "scada", "update", "publish")
+TICK_BUDGET = 2_000_000  # component-ticks per size when --ticks is not given
+
+
+def _rss_mb():
+    """Returns the current resident set size in MB (the peak where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def tanks_for(components, topology="chain", branching=2, loop_every=5):
+    """
+    Returns the number of tanks that gives about `components` components.
+
+    The components-per-tank ratio of the topology is measured on a small pilot layout.
+    """
+    pilot = 100
+    ratio = layout_stats(generate_layout(pilot, topology, branching, loop_every, scada=False))["components"] / pilot
+    return max(2, round(components / ratio))
+
+
+def _timed(call):
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+def measure(components, topology="chain", branching=2, loop_every=5, vectorized=False, ticks=None):
+    """
+    Generates, loads and steps one layout.
+
+    Args:
+        components (int): Requested component count.
+        topology (str): Layout topology (see layout_generator).
+        branching (int): Children per tank (tree).
+        loop_every (int): Tanks per recycle loop (recycle).
+        vectorized (bool): Use the vectorized stepping engine.
+        ticks (int, optional): Ticks to time. Defaults to a fixed budget of component-ticks.
+
+    Returns:
+        dict: Layout statistics, timings in seconds, memory in MB and per-tick phase costs in ms.
+    """
+    start = time.perf_counter()
+    layout = generate_layout(tanks_for(components, topology, branching, loop_every), topology, branching, loop_every)
+    generate_time = time.perf_counter() - start
+    stats = layout_stats(layout)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(layout, f)
+        path = f.name
+    del layout
+    gc.collect()
+
+    try:
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        graph = load_layout(path, vectorized=vectorized, mqtt_factory=OfflineMQTTInterface)
+        load_time = time.perf_counter() - start
+    finally:
+        os.remove(path)
+    gc.collect()
+    graph_mb = _rss_mb() - rss_before
+
+    start = time.perf_counter()
+    sim = SimulationThread(graph, headless=True)
+    setup_time = time.perf_counter() - start
+
+    ticks = ticks or min(1000, max(5, TICK_BUDGET // stats["components"]))
+    calls = {
+        "plcs": lambda: [plc.update() for plc in sim.plcs],
+        "scada": lambda: sim.scada and sim.scada.update(),
+        "update": graph.update,
+        "publish": graph.publish,
+    }
+    for phase in PHASES:  # warm up
+        calls[phase]()
+    totals = dict.fromkeys(PHASES, 0.0)
+    for _ in range(ticks):
+        for phase in PHASES:
+            totals[phase] += _timed(calls[phase])
+
+    tick_ms = {phase: totals[phase] / ticks * 1000 for phase in PHASES}
+    tick_total = sum(tick_ms.values())
+    return {
+        "requested": components,
+        **stats,
+        "topology": topology,
+        "vectorized": vectorized,
+        "generate_s": generate_time,
+        "load_s": load_time,
+        "setup_s": setup_time,
+        "graph_mb": graph_mb,
+        "peak_mb": _peak_rss_mb(),
+        "ticks": ticks,
+        "tick_ms": tick_ms,
+        "tick_total_ms": tick_total,
+        "tick_us_per_component": tick_total * 1000 / stats["components"],
+    }
+
+
+def run_benchmark(sizes=(10, 100, 1000, 10000, 100000), progress=None, **options):
+    """
+    Measures every size in a fresh process.
+
+    Args:
+        sizes (iterable): Requested component counts.
+        progress (callable, optional): Called with each result as it finishes.
+        **options: Passed to `measure`.
+
+    Returns:
+        list: Results of `measure`, one per size.
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for size in sizes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(measure, size, **options).result()
+        results.append(result)
+        if progress:
+            progress(result)
+    return results
+
+
+def print_result(result):
+    phases = " ".join(f"{phase} {result['tick_ms'][phase]:.3f}" for phase in PHASES)
+    print(f"  {result['components']:>7} components ({result['tanks']} tanks, {result['pumps']} pumps, "
+          f"{result['splitters']} splitters, {result['plcs']} PLCs, {result['rules']} rules)\n"
+          f"          load {result['load_s']:.3f}s setup {result['setup_s']:.3f}s "
+          f"memory {result['graph_mb']:.1f} MB (peak {result['peak_mb']:.1f} MB)\n"
+          f"          tick {result['tick_total_ms']:.3f} ms ({result['tick_us_per_component']:.2f} us/component): "
+          f"{phases} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation tick cost scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000],
+                        help="Component counts")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="chain", help="Layout topology")
+    parser.add_argument("--branching", type=int, default=2, help="Children per tank (tree)")
+    parser.add_argument("--loop-every", type=int, default=5, help="Tanks per recycle loop (recycle)")
+    parser.add_argument("--vectorized", action="store_true", help="Use the vectorized stepping engine")
+    parser.add_argument("--ticks", type=int, default=None, help="Ticks to time per size (default: scaled to size)")
+    parser.add_argument("--output", default="tick_scaling_bench.json", help="JSON results file")
+    args = parser.parse_args()
+
+    started = time.strftime("%Y-%m-%dT%H:%M:%S")
+    print(f"Topology {args.topology}, {'vectorized' if args.vectorized else 'object'} engine")
+    results = run_benchmark(args.sizes, print_result, topology=args.topology, branching=args.branching,
+                            loop_every=args.loop_every, vectorized=args.vectorized, ticks=args.ticks)
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "benchmark": "tick_scaling",
+            "started": started,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "topology": args.topology,
+            "vectorized": args.vectorized,
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
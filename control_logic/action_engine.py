@@ -3,38 +3,30 @@ Action Engine
 
 This module defines the ActionEngine class, which evaluates conditional rules (triggers)
 based on register values and applies control effects to devices in the process graph.
+Rule lists are compiled once into a register -> device index with pre-bound comparators,
+so a scan reads each referenced device once and avoids per-rule lookups. In event-driven
+mode only rules whose input register changed since the previous scan, or whose target was
+changed from outside the engine, are evaluated (together with the rules sharing targets with
+them), which leaves every device in the state a cyclic scan would.
 
 Classes:
     ActionEngine - Executes logical actions using device states and a rule-based engine.
 """
 
 import logging
-import os
+import operator
 
-# Ensure the 'data' directory exists
-log_dir = os.path.join(os.path.dirname(__file__), "data")
-os.makedirs(log_dir, exist_ok=True)
+logger = logging.getLogger(__name__)
 
-# Set full path to log file inside data/
-log_path = os.path.join(log_dir, "logs.txt")
-
-# Reset logging if needed
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# Setup logging to file
-logging.basicConfig(
-    level=logging.INFO,
-    filename=log_path,
-    filemode="w",
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
-
-# Optional: Console output to debug
-console = logging.StreamHandler()
-console.setLevel(logging.DEBUG)
-console.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-logging.getLogger().addHandler(console)
+# Comparison operators supported in rule triggers
+COMPARATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
 
 class ActionEngine:
     """
@@ -45,9 +37,12 @@ class ActionEngine:
         register_map (dict or list): Mapping between device IDs and register addresses.
         graph (ProcessGraph): The simulation graph containing all components.
         mqtt (MQTTInterface): Optional communication layer for integration.
+        event_driven (bool): Only evaluate rules whose input or target changed since the last scan.
+        rules_evaluated (int): Rules evaluated by `scan()` so far.
+        rules_skipped (int): Rules skipped by `scan()` because nothing they depend on changed.
     """
 
-    def __init__(self, register_map, graph, mqtt_interface):
+    def __init__(self, register_map, graph, mqtt_interface, event_driven=False):
         """
         Initializes the engine with a register map and graph reference.
 
@@ -55,11 +50,196 @@ class ActionEngine:
             register_map (dict or list): Mapping of register addresses to device IDs.
             graph (ProcessGraph): The simulation graph context.
             mqtt_interface (MQTTInterface): Interface for messaging (not used directly).
+            event_driven (bool): Enable dependency-tracked scanning (see `scan()`).
         """
         self.register_map = register_map
         self.graph = graph
         self.mqtt = mqtt_interface
 
+        # Register -> device ID, built once (first mapping wins, as in a linear scan)
+        self._register_index = {}
+        if isinstance(register_map, dict):
+            for dev_id, reg in register_map.items():
+                self._register_index.setdefault(reg, dev_id)
+        elif isinstance(register_map, list):
+            for entry in register_map:
+                self._register_index.setdefault(entry.get("plc_input_register"), entry["id"])
+
+        self._readers = {}   # register -> zero-argument value reader
+        self._program = []   # compiled rules in original order: (register, test, effect)
+        self._dependents = {}  # register -> indices of the rules that read it
+        self._last_values = {}  # register -> value seen by the previous scan
+        self._target_readers = {}  # target ID -> state reader
+        self._groups = {}  # target ID -> indices of the rules acting on it or on a connected target
+        self._last_targets = {}  # target ID -> state left by the previous scan
+
+        self.event_driven = event_driven
+        self.rules_evaluated = 0
+        self.rules_skipped = 0
+
+    def compile(self, actions):
+        """
+        Compiles a list of actions for repeated evaluation with `scan()`.
+
+        Each trigger is turned into a comparator closure bound to its threshold,
+        and each referenced register is resolved once to a reader of its device.
+        Rules whose register maps to no device are dropped (and logged once).
+        Rules acting on common targets are grouped, since the last of them in
+        rule order decides a target's state.
+
+        Args:
+            actions (list): Action dictionaries as accepted by `evaluate_and_execute`.
+        """
+        self._readers = {}
+        self._program = []
+        self._dependents = {}
+        self._last_values = {}
+        self._target_readers = {}
+        self._last_targets = {}
+        rule_targets = []
+
+        for action in actions:
+            trigger = action["trigger"]
+            reg = trigger["register"]
+
+            if reg not in self._readers:
+                device = self.graph.nodes.get(self._resolve_device_id(reg))
+                if not device:
+                    logger.info("[ENGINE] No device found for register %s", reg)
+                self._readers[reg] = self._make_reader(device) if device else None
+            if self._readers[reg] is None:
+                continue
+
+            self._dependents.setdefault(reg, []).append(len(self._program))
+            self._program.append((reg, self._make_test(trigger["condition"], trigger["value"]), action["effect"]))
+
+            targets = action["effect"]["target"]
+            targets = [t for t in (targets if isinstance(targets, list) else [targets])
+                       if hasattr(self.graph.nodes.get(t), "get_state")]
+            for target_id in targets:
+                self._target_readers[target_id] = self.graph.nodes[target_id].get_state
+            rule_targets.append(targets)
+
+        self._groups = self._group_by_target(rule_targets)
+
+    @staticmethod
+    def _group_by_target(rule_targets):
+        """
+        Groups rules that act on a common target, directly or through other rules.
+
+        Args:
+            rule_targets (list): Target IDs of each compiled rule.
+
+        Returns:
+            dict: Target ID -> indices of every rule in its group.
+        """
+        parent = {}
+
+        def find(target_id):
+            while parent.setdefault(target_id, target_id) != target_id:
+                parent[target_id] = parent[parent[target_id]]
+                target_id = parent[target_id]
+            return target_id
+
+        for targets in rule_targets:
+            for target_id in targets[1:]:
+                parent[find(target_id)] = find(targets[0])
+
+        members = {}
+        for index, targets in enumerate(rule_targets):
+            if targets:
+                members.setdefault(find(targets[0]), []).append(index)
+        return {target_id: members[find(target_id)] for target_id in parent}
+
+    def scan(self):
+        """
+        Evaluates the compiled rules once, reading each register's device a single
+        time, and executes the effects of rules whose condition holds. Effects are
+        applied in the original rule order.
+
+        In event-driven mode only the rules subscribed to a register whose value
+        changed since the previous scan are evaluated (all rules on the first scan),
+        plus the rules acting on a target whose state changed since this engine last
+        left it (an operator, attacker or other controller wrote it). Every rule
+        sharing a target with an evaluated rule is evaluated too, so each target
+        ends up in the state a cyclic scan would leave it in.
+        """
+        values = {reg: read() for reg, read in self._readers.items() if read is not None}
+
+        if not self.event_driven:
+            for reg, test, effect in self._program:
+                if test(values[reg]):
+                    self._execute_effect(effect)
+            self.rules_evaluated += len(self._program)
+            return
+
+        last = self._last_values
+        dirty = {index for reg, value in values.items()
+                 if reg not in last or last[reg] != value
+                 for index in self._dependents.get(reg, ())}
+        self._last_values = values
+
+        # Targets written from outside since the previous scan
+        last_targets = self._last_targets
+        for target_id, read in self._target_readers.items():
+            if last_targets.get(target_id) != read():
+                dirty.update(self._groups[target_id])
+
+        for index in list(dirty):
+            targets = self._program[index][2]["target"]
+            for target_id in (targets if isinstance(targets, list) else [targets]):
+                dirty.update(self._groups.get(target_id, ()))
+
+        for index in sorted(dirty):
+            reg, test, effect = self._program[index]
+            if test(values[reg]):
+                self._execute_effect(effect)
+        self._last_targets = {target_id: read() for target_id, read in self._target_readers.items()}
+        self.rules_evaluated += len(dirty)
+        self.rules_skipped += len(self._program) - len(dirty)
+
+    def _make_reader(self, device):
+        """
+        Returns a function reading a device's current register value.
+
+        Args:
+            device (ProcessComponent): A tank, pump, or similar component.
+
+        Returns:
+            callable: Zero-argument reader, equivalent to `_get_value_from_device`.
+        """
+        if hasattr(device, "current_volume"):
+            return lambda: device.current_volume
+        elif hasattr(device, "get_state"):
+            return lambda: 1 if device.get_state() == "open" else 0
+        return lambda: 0
+
+    def _make_test(self, cond, expected):
+        """
+        Returns a predicate comparing a value against a fixed threshold.
+
+        Args:
+            cond (str): Comparison operator as a string (e.g., "==", ">", "<=").
+            expected (float or int): Threshold or value to compare against.
+
+        Returns:
+            callable: Predicate taking the actual value. Unknown operators and
+                      comparison errors evaluate to False.
+        """
+        compare = COMPARATORS.get(cond)
+        if compare is None:
+            logger.info("[ENGINE] Unknown condition: %s", cond)
+            return lambda actual: False
+
+        def test(actual):
+            try:
+                return compare(actual, expected)
+            except Exception as e:
+                logger.info("[ENGINE] Condition error: %s", e)
+                return False
+
+        return test
+
     def evaluate_and_execute(self, action):
         """
         Evaluates a trigger condition and executes an effect if the condition is met.
@@ -83,7 +263,7 @@ class ActionEngine:
         device = self.graph.nodes.get(device_id)
 
         if not device:
-            logging.info(f"[ENGINE] No device found for register {reg}")
+            logger.info("[ENGINE] No device found for register %s", reg)
             return
 
         current_val = self._get_value_from_device(device)
@@ -101,15 +281,7 @@ class ActionEngine:
         Returns:
             str or None: Corresponding device ID or None if not found.
         """
-        if isinstance(self.register_map, dict):
-            for k, v in self.register_map.items():
-                if v == reg:
-                    return k
-        elif isinstance(self.register_map, list):
-            for entry in self.register_map:
-                if entry.get("plc_input_register") == reg:
-                    return entry["id"]
-        return None
+        return self._register_index.get(reg)
 
     def _get_value_from_device(self, device):
         """
@@ -139,21 +311,13 @@ class ActionEngine:
         Returns:
             bool: Result of the condition.
         """
+        compare = COMPARATORS.get(cond)
+        if compare is None:
+            return False
         try:
-            if cond == "==":
-                return actual == expected
-            elif cond == "!=":
-                return actual != expected
-            elif cond == ">":
-                return actual > expected
-            elif cond == "<":
-                return actual < expected
-            elif cond == ">=":
-                return actual >= expected
-            elif cond == "<=":
-                return actual <= expected
+            return compare(actual, expected)
         except Exception as e:
-            logging.info(f"[ENGINE] Condition error: {e}")
+            logger.info("[ENGINE] Condition error: %s", e)
         return False
 
     def _execute_effect(self, effect):
@@ -169,15 +333,15 @@ class ActionEngine:
 
         for target_id in targets:
             if target_id == "scada":
-                logging.info(f"[SCADA ALERT]: {effect.get('message')}")
+                logger.info("[SCADA ALERT]: %s", effect.get('message'))
                 continue
 
             node = self.graph.nodes.get(target_id)
             if not node:
-                logging.info(f"[ENGINE] No target found for {target_id}")
+                logger.info("[ENGINE] No target found for %s", target_id)
                 continue
 
             action = effect.get("action")
             if hasattr(node, "set_state") and action in ["open", "close"]:
                 node.set_state("open" if action == "open" else "closed")
-                logging.info(f"[ENGINE] Set state of {target_id} to {action}")
+                logger.info("[ENGINE] Set state of %s to %s", target_id, action)
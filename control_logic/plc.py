@@ -33,6 +33,7 @@ class PLC:
 
         Args:
             plc_config (dict): Configuration dictionary including 'id', 'ip', 'port', 'devices', and 'actions'.
+                An optional 'scan_mode' of "event" only re-evaluates rules whose inputs changed.
             graph (ProcessGraph): The simulation graph containing all components.
             mqtt_interface (MQTTInterface): Communication interface for live updates.
         """
@@ -42,12 +43,13 @@ class PLC:
         self.devices = plc_config.get("devices", [])
         self.actions = plc_config.get("actions", [])
         self.graph = graph
-        self.engine = ActionEngine(self.devices, self.graph, mqtt_interface)
+        self.engine = ActionEngine(self.devices, self.graph, mqtt_interface,
+                                   event_driven=plc_config.get("scan_mode", "cyclic") == "event")
+        self.engine.compile(self.actions)
 
     def update(self):
         """
         Executes all configured control actions using the action engine.
         Called once per simulation cycle.
         """
-        for action in self.actions:
-            self.engine.evaluate_and_execute(action)
+        self.engine.scan()
@@ -18,30 +18,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from control_logic.plc import PLC
 from servers.modbus_server import ModbusServerWrapper
 
-# Ensure the 'data' directory exists
-log_dir = os.path.join(os.path.dirname(__file__), "data")
-os.makedirs(log_dir, exist_ok=True)
-
-# Set full path to log file inside data/
-log_path = os.path.join(log_dir, "logs.txt")
-
-# Reset logging if needed
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# Setup logging to file
-logging.basicConfig(
-    level=logging.INFO,
-    filename=log_path,
-    filemode="w",
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
-
-# Optional: Console output to debug
-console = logging.StreamHandler()
-console.setLevel(logging.DEBUG)
-console.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-logging.getLogger().addHandler(console)
+logger = logging.getLogger(__name__)
 
 class ModbusPLC(PLC):
     """
@@ -52,10 +29,11 @@ class ModbusPLC(PLC):
 
     Attributes:
         modbus_registers (dict): Mapping of device IDs to Modbus register addresses.
-        modbus (ModbusServerWrapper): Embedded Modbus TCP server instance.
+        modbus (ModbusServerWrapper or RegisterBank): Embedded Modbus TCP server instance,
+            or a register bank served by a shared `AsyncModbusHost`.
     """
 
-    def __init__(self, plc_config, graph, mqtt_interface):
+    def __init__(self, plc_config, graph, mqtt_interface, modbus_host=None, unit_id=None):
         """
         Initializes the ModbusPLC and starts the Modbus TCP server.
 
@@ -63,14 +41,28 @@ class ModbusPLC(PLC):
             plc_config (dict): Configuration for the PLC including devices and Modbus setup.
             graph (ProcessGraph): The full simulation graph.
             mqtt_interface (MQTTInterface): Communication interface for internal messaging.
+            modbus_host (AsyncModbusHost, optional): Shared asyncio host to serve the
+                registers from instead of starting a dedicated server thread.
+            unit_id (int, optional): Unit ID routing to this PLC on a shared port.
         """
         super().__init__(plc_config, graph, mqtt_interface)
         self.modbus_registers = {dev["id"]: dev["plc_input_register"] for dev in plc_config["devices"]}
-        self.modbus = ModbusServerWrapper(
-            host=plc_config.get("ip", "127.0.0.1"),
-            port=plc_config.get("port", 5100),
-            initial_registers=self.modbus_registers
-        )
+        # Register -> device IDs, so external writes resolve their devices directly
+        self._devices_by_register = {}
+        for dev in plc_config["devices"]:
+            self._devices_by_register.setdefault(dev["plc_input_register"], []).append(dev["id"])
+        if modbus_host is not None:
+            self.modbus = modbus_host.add_endpoint(
+                host=plc_config.get("ip", "127.0.0.1"),
+                port=plc_config.get("port", 5100),
+                unit_id=unit_id
+            )
+        else:
+            self.modbus = ModbusServerWrapper(
+                host=plc_config.get("ip", "127.0.0.1"),
+                port=plc_config.get("port", 5100),
+                initial_registers=self.modbus_registers
+            )
         self.modbus.set_update_hook(self.on_register_write)
         self.modbus.start()
 
@@ -85,6 +77,9 @@ class ModbusPLC(PLC):
     def push_data_to_registers(self):
         """
         Writes the state of each device to its corresponding Modbus register.
+
+        Uses the server's internal write path, so only registers whose value
+        changed are touched and the external-write hook is not triggered.
         """
         for device in self.devices:
             dev_id = device["id"]
@@ -100,7 +95,7 @@ class ModbusPLC(PLC):
             else:
                 value = 0
 
-            self.modbus.write_register(reg, value)
+            self.modbus.sync_register(reg, value)
 
     def on_register_write(self, address, value):
         """
@@ -112,22 +107,19 @@ class ModbusPLC(PLC):
             address (int): Modbus register address.
             value (int or float): New value written to the register.
         """
-        for device in self.devices:
-            if device["plc_input_register"] == address:
-                dev_id = device["id"]
-                sim_obj = self.graph.nodes.get(dev_id)
-
-                if not sim_obj:
-                    continue
-
-                # Apply the value to the simulated object
-                if hasattr(sim_obj, "set_state"):
-                    sim_obj.set_state("open" if value == 1 else "closed")
-                elif hasattr(sim_obj, "set_rate"):
-                    sim_obj.set_rate(value)
-                elif hasattr(sim_obj, "current_volume"):
-                    sim_obj.current_volume = float(value)
-                elif hasattr(sim_obj, "max_capacity"):
-                    sim_obj.max_capacity = float(value)
-
-                logging.info(f"[MODBUS-PLC] Overwrote {dev_id} at register {address} with value {value}")
+        for dev_id in self._devices_by_register.get(address, ()):
+            sim_obj = self.graph.nodes.get(dev_id)
+            if not sim_obj:
+                continue
+
+            # Apply the value to the simulated object
+            if hasattr(sim_obj, "set_state"):
+                sim_obj.set_state("open" if value == 1 else "closed")
+            elif hasattr(sim_obj, "set_rate"):
+                sim_obj.set_rate(value)
+            elif hasattr(sim_obj, "current_volume"):
+                sim_obj.current_volume = float(value)
+            elif hasattr(sim_obj, "max_capacity"):
+                sim_obj.max_capacity = float(value)
+
+            logger.info("[MODBUS-PLC] Overwrote %s at register %s with value %s", dev_id, address, value)
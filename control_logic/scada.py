@@ -31,7 +31,8 @@ class SCADA:
         Initializes the SCADA system with configuration and graph context.
 
         Args:
-            config (dict): Dictionary containing SCADA setup info.
+            config (dict): Dictionary containing SCADA setup info. An optional 'scan_mode'
+                of "event" only re-evaluates rules whose inputs changed.
             graph (ProcessGraph): The full simulation graph.
             mqtt_interface (MQTTInterface): MQTT interface used by the ActionEngine.
         """
@@ -40,12 +41,13 @@ class SCADA:
         self.register_map = config.get("register_map", {})
         self.actions = config.get("actions", [])
         self.graph = graph
-        self.engine = ActionEngine(self.register_map, self.graph, mqtt_interface)
+        self.engine = ActionEngine(self.register_map, self.graph, mqtt_interface,
+                                   event_driven=config.get("scan_mode", "cyclic") == "event")
+        self.engine.compile(self.actions)
 
     def update(self):
         """
         Executes all configured SCADA actions using the action engine.
         Called once per simulation cycle.
         """
-        for action in self.actions:
-            self.engine.evaluate_and_execute(action)
+        self.engine.scan()
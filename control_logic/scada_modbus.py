@@ -8,6 +8,8 @@ Classes:
     ModbusSCADA - A SCADA interface enhanced with Modbus TCP server support.
 """
 
+import logging
+
 # Add the root directory of the project to the Python path
 import sys
 import os
@@ -16,6 +18,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from control_logic.scada import SCADA
 from servers.modbus_server import ModbusServerWrapper
 
+logger = logging.getLogger(__name__)
+
 
 class ModbusSCADA(SCADA):
     """
@@ -26,10 +30,11 @@ class ModbusSCADA(SCADA):
 
     Attributes:
         register_map (dict): Mapping of device IDs to Modbus register addresses.
-        modbus (ModbusServerWrapper): Embedded Modbus TCP server instance.
+        modbus (ModbusServerWrapper or RegisterBank): Embedded Modbus TCP server instance,
+            or a register bank served by a shared `AsyncModbusHost`.
     """
 
-    def __init__(self, scada_config, graph, mqtt_interface):
+    def __init__(self, scada_config, graph, mqtt_interface, modbus_host=None, unit_id=None):
         """
         Initializes ModbusSCADA and starts the Modbus TCP server.
 
@@ -37,14 +42,28 @@ class ModbusSCADA(SCADA):
             scada_config (dict): SCADA configuration dictionary.
             graph (ProcessGraph): Process simulation graph.
             mqtt_interface (MQTTInterface): Interface for MQTT communication.
+            modbus_host (AsyncModbusHost, optional): Shared asyncio host to serve the
+                registers from instead of starting a dedicated server thread.
+            unit_id (int, optional): Unit ID routing to this SCADA on a shared port.
         """
         super().__init__(scada_config, graph, mqtt_interface)
         self.register_map = scada_config.get("register_map", {})
-        self.modbus = ModbusServerWrapper(
-            host=scada_config.get("ip", "127.0.0.1"),
-            port=scada_config.get("port", 5200),
-            initial_registers=self.register_map
-        )
+        # Register -> device IDs, so external writes resolve their devices directly
+        self._devices_by_register = {}
+        for dev_id, reg in self.register_map.items():
+            self._devices_by_register.setdefault(reg, []).append(dev_id)
+        if modbus_host is not None:
+            self.modbus = modbus_host.add_endpoint(
+                host=scada_config.get("ip", "127.0.0.1"),
+                port=scada_config.get("port", 5200),
+                unit_id=unit_id
+            )
+        else:
+            self.modbus = ModbusServerWrapper(
+                host=scada_config.get("ip", "127.0.0.1"),
+                port=scada_config.get("port", 5200),
+                initial_registers=self.register_map
+            )
         self.modbus.set_update_hook(self.on_register_write)
         self.modbus.start()
 
@@ -58,6 +77,9 @@ class ModbusSCADA(SCADA):
     def push_data_to_registers(self):
         """
         Writes current state of mapped simulation objects to Modbus holding registers.
+
+        Uses the server's internal write path, so only registers whose value
+        changed are touched and the external-write hook is not triggered.
         """
         for dev_id, reg in self.register_map.items():
             sim_obj = self.graph.nodes.get(dev_id)
@@ -73,7 +95,7 @@ class ModbusSCADA(SCADA):
             else:
                 value = 0
 
-            self.modbus.write_register(reg, value)
+            self.modbus.sync_register(reg, value)
 
     def on_register_write(self, address, value):
         """
@@ -84,19 +106,18 @@ class ModbusSCADA(SCADA):
             address (int): The register address that was written.
             value (int or float): The new value written to the register.
         """
-        for dev_id, reg in self.register_map.items():
-            if reg == address:
-                sim_obj = self.graph.nodes.get(dev_id)
-                if not sim_obj:
-                    continue
-
-                if hasattr(sim_obj, "set_state"):
-                    sim_obj.set_state("open" if value == 1 else "closed")
-                elif hasattr(sim_obj, "set_rate"):
-                    sim_obj.set_rate(value)
-                elif hasattr(sim_obj, "current_volume"):
-                    sim_obj.current_volume = float(value)
-                elif hasattr(sim_obj, "max_capacity"):
-                    sim_obj.max_capacity = float(value)
-
-                print(f"[MODBUS-SCADA] Overwrote {dev_id} at register {address} with value {value}")
+        for dev_id in self._devices_by_register.get(address, ()):
+            sim_obj = self.graph.nodes.get(dev_id)
+            if not sim_obj:
+                continue
+
+            if hasattr(sim_obj, "set_state"):
+                sim_obj.set_state("open" if value == 1 else "closed")
+            elif hasattr(sim_obj, "set_rate"):
+                sim_obj.set_rate(value)
+            elif hasattr(sim_obj, "current_volume"):
+                sim_obj.current_volume = float(value)
+            elif hasattr(sim_obj, "max_capacity"):
+                sim_obj.max_capacity = float(value)
+
+            logger.info("[MODBUS-SCADA] Overwrote %s at register %s with value %s", dev_id, address, value)
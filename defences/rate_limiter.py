@@ -1,30 +1,206 @@
+"""
+MQTT Rate Limiting
+
+This module provides the rate limiters used on the publish path of the MQTT
+interfaces. Every check runs in O(1) time without allocating:
+
+  - `RateLimiter` is an exact sliding-window limiter backed by a fixed ring of
+    the last N accepted timestamps.
+  - `TokenBucket` refills at a constant rate and allows bursts up to its size.
+  - `KeyedRateLimiter` keeps one of the above per topic, per client ID, or per
+    (client ID, topic) pair, so a single chatty topic cannot starve the others.
+
+The limiters take no locks. A limiter shared between threads must be checked
+under the caller's own lock (see MQTTConnectionManager.allow_message).
+
+Layout configuration (optional top-level "rate_limit" key):
+
+    "rate_limit": {
+        "algorithm": "window",
+        "rate": 10,
+        "burst": 10,
+        "scope": "client"
+    }
+
+Classes:
+    RateLimiter - Sliding-window limiter over a fixed timestamp ring.
+    TokenBucket - Token-bucket limiter with burst capacity.
+    KeyedRateLimiter - One limiter per topic and/or client ID.
+
+Functions:
+    build_rate_limiter - Creates a limiter from a "rate_limit" configuration.
+"""
+
 import time
+from array import array
+
+ALGORITHMS = ("window", "token_bucket")
+SCOPES = ("global", "client", "topic", "client_topic")
+
 
 class RateLimiter:
     """
     Implements a rate-limiting mechanism to prevent DoS attacks.
+
+    Accepts at most `max_messages_per_second` messages in any sliding window of
+    `window` seconds. The timestamps of the last accepted messages are kept in a
+    fixed ring: a new message is allowed exactly when the oldest of them has
+    left the window, so each check is a single comparison.
     """
-    def __init__(self, max_messages_per_second=10):
+
+    def __init__(self, max_messages_per_second=10, window=1.0, clock=time.monotonic):
         """
         Args:
-            max_messages_per_second (int): Maximum allowed messages per second.
+            max_messages_per_second (int): Maximum allowed messages per window.
+            window (float): Length of the sliding window in seconds.
+            clock (callable): Time source returning seconds.
         """
         self.max_messages_per_second = max_messages_per_second
-        self.message_timestamps = []
+        self.window = window
+        self._clock = clock
+        self._ring = array('d', [float("-inf")] * max(int(max_messages_per_second), 1))
+        self._head = 0  # index of the oldest accepted timestamp
 
-    def allow_message(self):
+    def allow_message(self, topic=None, client_id=None):
         """
         Checks if a new message can be processed based on the rate limit.
 
+        Args:
+            topic (str, optional): Ignored; accepted for API compatibility with `KeyedRateLimiter`.
+            client_id (str, optional): Ignored; see above.
+
         Returns:
             bool: True if the message is allowed, False otherwise.
         """
-        current_time = time.time()
-        self.message_timestamps = [
-            ts for ts in self.message_timestamps if current_time - ts < 1
-        ]
+        if self.max_messages_per_second <= 0:
+            return False
+        now = self._clock()
+        if now - self._ring[self._head] < self.window:
+            return False
+        self._ring[self._head] = now
+        self._head = (self._head + 1) % len(self._ring)
+        return True
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `burst`; each message
+    consumes one token. Unlike the sliding window, short bursts above the rate
+    are allowed as long as the long-term average stays below it.
+    """
+
+    def __init__(self, rate=10, burst=None, clock=time.monotonic):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            burst (float, optional): Bucket size. Defaults to `rate`.
+            clock (callable): Time source returning seconds.
+        """
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else rate)
+        self._clock = clock
+        self._tokens = self.burst
+        self._last = clock()
+
+    def allow_message(self, topic=None, client_id=None):
+        """
+        Takes one token if available.
+
+        Args:
+            topic (str, optional): Ignored; accepted for API compatibility with `KeyedRateLimiter`.
+            client_id (str, optional): Ignored; see above.
+
+        Returns:
+            bool: True if the message is allowed, False otherwise.
+        """
+        now = self._clock()
+        tokens = self._tokens + (now - self._last) * self.rate
+        self._last = now
+        if tokens > self.burst:
+            tokens = self.burst
+        if tokens < 1.0:
+            self._tokens = tokens
+            return False
+        self._tokens = tokens - 1.0
+        return True
+
+
+class KeyedRateLimiter:
+    """
+    Keeps a separate limiter per topic, per client ID, or per (client ID, topic).
+
+    Limiters are created on first use of a key. The number of keys is bounded
+    by the topics and clients of the layout.
+    """
+
+    def __init__(self, factory, scope="topic"):
+        """
+        Args:
+            factory (callable): Called without arguments to create each key's limiter.
+            scope (str): "client", "topic" or "client_topic".
+        """
+        if scope not in SCOPES[1:]:
+            raise ValueError(f"Unknown rate limit scope: {scope}")
+        self.scope = scope
+        self._factory = factory
+        self._limiters = {}
+
+    def _key(self, topic, client_id):
+        if self.scope == "topic":
+            return topic
+        if self.scope == "client":
+            return client_id
+        return (client_id, topic)
+
+    def allow_message(self, topic=None, client_id=None):
+        """
+        Checks the limiter of the message's key.
+
+        Args:
+            topic (str, optional): Topic of the message.
+            client_id (str, optional): Client publishing the message.
+
+        Returns:
+            bool: True if the message is allowed, False otherwise.
+        """
+        key = self._key(topic, client_id)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._limiters[key] = self._factory()
+        return limiter.allow_message()
+
+
+def build_rate_limiter(config=None, clock=time.monotonic):
+    """
+    Creates a limiter from a "rate_limit" configuration.
+
+    Args:
+        config (dict, optional): Keys "algorithm" ("window" or "token_bucket"),
+            "rate" (messages per second, default 10), "burst" (token bucket only)
+            and "scope" ("global", "client", "topic" or "client_topic"; default "global").
+        clock (callable): Time source passed to the limiters.
+
+    Returns:
+        RateLimiter, TokenBucket or KeyedRateLimiter: The configured limiter.
+    """
+    config = config or {}
+    algorithm = config.get("algorithm", "window")
+    rate = config.get("rate", 10)
+    scope = config.get("scope", "global")
+
+    if algorithm == "window":
+        def factory():
+            return RateLimiter(max_messages_per_second=rate, clock=clock)
+    elif algorithm == "token_bucket":
+        burst = config.get("burst")
+
+        def factory():
+            return TokenBucket(rate=rate, burst=burst, clock=clock)
+    else:
+        raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
 
-        if len(self.message_timestamps) < self.max_messages_per_second:
-            self.message_timestamps.append(current_time)
-            return True
-        return False
\ No newline at end of file
+    if scope == "global":
+        return factory()
+    return KeyedRateLimiter(factory, scope=scope)
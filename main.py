@@ -8,11 +8,21 @@ Functions:
     launch_flask() - Launches the Flask dashboard in a background thread.
     start_mqtt_server() - Starts the MQTT broker as a subprocess.
     wait_for_broker() - Waits for the MQTT broker to become available.
+    configure_logging() - Starts the queued logging subsystem from the command-line options.
+    rate_limit_overrides() - Collects the MQTT rate limit settings given on the command line.
+    run_headless() - Runs the simulation without broker, UI or Modbus, as fast as possible.
+    run_ensemble_cli() - Runs a parallel Monte Carlo ensemble of perturbed headless simulations.
     main() - Orchestrates the full simulation launch sequence.
 """
 
 from process_sim.layout_parser import load_layout
 from process_sim.simulation_runner import SimulationThread
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from process_sim.ensemble import run_ensemble
+from process_sim.logging_config import setup_logging, HIGH_FREQUENCY_LOGGERS
+from process_sim.shared_state import SharedStateWriter, ENV_VAR as SHARED_STATE_ENV_VAR
+from process_sim.tick_metrics import TickMetrics, SUMMARY_SECONDS
+import json
 from scada_ui.services import sim_ref
 import os
 import sys
@@ -23,34 +33,7 @@ import subprocess
 import threading
 import argparse
 from attacks.Replay import capture_and_replay
-
-# Ensure the 'data' directory exists
-log_dir = os.path.join(os.path.dirname(__file__), "data")
-os.makedirs(log_dir, exist_ok=True)
-
-# Set full path to log file inside data/
-log_path = os.path.join(log_dir, "logs.txt")
-
-# Reset logging if needed
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# Setup logging to file
-logging.basicConfig(
-    level=logging.INFO,
-    filename=log_path,
-    filemode="w",
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
-
-# Optional: Console output to debug
-console = logging.StreamHandler()
-console.setLevel(logging.DEBUG)
-console.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-logging.getLogger().addHandler(console)
-
-# Test logging
-logging.info("Logger initialized successfully")
+from attacks.replay_engine import parse_speed
 
 """
     Parses command-line arguments using argparse library
@@ -60,21 +43,51 @@ def parse_arguments():
 
     parser.add_argument("-r", "--replay", action="store_true", help="Enable replay attack") # Replay attack
     parser.add_argument("--replay-time", type=int, default=10, help="Sets the replay attack's duration (ONLY USE WITH REPLAY ARGUMENT)")
+    parser.add_argument("--replay-speed", type=parse_speed, default="1",
+                        help="Replay time multiplier (0.1 to 1000) or 'max' (ONLY USE WITH REPLAY ARGUMENT)")
     parser.add_argument("-d", "--debug", action="store_true", help="Enables debug mode")
+    parser.add_argument("--layout", default="Process_sim.json", help="Path to the process layout file")
+    parser.add_argument("--interval", type=float, default=1.0, help="Simulated seconds per tick")
+    parser.add_argument("--vectorized", action="store_true", help="Use the vectorized stepping engine")
+    parser.add_argument("--scan-mode", choices=["cyclic", "event"], help="Override the PLC/SCADA scan mode ('event' only re-evaluates rules whose inputs changed)")
+    parser.add_argument("--modbus-mode", choices=["threaded", "async", "shared"], help="How Modbus endpoints are hosted (default: layout setting or 'threaded')")
+    parser.add_argument("--rate-limit", type=float, help="MQTT publish limit in messages/s (overrides the layout's rate_limit)")
+    parser.add_argument("--rate-limit-algorithm", choices=["window", "token_bucket"], help="Rate limiting algorithm (default: window)")
+    parser.add_argument("--rate-limit-scope", choices=["global", "client", "topic", "client_topic"], help="Key of the rate limit buckets (default: client)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], help="Root log level (-d implies DEBUG)")
+    parser.add_argument("--log-sample", type=int, default=1, help="Keep 1 of every N per-tick transfer/publish log records")
+    parser.add_argument("--metrics-interval", type=float, default=SUMMARY_SECONDS, help="Seconds between tick metric summaries in the log (0 disables)")
+    parser.add_argument("--headless", action="store_true", help="Run without broker, dashboard or Modbus, as fast as possible")
+    parser.add_argument("--ticks", type=int, help="Number of ticks to run (ONLY USE WITH HEADLESS ARGUMENT)")
+    parser.add_argument("--duration", type=float, help="Simulated seconds to run (ONLY USE WITH HEADLESS ARGUMENT)")
+    parser.add_argument("--ensemble", type=int, metavar="N", help="Run N perturbed headless copies in parallel (uses --ticks/--duration)")
+    parser.add_argument("--spread", type=float, default=0.1, help="Relative perturbation of ensemble parameters (ONLY USE WITH ENSEMBLE ARGUMENT)")
+    parser.add_argument("--seed", type=int, help="Master random seed (ONLY USE WITH ENSEMBLE ARGUMENT)")
+    parser.add_argument("--workers", type=int, help="Process pool size (ONLY USE WITH ENSEMBLE ARGUMENT)")
+    parser.add_argument("--output", help="Write ensemble results to this JSON file (ONLY USE WITH ENSEMBLE ARGUMENT)")
 
     return parser.parse_args()
 
-def launch_flask():
+def launch_flask(layout_path="Process_sim.json", shared_state_name=None):
     """
     Launch the Flask dashboard UI in a background subprocess.
 
     Assumes Flask app is located at `scada_ui/app.py`.
+
+    Args:
+        layout_path (str): Layout file shown by the dashboard.
+        shared_state_name (str, optional): Shared-memory segment with the live state,
+            read by the dashboard instead of subscribing to MQTT.
     """
+    env = {**os.environ, "SECURESIM_LAYOUT": layout_path}
+    if shared_state_name:
+        env[SHARED_STATE_ENV_VAR] = shared_state_name
 
     subprocess.Popen(
         ["python", "scada_ui/app.py"],
         stdout=subprocess.DEVNULL,
-        stderr=subprocess.STDOUT
+        stderr=subprocess.STDOUT,
+        env=env
     )
     print("[MAIN] Flask dashboard launched at http://localhost:5000")
 
@@ -93,7 +106,7 @@ def start_mqtt_server():
         )
         return process
     except Exception as e:
-        logging.error(f"Failed to start MQTT server: {e}")
+        logging.error("Failed to start MQTT server: %s", e)
         return None
 
 def wait_for_broker(host="127.0.0.1", port=1883, timeout=5.0):
@@ -120,6 +133,79 @@ def wait_for_broker(host="127.0.0.1", port=1883, timeout=5.0):
     return False
 
 
+def configure_logging(args):
+    """
+    Starts the queued logging subsystem with the levels and sampling given on the command line.
+    """
+    level = "DEBUG" if args.debug else args.log_level
+    sample = {name: args.log_sample for name in HIGH_FREQUENCY_LOGGERS} if args.log_sample > 1 else None
+    setup_logging(level=level, sample=sample)
+    logging.info("Logger initialized successfully")
+
+
+def rate_limit_overrides(args):
+    """
+    Returns the rate limit settings given on the command line.
+    """
+    overrides = {
+        "rate": args.rate_limit,
+        "algorithm": args.rate_limit_algorithm,
+        "scope": args.rate_limit_scope,
+    }
+    return {key: value for key, value in overrides.items() if value is not None}
+
+
+def run_headless(args):
+    """
+    Runs the simulation headless for a fixed number of ticks or simulated duration
+    and prints the achieved tick rate. No broker, Flask or Modbus servers are started.
+    """
+    if args.ticks is None and args.duration is None:
+        print("[MAIN] Headless mode needs --ticks or --duration.")
+        return
+
+    # Keep per-transfer logging out of the way unless debugging
+    if not args.debug:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    graph = load_layout(args.layout, vectorized=args.vectorized, mqtt_factory=OfflineMQTTInterface)
+    sim = SimulationThread(graph, interval=args.interval, headless=True, scan_mode=args.scan_mode,
+                           metrics=TickMetrics())
+    report = sim.run_headless(ticks=args.ticks, duration=args.duration)
+
+    print(f"[MAIN] Simulated {report['ticks']} ticks ({report['sim_seconds']:.0f}s simulated) "
+          f"in {report['wall_seconds']:.3f}s wall clock: {report['ticks_per_sec']:.1f} ticks/s")
+    print(f"[MAIN] Rules evaluated: {report['rules_evaluated']}, skipped: {report['rules_skipped']}")
+    phases = ", ".join(f"{phase} {ms:.3f}" for phase, ms in report["metrics"]["phase_mean_ms"].items())
+    print(f"[MAIN] Mean tick phases (ms): {phases}")
+
+
+def run_ensemble_cli(args):
+    """
+    Runs a Monte Carlo ensemble of perturbed headless simulations across all cores
+    and prints the merged statistics.
+    """
+    if args.ticks is None and args.duration is None:
+        print("[MAIN] Ensemble mode needs --ticks or --duration.")
+        return
+
+    ticks = args.ticks
+    if args.duration is not None:
+        duration_ticks = int(round(args.duration / args.interval))
+        ticks = duration_ticks if ticks is None else min(ticks, duration_ticks)
+
+    start = time.time()
+    merged, runs = run_ensemble(args.layout, args.ensemble, ticks, spread=args.spread, seed=args.seed,
+                                workers=args.workers, interval=args.interval, vectorized=args.vectorized)
+    print(f"[MAIN] Ensemble of {args.ensemble} runs x {ticks} ticks finished in {time.time() - start:.2f}s")
+    print(json.dumps(merged, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"summary": merged, "runs": runs}, f, indent=2)
+        print(f"[MAIN] Results written to {args.output}")
+
+
 def main(args):
     """
     Main simulation launcher. This function:
@@ -130,10 +216,15 @@ def main(args):
       5. Launches the Flask dashboard
       6. Waits for keyboard interrupt to shut down
     """
-  
-    # Debug level
-    if args.debug:
-        logging.getLogger().setLevel(logging.DEBUG)
+    configure_logging(args)
+
+    if args.ensemble:
+        run_ensemble_cli(args)
+        return
+
+    if args.headless:
+        run_headless(args)
+        return
 
     # Step 1: Start MQTT Broker subprocess
     mqtt_process = start_mqtt_server()
@@ -155,25 +246,28 @@ def main(args):
     # then that data can simply be used
     if args.replay:
         logging.info("[MAIN] Starting replay attack...")
-        threading.Thread(target=lambda: capture_and_replay(capture_time=args.replay_time), daemon=True).start()
+        threading.Thread(target=lambda: capture_and_replay(capture_time=args.replay_time, speed=args.replay_speed), daemon=True).start()
 
     # Step 3: Load layout and start simulation
     print("[MAIN] Loading layout...")
     try:
-        graph = load_layout("Process_sim.json")
+        graph = load_layout(args.layout, vectorized=args.vectorized, rate_limit=rate_limit_overrides(args))
         sim_ref.graph = graph  # Connect live simulation graph to UI
     except Exception as e:
-        logging.error(f"[MAIN] Failed to load layout: {e}")
+        logging.error("[MAIN] Failed to load layout: %s", e)
         mqtt_process.terminate()
         return
 
     print("[MAIN] Starting simulation...")
-    sim_thread = SimulationThread(graph, interval=1.0, debug=False)
+    shared_state = SharedStateWriter(graph, metrics=True)  # Live state and tick metrics read by the dashboard process
+    sim_thread = SimulationThread(graph, interval=args.interval, debug=False, scan_mode=args.scan_mode,
+                                  modbus_mode=args.modbus_mode, shared_state=shared_state,
+                                  metrics=shared_state.metrics, metrics_log_interval=args.metrics_interval)
     sim_thread.start()
 
     # Step 4: Launch Flask dashboard
     print("[MAIN] Launching Flask dashboard...")
-    threading.Thread(target=launch_flask, daemon=True).start()
+    threading.Thread(target=launch_flask, args=(args.layout, shared_state.name), daemon=True).start()
 
     # Step 5: Wait for shutdown
     try:
@@ -183,6 +277,7 @@ def main(args):
         logging.info("[MAIN] Stopping simulation...")
         sim_thread.stop()
         sim_thread.join()
+        shared_state.close()
         mqtt_process.terminate()
         logging.info("[MAIN] MQTT broker stopped.")
 
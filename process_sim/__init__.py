@@ -10,7 +10,7 @@ from .splitter import Splitter
 from .line import Line
 
 # Layout loading and graph structure
-from .layout_parser import load_layout, ProcessGraph
+from .layout_parser import load_layout, build_graph, ProcessGraph
 
 # Visualization tools
 from .graph_visualizer import render_process_graph, render_live_graph
@@ -20,5 +20,10 @@ from .simulation_runner import SimulationThread
 
 # MQTT interface
 from .interfaces.mqtt_interface import (
-    MQTTInterface
+    MQTTInterface,
+    OfflineMQTTInterface
+)
+from .interfaces.mqtt_manager import (
+    MQTTConnectionManager,
+    SharedMQTTInterface
 )
@@ -0,0 +1,207 @@
+"""
+Monte Carlo Ensemble Runner
+
+This module runs many perturbed copies of a process layout in parallel to support
+sensitivity sweeps. The layout is parsed once, each ensemble member gets its own
+randomly perturbed copy (initial volumes, pump flow rates and PLC/SCADA tank
+thresholds), and the members are simulated headless across a process pool.
+Per-run summaries are merged into ensemble statistics.
+
+Functions:
+    perturb_layout - Returns a randomly perturbed copy of a layout dictionary.
+    run_member - Runs one headless simulation and summarizes it.
+    run_ensemble - Fans perturbed runs out over a process pool and merges the results.
+    merge_summaries - Aggregates per-run summaries into ensemble statistics.
+"""
+
+import copy
+import json
+import logging
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from process_sim.layout_parser import build_graph
+from process_sim.simulation_runner import SimulationThread
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from process_sim.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def _scale(value, rng, spread):
+    """Multiplies a value by a uniform factor in [1 - spread, 1 + spread]."""
+    return value * rng.uniform(1.0 - spread, 1.0 + spread)
+
+
+def perturb_layout(layout, rng, spread=0.1):
+    """
+    Returns a perturbed deep copy of a layout.
+
+    Tank initial volumes, pump flow rates and trigger values of PLC/SCADA rules
+    that read a tank register are each scaled by an independent uniform factor.
+    Rules on pump state registers (0/1) are left untouched.
+
+    Args:
+        layout (dict): Parsed layout dictionary.
+        rng (random.Random): Random number generator for this member.
+        spread (float): Maximum relative perturbation (0.1 = +/-10%).
+
+    Returns:
+        dict: The perturbed layout.
+    """
+    layout = copy.deepcopy(layout)
+    node_types = {node["id"]: node["type"] for node in layout["nodes"]}
+
+    for node in layout["nodes"]:
+        if node["type"] == "Tank":
+            capacity = node.get("max_capacity", 1000)
+            initial = _scale(node.get("initial_capacity", 0), rng, spread)
+            node["initial_capacity"] = min(max(initial, 0.0), capacity)
+        elif node["type"] == "Pump":
+            node["flow_rate"] = max(_scale(node.get("flow_rate", 10), rng, spread), 0.0)
+
+    def perturb_actions(actions, register_types):
+        for action in actions:
+            trigger = action["trigger"]
+            if register_types.get(trigger["register"]) == "Tank":
+                trigger["value"] = _scale(trigger["value"], rng, spread)
+
+    for plc in layout.get("plcs", []):
+        register_types = {dev["plc_input_register"]: node_types.get(dev["id"]) for dev in plc.get("devices", [])}
+        perturb_actions(plc.get("actions", []), register_types)
+
+    scada = layout.get("scada") or {}
+    register_types = {reg: node_types.get(dev_id) for dev_id, reg in scada.get("register_map", {}).items()}
+    perturb_actions(scada.get("actions", []), register_types)
+
+    return layout
+
+
+def run_member(layout, ticks, interval=1.0, vectorized=False):
+    """
+    Runs one headless simulation and summarizes it.
+
+    Args:
+        layout (dict): Layout for this member.
+        ticks (int): Number of ticks to simulate.
+        interval (float): Simulated seconds per tick.
+        vectorized (bool): Use the vectorized stepping engine.
+
+    Returns:
+        dict: Overflow volume and time-to-full (simulated seconds, or None) per
+              tank, duty cycle per pump, and the achieved ticks per second.
+    """
+    graph = build_graph(layout, vectorized=vectorized, mqtt_factory=OfflineMQTTInterface)
+    sim = SimulationThread(graph, interval=interval, headless=True)
+
+    tanks = [node for node in graph.nodes.values() if hasattr(node, "current_volume")]
+    pumps = [node for node in graph.nodes.values() if hasattr(node, "is_open")]
+    time_to_full = {tank.id: None for tank in tanks}
+    open_ticks = {pump.id: 0 for pump in pumps}
+
+    # Observe every tick so each state is seen after its PLC scan
+    start_time = time.perf_counter()
+    for _ in range(ticks):
+        sim.step()
+        for tank in tanks:
+            if time_to_full[tank.id] is None and tank.current_volume >= tank.max_capacity:
+                time_to_full[tank.id] = sim.sim_time
+        for pump in pumps:
+            if pump.is_open:
+                open_ticks[pump.id] += 1
+
+    wall_time = time.perf_counter() - start_time
+
+    return {
+        "overflow": {tank.id: tank.total_overflow for tank in tanks},
+        "time_to_full": time_to_full,
+        "duty_cycle": {pump_id: count / ticks if ticks else 0.0 for pump_id, count in open_ticks.items()},
+        "ticks_per_sec": ticks / wall_time if wall_time > 0 else float("inf"),
+    }
+
+
+def _run_indexed(args):
+    """Process pool entry point: runs one member and tags the result."""
+    index, seed, layout, ticks, interval, vectorized = args
+    summary = run_member(layout, ticks, interval=interval, vectorized=vectorized)
+    summary["run"] = index
+    summary["seed"] = seed
+    return summary
+
+
+def _quiet_worker():
+    """Keeps per-transfer logging out of worker processes (warnings go to the console)."""
+    setup_logging(log_path=None, level=logging.WARNING)
+
+
+def _stats(values):
+    """Returns mean/min/max of a list of numbers."""
+    return {"mean": sum(values) / len(values), "min": min(values), "max": max(values)}
+
+
+def merge_summaries(summaries):
+    """
+    Aggregates per-run summaries into ensemble statistics.
+
+    Args:
+        summaries (list): Results of `run_member`.
+
+    Returns:
+        dict: Per-tank overflow statistics, per-tank fraction of runs that filled
+              up together with time-to-full statistics over those runs, and
+              per-pump duty cycle statistics.
+    """
+    merged = {"runs": len(summaries), "overflow": {}, "time_to_full": {}, "duty_cycle": {}}
+    if not summaries:
+        return merged
+
+    for tank_id in summaries[0]["overflow"]:
+        merged["overflow"][tank_id] = _stats([s["overflow"][tank_id] for s in summaries])
+
+        times = [s["time_to_full"][tank_id] for s in summaries if s["time_to_full"][tank_id] is not None]
+        entry = {"filled_fraction": len(times) / len(summaries)}
+        if times:
+            entry.update(_stats(times))
+        merged["time_to_full"][tank_id] = entry
+
+    for pump_id in summaries[0]["duty_cycle"]:
+        merged["duty_cycle"][pump_id] = _stats([s["duty_cycle"][pump_id] for s in summaries])
+
+    merged["overflow_total"] = _stats([sum(s["overflow"].values()) for s in summaries])
+    return merged
+
+
+def run_ensemble(layout_path, runs, ticks, spread=0.1, seed=None, workers=None,
+                 interval=1.0, vectorized=False):
+    """
+    Runs `runs` perturbed copies of a layout in parallel and merges their summaries.
+
+    Args:
+        layout_path (str): Path to the layout JSON file (parsed once).
+        runs (int): Number of ensemble members.
+        ticks (int): Ticks to simulate per member.
+        spread (float): Maximum relative perturbation of each parameter.
+        seed (int, optional): Master seed; members are reproducible from it.
+        workers (int, optional): Process pool size (defaults to the CPU count).
+        interval (float): Simulated seconds per tick.
+        vectorized (bool): Use the vectorized stepping engine.
+
+    Returns:
+        tuple: (merged statistics dict, list of per-run summaries)
+    """
+    with open(layout_path, 'r') as f:
+        layout = json.load(f)
+
+    master = random.Random(seed)
+    jobs = []
+    for index in range(runs):
+        member_seed = master.randrange(2 ** 32)
+        member_layout = perturb_layout(layout, random.Random(member_seed), spread)
+        jobs.append((index, member_seed, member_layout, ticks, interval, vectorized))
+
+    logger.info("[ENSEMBLE] Running %s members of %s ticks...", runs, ticks)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker) as pool:
+        summaries = list(pool.map(_run_indexed, jobs))
+
+    return merge_summaries(summaries), summaries
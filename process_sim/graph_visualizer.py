@@ -8,7 +8,7 @@ live data such as rates, volumes, and state.
 Functions:
     render_process_graph - Displays a labeled, static process graph layout.
     render_live_graph - Continuously updates the graph with live simulation values.
-    render_process_graph_to_file - Saves the current live graph view as an image file.
+    render_process_graph_to_file - Saves the static graph view as an image file or buffer.
 """
 
 import matplotlib
@@ -104,7 +104,7 @@ def render_process_graph_to_file(graph, output_path="static/img/graph.png"):
 
     Args:
         graph (ProcessGraph): The simulation graph with node and edge layout.
-        output_path (str): File path to save the image.
+        output_path (str or file-like): File path or binary buffer to save the PNG to.
     """
     G = nx.DiGraph()
     pos = {}
@@ -127,5 +127,5 @@ def render_process_graph_to_file(graph, output_path="static/img/graph.png"):
     nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels)
     plt.title("Static Process Layout")
     fig.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
\ No newline at end of file
+    plt.savefig(output_path, format="png")
+    plt.close(fig)
\ No newline at end of file
@@ -6,39 +6,16 @@ It supports asynchronous publishing, topic subscription, and simulated testing.
 
 Classes:
     MQTTInterface - Manages connection to a broker, topic subscriptions, and message handling.
+    OfflineMQTTInterface - Broker-free stand-in used by headless simulation runs.
 """
 
 import asyncio
 import threading
 import logging
-import os
 from gmqtt import Client as MQTTClient
-from defences.rate_limiter import RateLimiter
+from defences.rate_limiter import build_rate_limiter
 
-# Ensure the 'data' directory exists
-log_dir = os.path.join(os.path.dirname(__file__), "data")
-os.makedirs(log_dir, exist_ok=True)
-
-# Set full path to log file inside data/
-log_path = os.path.join(log_dir, "logs.txt")
-
-# Reset logging if needed
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# Setup logging to file
-logging.basicConfig(
-    level=logging.INFO,
-    filename=log_path,
-    filemode="w",
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
-
-# Optional: Console output to debug
-console = logging.StreamHandler()
-console.setLevel(logging.DEBUG)
-console.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-logging.getLogger().addHandler(console)
+logger = logging.getLogger(__name__)
 
 class MQTTInterface:
     """
@@ -51,7 +28,8 @@ class MQTTInterface:
       - Support for simulated message injection (for testing)
     """
 
-    def __init__(self, broker="127.0.0.1", port=1883, client_id="process_sim_client", token=None):
+    def __init__(self, broker="127.0.0.1", port=1883, client_id="process_sim_client", token=None,
+                 rate_limit=None):
         """
         Initializes the MQTT client and starts the background event loop.
 
@@ -60,8 +38,10 @@ class MQTTInterface:
             port (int): Port number for MQTT (default: 1883).
             client_id (str): Unique client identifier.
             token (str): Optional token for authentication.
+            rate_limit (dict, optional): Publish rate limit configuration (see
+                `build_rate_limiter`). Defaults to 10 messages/s for this client.
         """
-        self.rate_limiter = RateLimiter(max_messages_per_second=10)
+        self.rate_limiter = build_rate_limiter(rate_limit)
         self._broker = broker
         self._port = port
         self._client_id = client_id
@@ -97,11 +77,11 @@ class MQTTInterface:
         try:
             await self._client.connect(self._broker, self._port)
             self._connected = True
-            logging.info(f"[MQTT] Connected to {self._broker}:{self._port} as {self._client_id}")
+            logger.info("[MQTT] Connected to %s:%s as %s", self._broker, self._port, self._client_id)
             while True:
                 await asyncio.sleep(1)
         except Exception as e:
-            logging.info(f"[MQTT-ERR] Failed to connect or lost connection: {e}")
+            logger.info("[MQTT-ERR] Failed to connect or lost connection: %s", e)
             self._connected = False
 
     def publish(self, topic, message, qos=0, retain=False):
@@ -113,17 +93,22 @@ class MQTTInterface:
             message (str): The message to publish.
             qos (int): Quality of Service level (default: 0).
             retain (bool): Whether to retain the message (default: False).
+
+        Returns:
+            bool: True if the message was handed to the client, False if it was
+            dropped by the rate limiter or the client is not connected.
         """
         # Toggle rate limiting
-        if not self.rate_limiter.allow_message():
-            logging.info(f"[MQTT-PUB] Rate limit exceeded. Dropping message to {topic}: {message}")
-            return
+        if not self.rate_limiter.allow_message(topic, self._client_id):
+            logger.info("[MQTT-PUB] Rate limit exceeded. Dropping message to %s: %s", topic, message)
+            return False
 
         if self._connected:
             self._client.publish(topic, message, qos, retain)
-            logging.info(f"[MQTT-PUB] Published to {topic}: {message}")
-        else:
-            logging.info("[MQTT-PUB] Cannot publish, client not connected.")
+            logger.info("[MQTT-PUB] Published to %s: %s", topic, message)
+            return True
+        logger.info("[MQTT-PUB] Cannot publish, client not connected.")
+        return False
 
     def subscribe(self, topic, callback):
         """
@@ -136,22 +121,22 @@ class MQTTInterface:
         self._subscribers[topic] = callback
         if self._connected:
             self._loop.call_soon_threadsafe(self._client.subscribe, topic)
-        logging.info(f"[MQTT-SUB] Subscribed to: {topic}")
+        logger.info("[MQTT-SUB] Subscribed to: %s", topic)
 
     def _on_connect(self, client, flags, rc, properties):
         """Handler triggered when the client connects to the broker."""
-        logging.info(f"[MQTT] Connected with flags: {flags}, rc: {rc}")
+        logger.info("[MQTT] Connected with flags: %s, rc: %s", flags, rc)
         for topic in self._subscribers:
             self._loop.call_soon_threadsafe(client.subscribe, topic)
 
     def _on_disconnect(self, client, packet, exc=None):
         """Handler triggered when the client disconnects from the broker."""
         self._connected = False
-        logging.info(f"[MQTT] Disconnected")
+        logger.info("[MQTT] Disconnected")
 
     def _on_subscribe(self, client, mid, qos, properties):
         """Handler triggered after a successful subscription."""
-        logging.info(f"[MQTT] Subscribed successfully")
+        logger.info("[MQTT] Subscribed successfully")
 
     def _on_message(self, client, topic, payload, qos, properties):
         """
@@ -162,14 +147,14 @@ class MQTTInterface:
             payload (bytes or str): Message content.
         """
         message = payload.decode() if isinstance(payload, bytes) else payload
-        logging.info(f"[MQTT-RX] {topic}: {message}")
+        logger.info("[MQTT-RX] %s: %s", topic, message)
         if topic in self._subscribers:
             try:
                 self._subscribers[topic](message)
             except Exception as e:
-                logging.info(f"[MQTT-ERR] Error in subscriber callback: {e}")
+                logger.info("[MQTT-ERR] Error in subscriber callback: %s", e)
         else:
-            logging.info(f"[MQTT-WARN] No subscriber for topic: {topic}")
+            logger.info("[MQTT-WARN] No subscriber for topic: %s", topic)
 
     def simulate_message(self, topic, payload):
         """
@@ -180,8 +165,54 @@ class MQTTInterface:
             topic (str): Target topic.
             payload (str): Simulated payload.
         """
-        logging.info(f"[MQTT-SIM] {topic}: {payload}")
+        logger.info("[MQTT-SIM] %s: %s", topic, payload)
         if topic in self._subscribers:
             self._subscribers[topic](payload)
         else:
-            logging.info(f"[MQTT-SIM-WARN] No subscriber for topic: {topic}")
+            logger.info("[MQTT-SIM-WARN] No subscriber for topic: %s", topic)
+
+
+class OfflineMQTTInterface:
+    """
+    Drop-in replacement for `MQTTInterface` that never opens a connection.
+
+    Publishes are discarded and subscriptions are only recorded, so callbacks can
+    still be driven through `simulate_message`. Used for headless runs where no
+    broker is available and no background threads should be started.
+    """
+
+    def __init__(self, broker="127.0.0.1", port=1883, client_id="process_sim_client", token=None):
+        """
+        Args:
+            broker (str): Ignored, kept for signature compatibility.
+            port (int): Ignored, kept for signature compatibility.
+            client_id (str): Client identifier (used only for logging).
+            token (str): Ignored, kept for signature compatibility.
+        """
+        self._client_id = client_id
+        self._connected = False
+        self._subscribers = {}
+
+    def publish(self, topic, message, qos=0, retain=False):
+        """
+        Discards the message.
+
+        Returns:
+            bool: Always False, nothing is sent.
+        """
+        return False
+
+    def subscribe(self, topic, callback):
+        """Records the callback for later use by `simulate_message`."""
+        self._subscribers[topic] = callback
+
+    def simulate_message(self, topic, payload):
+        """
+        Delivers a message straight to the registered topic handler.
+
+        Args:
+            topic (str): Target topic.
+            payload (str): Simulated payload.
+        """
+        if topic in self._subscribers:
+            self._subscribers[topic](payload)
@@ -0,0 +1,250 @@
+"""
+Shared MQTT Connection Manager
+
+This module multiplexes many logical MQTT interfaces over a single broker
+connection. Instead of every tank, pump and controller starting its own thread,
+asyncio loop and TCP connection, all components of a graph share one client
+and one event loop. Each component still gets its own handle with the familiar
+`publish`/`subscribe` API and its own client ID. Publishes are checked against one
+limiter owned by the manager, keyed per client ID by default (see defences.rate_limiter).
+Handles publish from the simulation, PLC and SCADA threads and from the MQTT loop,
+so every check goes through `MQTTConnectionManager.allow_message`, which holds a lock.
+
+Classes:
+    MQTTConnectionManager - Owns the single connection and dispatches messages to handles.
+    SharedMQTTInterface - Per-component handle compatible with `MQTTInterface`.
+"""
+
+import asyncio
+import threading
+import logging
+from gmqtt import Client as MQTTClient, Subscription
+from defences.rate_limiter import build_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class MQTTConnectionManager:
+    """
+    A single MQTT connection shared by many components.
+
+    Subscriptions from all handles are kept in one topic -> callbacks table and
+    are (re)subscribed in a single SUBSCRIBE packet when the connection comes up.
+    """
+
+    def __init__(self, broker="127.0.0.1", port=1883, client_id="process_sim_shared", token=None,
+                 rate_limit=None):
+        """
+        Initializes the shared client and starts its background event loop.
+
+        Args:
+            broker (str): IP address of the MQTT broker.
+            port (int): Port number for MQTT (default: 1883).
+            client_id (str): Client identifier of the shared connection.
+            token (str): Optional token for authentication.
+            rate_limit (dict, optional): Publish rate limit configuration (see
+                `build_rate_limiter`). The scope defaults to "client": one bucket per handle.
+        """
+        self.rate_limiter = build_rate_limiter({"scope": "client", **(rate_limit or {})})
+        self._limiter_lock = threading.Lock()
+        self._broker = broker
+        self._port = port
+        self._client_id = client_id
+        self._connected = False
+        self._client = MQTTClient(client_id)
+        self._subscribers = {}  # topic -> list of callbacks
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+
+        self._client.on_connect = self._on_connect
+        self._client.on_disconnect = self._on_disconnect
+        self._client.on_message = self._on_message
+
+        if token:
+            self._client.set_auth_credentials(token, None)
+
+        self._thread = threading.Thread(target=self._start_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def connected(self):
+        """True while the shared connection is up."""
+        return self._connected
+
+    def interface(self, client_id="process_sim_client"):
+        """
+        Creates a handle for one component on the shared connection.
+
+        Args:
+            client_id (str): Logical client identifier of the component.
+
+        Returns:
+            SharedMQTTInterface: Handle with the `MQTTInterface` API.
+        """
+        return SharedMQTTInterface(self, client_id)
+
+    def _start_loop(self):
+        """Starts the asyncio loop in the thread context."""
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._connect_and_listen())
+
+    async def _connect_and_listen(self):
+        """Connects to the broker and keeps the event loop alive."""
+        try:
+            await self._client.connect(self._broker, self._port)
+            self._connected = True
+            logger.info("[MQTT] Shared connection to %s:%s as %s", self._broker, self._port, self._client_id)
+            while True:
+                await asyncio.sleep(1)
+        except Exception as e:
+            logger.info("[MQTT-ERR] Shared connection failed or lost: %s", e)
+            self._connected = False
+
+    def allow_message(self, topic, client_id):
+        """
+        Checks a publish against the shared rate limiter (thread-safe).
+
+        Args:
+            topic (str): Topic of the message.
+            client_id (str): Handle publishing the message.
+
+        Returns:
+            bool: True if the message is allowed, False otherwise.
+        """
+        with self._limiter_lock:
+            return self.rate_limiter.allow_message(topic, client_id)
+
+    def publish(self, topic, message, qos=0, retain=False):
+        """
+        Queues a publish on the shared connection (thread-safe).
+
+        Returns:
+            bool: False if the connection is not up.
+        """
+        if not self._connected:
+            return False
+        self._loop.call_soon_threadsafe(self._client.publish, topic, message, qos, retain)
+        return True
+
+    def subscribe(self, topic, callback):
+        """
+        Adds a callback for a topic, subscribing on the broker the first time
+        the topic is seen.
+        """
+        with self._lock:
+            callbacks = self._subscribers.setdefault(topic, [])
+            first = not callbacks
+            callbacks.append(callback)
+        if first and self._connected:
+            self._loop.call_soon_threadsafe(self._client.subscribe, topic)
+
+    def dispatch(self, topic, message):
+        """
+        Delivers a message to every callback registered for a topic.
+
+        Returns:
+            bool: True if at least one callback was registered.
+        """
+        callbacks = self._subscribers.get(topic)
+        if not callbacks:
+            return False
+        for callback in list(callbacks):
+            try:
+                callback(message)
+            except Exception as e:
+                logger.info("[MQTT-ERR] Error in subscriber callback for %s: %s", topic, e)
+        return True
+
+    def _on_connect(self, client, flags, rc, properties):
+        """Subscribes every known topic in one request once connected."""
+        self._connected = True
+        with self._lock:
+            topics = list(self._subscribers)
+        logger.info("[MQTT] Shared connection up, subscribing to %s topics", len(topics))
+        if topics:
+            client.subscribe([Subscription(topic) for topic in topics])
+
+    def _on_disconnect(self, client, packet, exc=None):
+        """Handler triggered when the shared connection drops."""
+        self._connected = False
+        logger.info("[MQTT] Shared connection disconnected")
+
+    def _on_message(self, client, topic, payload, qos, properties):
+        """Dispatches received messages to all subscribed handles."""
+        message = payload.decode() if isinstance(payload, bytes) else payload
+        if not self.dispatch(topic, message):
+            logger.info("[MQTT-WARN] No subscriber for topic: %s", topic)
+
+
+class SharedMQTTInterface:
+    """
+    Per-component MQTT handle that routes through an `MQTTConnectionManager`.
+
+    Exposes the same methods as `MQTTInterface` so it can be passed anywhere a
+    component expects one.
+    """
+
+    def __init__(self, manager, client_id="process_sim_client"):
+        """
+        Args:
+            manager (MQTTConnectionManager): The shared connection.
+            client_id (str): Logical client identifier used in logs.
+        """
+        self.rate_limiter = manager.rate_limiter
+        self._manager = manager
+        self._client_id = client_id
+        self._subscribers = {}
+
+    @property
+    def _connected(self):
+        return self._manager.connected
+
+    def publish(self, topic, message, qos=0, retain=False):
+        """
+        Publishes a message on the shared connection.
+
+        Args:
+            topic (str): The topic to publish to.
+            message (str): The message to publish.
+            qos (int): Quality of Service level (default: 0).
+            retain (bool): Whether to retain the message (default: False).
+
+        Returns:
+            bool: True if the message was queued on the connection, False if it was
+            dropped by the rate limiter or the connection is not up.
+        """
+        if not self._manager.allow_message(topic, self._client_id):
+            logger.info("[MQTT-PUB] Rate limit exceeded. Dropping message to %s: %s", topic, message)
+            return False
+
+        if self._manager.publish(topic, message, qos, retain):
+            logger.info("[MQTT-PUB] %s published to %s: %s", self._client_id, topic, message)
+            return True
+        logger.info("[MQTT-PUB] Cannot publish, client not connected.")
+        return False
+
+    def subscribe(self, topic, callback):
+        """
+        Subscribes to a topic and registers a callback to handle messages.
+
+        Args:
+            topic (str): Topic to subscribe to.
+            callback (function): Function to handle incoming messages.
+        """
+        self._subscribers[topic] = callback
+        self._manager.subscribe(topic, callback)
+        logger.info("[MQTT-SUB] %s subscribed to: %s", self._client_id, topic)
+
+    def simulate_message(self, topic, payload):
+        """
+        Sends a simulated message to this handle's topic handler without a broker.
+
+        Args:
+            topic (str): Target topic.
+            payload (str): Simulated payload.
+        """
+        logger.info("[MQTT-SIM] %s: %s", topic, payload)
+        if topic in self._subscribers:
+            self._subscribers[topic](payload)
+        else:
+            logger.info("[MQTT-SIM-WARN] No subscriber for topic: %s", topic)
@@ -0,0 +1,91 @@
+"""
+gmqtt Write Buffer Backpressure
+
+gmqtt's `publish` only appends to the connection's asyncio transport, so a
+client publishing in a tight loop fills its local write buffer as fast as it
+can build messages, whatever the broker takes. These helpers let such a loop
+wait for the socket instead, keeping the unsent data of each client bounded.
+
+gmqtt does not expose its transport: the helpers read the private
+`client._connection._transport` attribute and treat a client without one as
+having nothing buffered.
+
+Functions:
+    transport - Returns a client's open transport.
+    buffered - Returns the bytes a client's socket has not taken yet.
+    wait_for_buffer - Waits until a client's buffer is below a limit.
+    drain - Waits for a client's buffer to empty.
+    disconnect - Disconnects a client, dropping whatever its socket did not take.
+"""
+
+import asyncio
+import time
+
+MAX_BUFFERED_BYTES = 64 * 1024  # unsent bytes a client may queue before waiting for its socket
+BUFFER_POLL_SECONDS = 0.001
+DRAIN_TIMEOUT = 5.0  # seconds to wait for a buffer to drain after the load
+
+
+def transport(client):
+    """
+    Returns a gmqtt client's open transport.
+
+    Args:
+        client (gmqtt.Client): A connected client.
+
+    Returns:
+        asyncio.Transport or None: The transport, or None if not connected or closing.
+    """
+    conn_transport = getattr(getattr(client, "_connection", None), "_transport", None)
+    if conn_transport is None or conn_transport.is_closing():
+        return None
+    return conn_transport
+
+
+def buffered(client):
+    """
+    Returns the bytes queued in a client's transport that the socket has not taken yet.
+    """
+    conn_transport = transport(client)
+    return conn_transport.get_write_buffer_size() if conn_transport else 0
+
+
+async def wait_for_buffer(client, limit=MAX_BUFFERED_BYTES, deadline=float("inf")):
+    """
+    Waits until a client holds at most `limit` unsent bytes.
+
+    Args:
+        client (gmqtt.Client): The publishing client.
+        limit (int): Unsent bytes allowed.
+        deadline (float): `time.monotonic()` time after which to stop waiting.
+    """
+    while buffered(client) > limit and time.monotonic() < deadline:
+        await asyncio.sleep(BUFFER_POLL_SECONDS)
+
+
+async def drain(client, timeout=DRAIN_TIMEOUT):
+    """
+    Waits for a client's buffer to empty.
+
+    Args:
+        client (gmqtt.Client): The publishing client.
+        timeout (float): Seconds to wait.
+
+    Returns:
+        int: Bytes still unsent after the wait.
+    """
+    await wait_for_buffer(client, 0, time.monotonic() + timeout)
+    return buffered(client)
+
+
+async def disconnect(client):
+    """
+    Disconnects a client. A graceful close waits for the buffer to be written,
+    which never happens once the broker stops reading, so unsent data is dropped.
+
+    Args:
+        client (gmqtt.Client): The client to disconnect.
+    """
+    if buffered(client):
+        transport(client).abort()
+    await client.disconnect()
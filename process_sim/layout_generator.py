@@ -0,0 +1,202 @@
+"""
+Synthetic Layout Generator
+
+This module generates valid process layouts of any size, in the same format
+as Process_sim.json, for scaling tests and benchmarks.
+
+Tanks are connected by pump transfers in one of three topologies:
+
+  - "chain":   tank0 -> tank1 -> ... -> tankN-1
+  - "tree":    every tank feeds `branching` child tanks; a transfer with more
+               than one target goes through a splitter
+  - "recycle": a chain where every `loop_every` tanks a return pump feeds the
+               last tank of the segment back into its first
+
+Every pump is controlled by `rules_per_pump` PLC rules on the level of its
+source tank (alternating open-above / close-at-or-below thresholds). Pumps are
+spread over PLCs in contiguous groups, each PLC mapping its pumps and their
+source tanks to consecutive registers (at most `MAX_PLC_REGISTERS`, the size of
+a PLC's register bank).
+
+Usage:
+    $ python process_sim/layout_generator.py --tanks 1000 --topology tree --output big.json
+
+Functions:
+    generate_layout - Builds a layout dictionary.
+    layout_stats - Counts the components and rules of a layout.
+"""
+
+import argparse
+import json
+import math
+import random
+
+TOPOLOGIES = ("chain", "tree", "recycle")
+MAX_PLC_REGISTERS = 100
+
+
+def _transfers(tanks, topology, branching, loop_every):
+    """Returns (source tank index, [target tank indices]) pairs of the topology."""
+    if topology == "chain":
+        return [(i, [i + 1]) for i in range(tanks - 1)]
+    if topology == "tree":
+        transfers = []
+        for i in range(tanks):
+            children = [c for c in range(branching * i + 1, branching * i + branching + 1) if c < tanks]
+            if children:
+                transfers.append((i, children))
+        return transfers
+    if topology == "recycle":
+        transfers = [(i, [i + 1]) for i in range(tanks - 1)]
+        for start in range(0, tanks - 1, loop_every):
+            end = min(start + loop_every, tanks - 1)
+            if end > start:
+                transfers.append((end, [start]))
+        return transfers
+    raise ValueError(f"Unknown topology: {topology}")
+
+
+def generate_layout(tanks=10, topology="chain", branching=2, loop_every=5, plcs=None, rules_per_pump=2,
+                    max_capacity=1000, flow_rate=50, base_port=5100, scada=True, seed=0):
+    """
+    Generates a layout.
+
+    Args:
+        tanks (int): Number of tanks (at least 2).
+        topology (str): "chain", "tree" or "recycle".
+        branching (int): Children per tank in a tree; >1 adds one splitter per branching transfer.
+        loop_every (int): Tanks per recycle loop.
+        plcs (int, optional): Number of PLCs. Defaults to the fewest that fit the register banks.
+        rules_per_pump (int): Rules controlling each pump.
+        max_capacity (float): Capacity of every tank.
+        flow_rate (float): Flow rate of every pump.
+        base_port (int): Modbus port of the first PLC; the others follow, then the SCADA.
+        scada (bool): Add a SCADA that stops every pump on an emergency stop or when tank0 is full.
+        seed (int): Seed for the initial tank volumes.
+
+    Returns:
+        dict: Layout with "nodes", "edges", "plcs" and optionally "scada".
+
+    Raises:
+        ValueError: For an unknown topology, too few tanks or too few PLCs.
+    """
+    if tanks < 2:
+        raise ValueError("A layout needs at least 2 tanks")
+    rng = random.Random(seed)
+    nodes, edges = [], []
+    pumps = []  # (pump id, source tank id)
+
+    def add_edge(source, target):
+        edges.append({"id": f"line{len(edges) + 1}", "name": f"{source} to {target}",
+                      "source": source, "target": target})
+
+    for i in range(tanks):
+        nodes.append({"id": f"tank{i}", "type": "Tank", "name": f"Tank {i}", "max_capacity": max_capacity,
+                      "initial_capacity": round(rng.uniform(0, max_capacity), 1)})
+
+    splitters = 0
+    for source, targets in _transfers(tanks, topology, branching, loop_every):
+        pump_id = f"pump{len(pumps)}"
+        source_id = f"tank{source}"
+        if len(targets) > 1:
+            target_id = f"splitter{splitters}"
+            splitters += 1
+            nodes.append({"id": target_id, "type": "Splitter", "name": f"Splitter {splitters - 1}"})
+            for target in targets:
+                add_edge(target_id, f"tank{target}")
+        else:
+            target_id = f"tank{targets[0]}"
+        nodes.append({"id": pump_id, "type": "Pump", "name": f"Pump {len(pumps)}", "flow_rate": flow_rate,
+                      "source": source_id, "target": target_id, "is_open": False})
+        add_edge(source_id, pump_id)
+        add_edge(pump_id, target_id)
+        pumps.append((pump_id, source_id))
+
+    # Each pump needs at most 2 registers (itself and its source tank)
+    per_plc = MAX_PLC_REGISTERS // 2
+    needed = max(1, math.ceil(len(pumps) / per_plc))
+    plcs = needed if plcs is None else plcs
+    if plcs < needed:
+        raise ValueError(f"{len(pumps)} pumps need at least {needed} PLCs")
+
+    plc_configs = []
+    group = math.ceil(len(pumps) / plcs) if pumps else 0
+    for p in range(plcs):
+        registers = {}
+        devices, actions = [], []
+        for pump_id, source_id in pumps[p * group:(p + 1) * group]:
+            for device_id, device_type in ((source_id, "Tank"), (pump_id, "Pump")):
+                if device_id not in registers:
+                    registers[device_id] = len(registers)
+                    kind = device_type.lower()
+                    field = "volume" if device_type == "Tank" else "state"
+                    devices.append({"id": device_id, "type": device_type, "mqtt_topic": f"{kind}/{device_id}/{field}",
+                                    "plc_input_register": registers[device_id]})
+            for r in range(rules_per_pump):
+                threshold = round(max_capacity * (r // 2 + 1) / (rules_per_pump // 2 + 2), 1)
+                opening = r % 2 == 0
+                actions.append({
+                    "name": f"{'Open' if opening else 'Close'} {pump_id} at {threshold}",
+                    "trigger": {"register": registers[source_id], "condition": ">" if opening else "<=",
+                                "value": threshold},
+                    "effect": {"target": pump_id, "action": "open" if opening else "close"},
+                })
+        plc_configs.append({"id": f"plc{p}", "ip": "127.0.0.1", "port": base_port + p,
+                            "devices": devices, "actions": actions})
+
+    layout = {"nodes": nodes, "edges": edges, "plcs": plc_configs}
+    if scada:
+        layout["scada"] = {
+            "ip": "127.0.0.1",
+            "port": base_port + plcs,
+            "register_map": {"tank0": 0, "emergency_stop": MAX_PLC_REGISTERS - 1},
+            "actions": [{
+                "name": "Shut Down All Pumps on Emergency",
+                "trigger": {"register": MAX_PLC_REGISTERS - 1, "condition": "==", "value": 1},
+                "effect": {"target": [pump_id for pump_id, _ in pumps], "action": "close"},
+            }, {
+                "name": "Shut Down All Pumps on Overflow",
+                "trigger": {"register": 0, "condition": ">=", "value": max_capacity},
+                "effect": {"target": [pump_id for pump_id, _ in pumps], "action": "close"},
+            }],
+        }
+    return layout
+
+
+def layout_stats(layout):
+    """
+    Counts the components of a layout.
+
+    Returns:
+        dict: Number of tanks, pumps, splitters, lines, PLCs and PLC rules, and total components.
+    """
+    types = [node["type"] for node in layout["nodes"]]
+    stats = {
+        "tanks": types.count("Tank"),
+        "pumps": types.count("Pump"),
+        "splitters": types.count("Splitter"),
+        "lines": len(layout["edges"]),
+        "plcs": len(layout.get("plcs", [])),
+        "rules": sum(len(plc.get("actions", [])) for plc in layout.get("plcs", [])),
+    }
+    stats["components"] = len(layout["nodes"]) + stats["lines"]
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic process layout")
+    parser.add_argument("--tanks", type=int, default=100, help="Number of tanks")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="chain", help="How tanks are connected")
+    parser.add_argument("--branching", type=int, default=2, help="Children per tank (tree)")
+    parser.add_argument("--loop-every", type=int, default=5, help="Tanks per recycle loop (recycle)")
+    parser.add_argument("--plcs", type=int, default=None, help="Number of PLCs (default: as few as fit)")
+    parser.add_argument("--rules-per-pump", type=int, default=2, help="PLC rules per pump")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for initial volumes")
+    parser.add_argument("--output", default="generated_layout.json", help="Layout file to write")
+    args = parser.parse_args()
+
+    layout = generate_layout(args.tanks, args.topology, args.branching, args.loop_every, args.plcs,
+                             args.rules_per_pump, seed=args.seed)
+    with open(args.output, "w") as f:
+        json.dump(layout, f, indent=2)
+    print(f"Wrote {args.output}: {layout_stats(layout)}")
@@ -3,13 +3,16 @@ Process Layout Parser and Graph Builder
 
 This module parses a JSON layout definition and constructs a simulation graph
 of interconnected components including tanks, pumps, splitters, and lines.
-It also initializes MQTT interfaces and binds Modbus/SCADA control paths.
+It also initializes MQTT interfaces (multiplexed over one shared connection per
+graph by default) and binds Modbus/SCADA control paths.
 
 Classes:
     ProcessGraph - Container for simulation nodes and lines with update/publish hooks.
+                   Can optionally be compiled into a vectorized stepping engine.
 
 Functions:
     load_layout - Loads and parses a JSON layout file to construct a ProcessGraph.
+    build_graph - Constructs a ProcessGraph from an already parsed layout dictionary.
 """
 
 import json
@@ -17,7 +20,8 @@ from process_sim.tank import Tank
 from process_sim.pump import Pump
 from process_sim.splitter import Splitter
 from process_sim.line import Line
-from process_sim.interfaces.mqtt_interface import MQTTInterface
+from process_sim.interfaces.mqtt_manager import MQTTConnectionManager
+from process_sim.telemetry import TelemetryPublisher
 
 
 class ProcessGraph:
@@ -31,16 +35,48 @@ class ProcessGraph:
         self.lines = {}         # line_id -> Line instance
         self.plc_configs = []   # List of PLC configurations
         self.scada_config = None  # SCADA configuration dictionary
+        self.modbus_config = {}   # Optional Modbus hosting settings
+        self.engine = None      # Optional VectorizedEngine (see compile())
+        self.mqtt_manager = None  # Shared MQTT connection used by the components, if any
+        self.telemetry = None   # Optional TelemetryPublisher for change-only publishing
+
+    def compile(self):
+        """
+        Compiles the graph into a `VectorizedEngine` so that `update()` advances
+        the whole plant with array operations. Tank and Pump objects remain usable
+        as views over the engine's arrays.
+
+        Must be called again if nodes or connections are added afterwards.
+
+        Returns:
+            VectorizedEngine: The compiled engine.
+        """
+        from process_sim.vectorized_engine import VectorizedEngine
+        self.engine = VectorizedEngine(self)
+        return self.engine
 
     def update(self):
         """Runs the update logic for all nodes and lines in the graph."""
+        if self.engine is not None:
+            self.engine.step()
+            return
+
         for node in self.nodes.values():
             node.update()
         for line in self.lines.values():
             line.update()
 
     def publish(self):
-        """Triggers data publication for all nodes and lines."""
+        """
+        Triggers data publication for all nodes and lines.
+
+        With a `TelemetryPublisher` attached, only values that moved past their
+        dead-band are published, followed by one aggregate snapshot message.
+        """
+        if self.telemetry is not None:
+            self.telemetry.publish(self)
+            return
+
         for node in self.nodes.values():
             try:
                 node.publish()
@@ -54,7 +90,7 @@ class ProcessGraph:
                 print(f"[ERROR] Failed to publish line {line.id} ({line.name}): {e}")
 
 
-def load_layout(json_path):
+def load_layout(json_path, vectorized=False, mqtt_factory=None, rate_limit=None):
     """
     Loads a process layout from a JSON file and constructs a ProcessGraph.
 
@@ -63,9 +99,17 @@ def load_layout(json_path):
       - edges: list of connections between components
       - plcs: (optional) list of PLC configuration dictionaries
       - scada: (optional) SCADA configuration dictionary
+      - telemetry: (optional) change-only publishing settings (see process_sim.telemetry)
+      - modbus: (optional) Modbus hosting settings (see SimulationThread)
+      - rate_limit: (optional) MQTT publish rate limit (see defences.rate_limiter)
 
     Args:
         json_path (str): Path to the layout JSON file.
+        vectorized (bool): Compile the graph into a vectorized stepping engine.
+        mqtt_factory (callable, optional): Called as `mqtt_factory(client_id=...)` to
+            create each component's MQTT interface. Defaults to handles on a single
+            `MQTTConnectionManager` shared by the whole graph.
+        rate_limit (dict, optional): Rate limit settings overriding the layout's.
 
     Returns:
         ProcessGraph: The fully constructed and connected graph.
@@ -73,8 +117,30 @@ def load_layout(json_path):
     with open(json_path, 'r') as f:
         layout = json.load(f)
 
+    return build_graph(layout, vectorized=vectorized, mqtt_factory=mqtt_factory, rate_limit=rate_limit)
+
+
+def build_graph(layout, vectorized=False, mqtt_factory=None, rate_limit=None):
+    """
+    Constructs a ProcessGraph from an already parsed layout dictionary.
+
+    Args:
+        layout (dict): Layout with the same structure as the JSON file.
+        vectorized (bool): Compile the graph into a vectorized stepping engine.
+        mqtt_factory (callable, optional): Called as `mqtt_factory(client_id=...)` to
+            create each component's MQTT interface. Defaults to handles on a single
+            `MQTTConnectionManager` shared by the whole graph.
+        rate_limit (dict, optional): Rate limit settings overriding the layout's.
+
+    Returns:
+        ProcessGraph: The fully constructed and connected graph.
+    """
     graph = ProcessGraph()
 
+    if mqtt_factory is None:
+        graph.mqtt_manager = MQTTConnectionManager(rate_limit={**layout.get("rate_limit", {}), **(rate_limit or {})})
+        mqtt_factory = graph.mqtt_manager.interface
+
     # First pass: create nodes
     for node in layout["nodes"]:
         node_id = node["id"]
@@ -82,7 +148,7 @@ def load_layout(json_path):
         name = node["name"]
         position = node.get("position")
 
-        mqtt_interface = MQTTInterface(client_id=f"{node_type.lower()}_{node_id}")
+        mqtt_interface = mqtt_factory(client_id=f"{node_type.lower()}_{node_id}")
 
         if node_type == "Tank":
             max_capacity = node.get("max_capacity", 1000)
@@ -155,5 +221,14 @@ def load_layout(json_path):
     # Load optional controller configurations
     graph.plc_configs = layout.get("plcs", [])
     graph.scada_config = layout.get("scada", {})
+    graph.modbus_config = layout.get("modbus", {})
+
+    # Optional change-only telemetry publishing
+    telemetry_config = layout.get("telemetry")
+    if telemetry_config:
+        graph.telemetry = TelemetryPublisher.from_config(telemetry_config, mqtt_factory(client_id="sim_snapshot"))
+
+    if vectorized:
+        graph.compile()
 
     return graph
@@ -0,0 +1,168 @@
+"""
+Central Logging Setup
+
+This module configures logging once for the whole simulation. Records from
+every thread are put on an in-memory queue by a `QueueHandler`; a single
+`QueueListener` thread formats them and writes them to a size-rotated log file
+and the console, so the simulation thread never blocks on log I/O.
+
+Modules only create named loggers (`logging.getLogger(__name__)`) and log with
+lazy %-style arguments; the message is only formatted if a handler emits it.
+
+Levels can be set per subsystem by logger name prefix, and high-frequency
+events (per-tick transfers and publishes) can be sampled:
+
+    setup_logging(level="INFO",
+                  levels={"process_sim.tank": "WARNING"},
+                  sample={"process_sim.interfaces": 100})
+
+Classes:
+    SamplingFilter - Passes one of every N records per logger and message template.
+    DeferredQueueHandler - Queue handler that leaves formatting to the listener thread.
+
+Functions:
+    setup_logging - Installs the queue handler, listener, rotating file and console output.
+    stop_logging - Flushes the queue and stops the listener thread.
+"""
+
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+DEFAULT_LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "logs.txt")
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+# Loggers emitting per-tick events; the target of `--log-sample`
+HIGH_FREQUENCY_LOGGERS = ("process_sim.tank", "process_sim.pump", "process_sim.splitter",
+                          "process_sim.interfaces", "control_logic.action_engine")
+
+_listener = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Passes one of every N records per (logger, message template).
+
+    Warnings and errors are never dropped. Because messages use lazy %-style
+    arguments, all records of one event share a template, e.g.
+    "[Tank %s] Transferred %s units", and are sampled together.
+    """
+
+    def __init__(self, rates):
+        """
+        Args:
+            rates (dict): Logger name prefix -> N (keep 1 of every N records).
+        """
+        super().__init__()
+        self.rates = rates
+        self._counts = {}
+        self._rate_cache = {}  # logger name -> resolved N
+
+    def _rate_for(self, name):
+        rate = self._rate_cache.get(name)
+        if rate is None:
+            rate = 1
+            for prefix, value in self.rates.items():
+                if name == prefix or name.startswith(prefix + "."):
+                    rate = value
+                    break
+            self._rate_cache[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        if rate <= 1:
+            return True
+        key = (record.name, record.msg)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        return count % rate == 0
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueues records unformatted.
+
+    The standard `QueueHandler` merges the message arguments before enqueueing,
+    on the logging thread. Records here are in-process only, so formatting is
+    left entirely to the listener thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(log_path=DEFAULT_LOG_PATH, level="INFO", levels=None, sample=None, console=True,
+                  max_bytes=5 * 1024 * 1024, backup_count=3):
+    """
+    Routes all logging through a queue to a background listener thread.
+
+    Replaces any handlers on the root logger, so it can be called again to
+    reconfigure. The previous log file is rotated to `<log_path>.1` so every
+    run starts with a fresh file.
+
+    Args:
+        log_path (str or None): Log file, or None for console only.
+        level (str or int): Root log level.
+        levels (dict, optional): Logger name prefix -> level, e.g. {"process_sim.tank": "WARNING"}.
+        sample (dict, optional): Logger name prefix -> N, keeping 1 of every N
+            DEBUG/INFO records (see `SamplingFilter`).
+        console (bool): Also write to the console.
+        max_bytes (int): Size at which the log file is rotated.
+        backup_count (int): Number of rotated files to keep.
+
+    Returns:
+        QueueListener: The running listener.
+    """
+    global _listener
+    stop_logging()
+
+    handlers = []
+    formatter = logging.Formatter(LOG_FORMAT)
+    if log_path:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count,
+                                           encoding="utf-8", delay=True)
+        if os.path.exists(log_path) and os.path.getsize(log_path) > 0:
+            file_handler.doRollover()
+        handlers.append(file_handler)
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    if sample:
+        queue_handler.addFilter(SamplingFilter(sample))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    for name, subsystem_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(subsystem_level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """
+    Writes out all queued records and stops the listener thread, if running.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -9,43 +9,26 @@ Classes:
 """
 
 import logging
-import os
 from process_sim.base import ProcessComponent
 from process_sim.interfaces.mqtt_interface import MQTTInterface
 from process_sim.splitter import Splitter
 from process_sim.tank import Tank 
 
-# Ensure the 'data' directory exists
-log_dir = os.path.join(os.path.dirname(__file__), "data")
-os.makedirs(log_dir, exist_ok=True)
-
-# Set full path to log file inside data/
-log_path = os.path.join(log_dir, "logs.txt")
-
-# Reset logging if needed
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# Setup logging to file
-logging.basicConfig(
-    level=logging.INFO,
-    filename=log_path,
-    filemode="w",
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
-
-# Optional: Console output to debug
-console = logging.StreamHandler()
-console.setLevel(logging.DEBUG)
-console.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-logging.getLogger().addHandler(console)
+logger = logging.getLogger(__name__)
 
 class Pump(ProcessComponent):
     """
     A pump that transfers fluid at a fixed rate from a source tank to a target line.
     The pump can be remotely opened or closed and configured via MQTT.
+
+    When the owning graph is compiled into a `VectorizedEngine`, the rate and
+    open state live in the engine's arrays and the attributes below read and
+    write through to them.
     """
 
+    _engine = None  # VectorizedEngine this pump is bound to, if any
+    _slot = None    # Index of this pump in the engine arrays
+
     def __init__(self, id, name, rate, mqtt_interface: MQTTInterface, is_open=True):
         """
         Args:
@@ -66,6 +49,45 @@ class Pump(ProcessComponent):
         self.mqtt.subscribe(f"set/pump/{self.id}/rate", self.handle_set_rate)
         self.mqtt.subscribe(f"set/pump/{self.id}/state", self.handle_set_state)
 
+    @property
+    def rate(self):
+        """Flow rate in units per tick."""
+        if self._engine is not None:
+            return float(self._engine.rates[self._slot])
+        return self._rate
+
+    @rate.setter
+    def rate(self, value):
+        if self._engine is not None:
+            self._engine.rates[self._slot] = value
+        else:
+            self._rate = value
+
+    @property
+    def is_open(self):
+        """True if the pump is open."""
+        if self._engine is not None:
+            return bool(self._engine.open_mask[self._slot])
+        return self._is_open
+
+    @is_open.setter
+    def is_open(self, value):
+        if self._engine is not None:
+            self._engine.open_mask[self._slot] = value
+        else:
+            self._is_open = value
+
+    def bind_engine(self, engine, slot):
+        """
+        Moves this pump's state into a compiled engine's arrays.
+
+        Args:
+            engine (VectorizedEngine): The engine that now owns the state.
+            slot (int): Index of this pump in the engine arrays.
+        """
+        self._engine = engine
+        self._slot = slot
+
     def handle_set_rate(self, msg):
         """
         Handles incoming MQTT message to change pump rate.
@@ -75,9 +97,9 @@ class Pump(ProcessComponent):
         """
         try:
             self.rate = float(msg)
-            logging.info(f"[Pump {self.id}] Rate set to: {self.rate}")
+            logger.info("[Pump %s] Rate set to: %s", self.id, self.rate)
         except ValueError:
-            logging.info(f"[Pump {self.id}] Invalid rate value: {msg}")
+            logger.info("[Pump %s] Invalid rate value: %s", self.id, msg)
 
     def handle_set_state(self, msg):
         """
@@ -86,17 +108,17 @@ class Pump(ProcessComponent):
         Args:
             msg (str): Expected to be 'open' or 'closed'.
         """
-        logging.info(f"[Pump {self.id}] Received set_state command: {msg}")
+        logger.info("[Pump %s] Received set_state command: %s", self.id, msg)
         if msg.lower() == "open":
             self.is_open = True
         elif msg.lower() == "closed":
             self.is_open = False
         else:
-            logging.info(f"[Pump {self.id}] Invalid state: {msg}")
+            logger.info("[Pump %s] Invalid state: %s", self.id, msg)
             return
 
         self.mqtt.publish(f"state/pump/{self.id}/state", "open" if self.is_open else "closed")
-        logging.info(f"[Pump {self.id}] State set to {'open' if self.is_open else 'closed'}")
+        logger.info("[Pump %s] State set to %s", self.id, 'open' if self.is_open else 'closed')
 
     def set_connection(self, source_tank, target_tank, line):
         """
@@ -123,7 +145,7 @@ class Pump(ProcessComponent):
             elif isinstance(self.target, Splitter):
                 self.target.distribute(self.rate)  # Call the distribute method for Splitter
             else:
-                logging.info(f"[Pump {self.id}] Warning: Unsupported target type {type(self.target)}")
+                logger.info("[Pump %s] Warning: Unsupported target type %s", self.id, type(self.target))
         elif self.is_open and self.source and self.source.current_volume > 0:
             # Transfer remaining volume if less than rate
             transfer_amount = self.source.current_volume
@@ -134,15 +156,27 @@ class Pump(ProcessComponent):
             elif isinstance(self.target, Splitter):
                 self.target.distribute(transfer_amount)
             else:
-                logging.info(f"[Pump {self.id}] Warning: Unsupported target type {type(self.target)}")
+                logger.info("[Pump %s] Warning: Unsupported target type %s", self.id, type(self.target))
+
+    def telemetry(self):
+        """
+        Returns the pump's telemetry as (topic, value) pairs.
+
+        Returns:
+            list: Rate and state topics with their current values.
+        """
+        return [
+            (f"pump/{self.id}/rate", self.rate),
+            (f"pump/{self.id}/state", "open" if self.is_open else "closed"),
+        ]
 
     def publish(self):
         """
         Publishes current rate and state to MQTT topics.
         """
-        self.mqtt.publish(f"pump/{self.id}/rate", self.rate)
-        self.mqtt.publish(f"pump/{self.id}/state", "open" if self.is_open else "closed")
-        logging.info(f"[Pump {self.id}] Published rate: {self.rate}, state: {'open' if self.is_open else 'closed'}")
+        for topic, value in self.telemetry():
+            self.mqtt.publish(topic, value)
+        logger.info("[Pump %s] Published rate: %s, state: %s", self.id, self.rate, 'open' if self.is_open else 'closed')
 
     def get_rate(self):
         """Returns the current flow rate."""
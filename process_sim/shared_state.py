@@ -0,0 +1,204 @@
+"""
+Shared-Memory Live State
+
+This module publishes the live plant state into a named shared-memory segment
+that other processes (the Flask dashboard and any of its workers) can read
+directly, without going through the MQTT broker.
+
+The segment has a fixed layout derived from the process layout: one slot per
+tank and per pump, in layout order.
+
+    header   magic (u32), tank count (u32), pump count (u32), index length (u32),
+             metrics length (u32), padding, sequence (u64), tick (u64), simulated time (f64)
+    index    JSON list of tank IDs and pump IDs (so readers need no layout file)
+    arrays   tank volume (f64), tank capacity (f64), pump rate (f64), pump open (f64)
+    metrics  optional tick timing figures (see process_sim.tick_metrics)
+
+Writes are guarded by a sequence lock: the writer makes the sequence odd,
+updates the arrays and makes it even again; readers retry while it is odd or
+changed during their read. The metrics are updated in place, outside the lock.
+
+Classes:
+    SharedStateWriter - Creates the segment and writes the graph state each tick.
+    SharedStateReader - Attaches to the segment and reads consistent snapshots.
+"""
+
+import json
+import os
+import struct
+import time
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+from process_sim.tick_metrics import TickMetrics, NBYTES as METRICS_NBYTES
+
+MAGIC = 0x53534D32  # "SSM2"
+HEADER = struct.Struct("<IIIII4xQQd")
+SEQUENCE_OFFSET = 24
+ENV_VAR = "SECURESIM_SHM"
+
+
+def _array_offsets(n_tanks, n_pumps, index_length):
+    """Returns the byte offset of each array, aligned to 8 bytes."""
+    start = HEADER.size + index_length
+    start += -start % 8
+    volumes = start
+    capacities = volumes + 8 * n_tanks
+    rates = capacities + 8 * n_tanks
+    states = rates + 8 * n_pumps
+    end = states + 8 * n_pumps
+    return volumes, capacities, rates, states, end
+
+
+class SharedStateWriter:
+    """
+    Owns the shared-memory segment and copies the graph state into it.
+
+    Attributes:
+        name (str): Name of the segment, passed to readers (e.g. via SECURESIM_SHM).
+        metrics (TickMetrics): Tick metrics stored in the segment, or None.
+    """
+
+    def __init__(self, graph, name=None, metrics=False):
+        """
+        Args:
+            graph (ProcessGraph): Graph whose tanks and pumps are published.
+            name (str, optional): Segment name. Defaults to one derived from the process ID.
+            metrics (bool): Reserve room for tick metrics that readers can scrape.
+        """
+        self.tanks = [node for node in graph.nodes.values() if hasattr(node, "current_volume")]
+        self.pumps = [node for node in graph.nodes.values() if hasattr(node, "is_open")]
+        index = json.dumps([[t.id for t in self.tanks], [p.id for p in self.pumps]]).encode()
+        n_tanks, n_pumps = len(self.tanks), len(self.pumps)
+        offsets = _array_offsets(n_tanks, n_pumps, len(index))
+
+        self.name = name or f"securesim_{os.getpid()}"
+        metrics_length = METRICS_NBYTES if metrics else 0
+        self._shm = shared_memory.SharedMemory(name=self.name, create=True, size=offsets[-1] + metrics_length)
+        self._sequence = 0
+        HEADER.pack_into(self._shm.buf, 0, MAGIC, n_tanks, n_pumps, len(index), metrics_length, 0, 0, 0.0)
+        self._shm.buf[HEADER.size:HEADER.size + len(index)] = index
+
+        buf = self._shm.buf
+        self._volumes = np.ndarray(n_tanks, dtype=np.float64, buffer=buf, offset=offsets[0])
+        self._capacities = np.ndarray(n_tanks, dtype=np.float64, buffer=buf, offset=offsets[1])
+        self._rates = np.ndarray(n_pumps, dtype=np.float64, buffer=buf, offset=offsets[2])
+        self._states = np.ndarray(n_pumps, dtype=np.float64, buffer=buf, offset=offsets[3])
+        self.metrics = TickMetrics(buffer=buf, offset=offsets[-1]) if metrics else None
+
+    def _set_sequence(self, value):
+        struct.pack_into("<Q", self._shm.buf, SEQUENCE_OFFSET, value)
+
+    def write(self, tick=0, sim_time=0.0):
+        """
+        Copies the current tank and pump values into the segment.
+
+        Args:
+            tick (int): Simulation tick number.
+            sim_time (float): Simulated seconds.
+        """
+        self._sequence += 1
+        self._set_sequence(self._sequence)  # odd: write in progress
+
+        self._volumes[:] = [tank.current_volume for tank in self.tanks]
+        self._capacities[:] = [tank.max_capacity for tank in self.tanks]
+        self._rates[:] = [pump.rate for pump in self.pumps]
+        self._states[:] = [1.0 if pump.is_open else 0.0 for pump in self.pumps]
+        struct.pack_into("<Qd", self._shm.buf, SEQUENCE_OFFSET + 8, tick, sim_time)
+
+        self._sequence += 1
+        self._set_sequence(self._sequence)
+
+    def close(self):
+        """
+        Releases and removes the segment.
+        """
+        del self._volumes, self._capacities, self._rates, self._states
+        self.metrics = None
+        self._shm.close()
+        # A reader sharing this process's resource tracker may have unregistered the
+        # segment; register it again so unlink() can unregister it cleanly
+        resource_tracker.register(self._shm._name, "shared_memory")
+        self._shm.unlink()
+
+
+class SharedStateReader:
+    """
+    Read-only view of a segment created by `SharedStateWriter`.
+
+    The arrays are NumPy views on the shared memory; `read()` copies them out
+    under the sequence lock to return one consistent tick.
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name (str): Segment name.
+        """
+        self._shm = shared_memory.SharedMemory(name=name, create=False)
+        # Readers must not remove the writer's segment when they exit
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        magic, n_tanks, n_pumps, index_length, metrics_length, _, _, _ = HEADER.unpack_from(self._shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory segment {name} is not a SecureSim state segment")
+        self.tank_ids, self.pump_ids = json.loads(bytes(self._shm.buf[HEADER.size:HEADER.size + index_length]))
+        offsets = _array_offsets(n_tanks, n_pumps, index_length)
+
+        buf = self._shm.buf
+        self.volumes = np.ndarray(n_tanks, dtype=np.float64, buffer=buf, offset=offsets[0])
+        self.capacities = np.ndarray(n_tanks, dtype=np.float64, buffer=buf, offset=offsets[1])
+        self.rates = np.ndarray(n_pumps, dtype=np.float64, buffer=buf, offset=offsets[2])
+        self.states = np.ndarray(n_pumps, dtype=np.float64, buffer=buf, offset=offsets[3])
+        self._metrics_offset = offsets[-1] if metrics_length else None
+
+    def _sequence(self):
+        return struct.unpack_from("<Q", self._shm.buf, SEQUENCE_OFFSET)[0]
+
+    def read(self, max_retries=1000):
+        """
+        Reads one consistent snapshot.
+
+        Returns:
+            dict: "sequence", "tick", "sim_time" and "values"
+            ({component_id: {"volume", "max_capacity"} or {"state", "rate"}}).
+        """
+        for _ in range(max_retries):
+            before = self._sequence()
+            if before % 2:
+                time.sleep(0)
+                continue
+            volumes, capacities = self.volumes.tolist(), self.capacities.tolist()
+            rates, states = self.rates.tolist(), self.states.tolist()
+            tick, sim_time = struct.unpack_from("<Qd", self._shm.buf, SEQUENCE_OFFSET + 8)
+            if self._sequence() == before:
+                break
+        else:
+            raise TimeoutError("Shared state kept changing while being read")
+
+        values = {}
+        for tank_id, volume, capacity in zip(self.tank_ids, volumes, capacities):
+            values[tank_id] = {"volume": volume, "max_capacity": capacity}
+        for pump_id, rate, state in zip(self.pump_ids, rates, states):
+            values[pump_id] = {"state": "open" if state else "closed", "rate": rate}
+        return {"sequence": before, "tick": tick, "sim_time": sim_time, "values": values}
+
+    def metrics(self):
+        """
+        Copies the tick metrics out of the segment.
+
+        Returns:
+            TickMetrics: A snapshot of the writer's metrics, or None if the segment has none.
+        """
+        if self._metrics_offset is None:
+            return None
+        start = self._metrics_offset
+        return TickMetrics(buffer=bytearray(self._shm.buf[start:start + METRICS_NBYTES]))
+
+    def close(self):
+        """
+        Detaches from the segment without removing it.
+        """
+        del self.volumes, self.capacities, self.rates, self.states
+        self._shm.close()
@@ -3,6 +3,7 @@ Simulation Runner
 
 This module defines a threaded simulation controller that orchestrates the update
 cycle for process components, PLCs, SCADA systems, and optional live visualization.
+It can also run headless, advancing a simulated clock as fast as the CPU allows.
 
 Classes:
     SimulationThread - Main thread for managing and updating the entire simulation.
@@ -18,34 +19,15 @@ import time
 import logging
 
 from process_sim.graph_visualizer import render_live_graph
+from control_logic.plc import PLC
+from control_logic.scada import SCADA
 from control_logic.plc_modbus import ModbusPLC
 from control_logic.scada_modbus import ModbusSCADA
-from process_sim.interfaces.mqtt_interface import MQTTInterface
+from process_sim.interfaces.mqtt_interface import MQTTInterface, OfflineMQTTInterface
+from servers.modbus_async_server import AsyncModbusHost
+from process_sim.tick_metrics import SUMMARY_SECONDS, format_summary
 
-# Ensure the 'data' directory exists
-log_dir = os.path.join(os.path.dirname(__file__), "data")
-os.makedirs(log_dir, exist_ok=True)
-
-# Set full path to log file inside data/
-log_path = os.path.join(log_dir, "logs.txt")
-
-# Reset logging if needed
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# Setup logging to file
-logging.basicConfig(
-    level=logging.INFO,
-    filename=log_path,
-    filemode="w",
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
-
-# Optional: Console output to debug
-console = logging.StreamHandler()
-console.setLevel(logging.DEBUG)
-console.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-logging.getLogger().addHandler(console)
+logger = logging.getLogger(__name__)
 
 class SimulationThread(threading.Thread):
     """
@@ -55,27 +37,160 @@ class SimulationThread(threading.Thread):
       - PLC and SCADA updates
       - Process component updates
       - Optional real-time graph visualization
+      - Optional per-phase tick metrics, summarized in the log every
+        `metrics_log_interval` seconds of a real-time run
+
+    In headless mode no broker, Modbus server or dashboard is needed: the PLCs
+    and SCADA run without their Modbus front ends, nothing is published, and
+    `run_headless` advances a simulated clock without sleeping.
+
+    Modbus endpoints are hosted according to `modbus_mode` (or the layout's
+    "modbus": {"mode": ...} setting):
+      - "threaded": one ModbusTCPServer thread per PLC/SCADA (default)
+      - "async": one asyncio event loop serving every PLC/SCADA port
+      - "shared": one asyncio port ("modbus": {"host", "port"}, default 5020)
+        with requests routed by unit ID (PLC "unit_id", default: position + 1;
+        the SCADA follows the PLCs)
     """
 
-    def __init__(self, graph, interval=1.0, debug=False):
+    def __init__(self, graph, interval=1.0, debug=False, headless=False, scan_mode=None,
+                 modbus_mode=None, shared_state=None, metrics=None, metrics_log_interval=SUMMARY_SECONDS):
         """
         Args:
             graph (ProcessGraph): The simulation graph (nodes and lines).
             interval (float): Time (in seconds) between simulation ticks.
             debug (bool): Enables live graph visualization if True.
+            headless (bool): Run without MQTT, Modbus or sleeping between ticks.
+            scan_mode (str, optional): "cyclic" or "event" to override the scan mode
+                of every PLC and the SCADA; by default each uses its own config.
+            modbus_mode (str, optional): "threaded", "async" or "shared" (see above).
+            shared_state (SharedStateWriter, optional): Shared-memory segment updated every tick.
+            metrics (TickMetrics, optional): Records phase timings, overruns and late ticks.
+            metrics_log_interval (float): Seconds between metric summaries in the log (0 disables).
         """
         super().__init__()
         self.graph = graph
         self.interval = interval
         self.running = False
         self.debug = debug
+        self.headless = headless
+        self.shared_state = shared_state
+        self.metrics = metrics
+        self.metrics_log_interval = metrics_log_interval
 
-        # Initialize shared MQTT interface
-        self.mqtt = MQTTInterface(client_id="sim_control")
+        # Simulated clock, advanced by `interval` on every tick
+        self.ticks = 0
+        self.sim_time = 0.0
+
+        self.modbus_host = None
+        if headless:
+            self.mqtt = OfflineMQTTInterface(client_id="sim_control")
+            self.plcs = [PLC(plc_config, graph, self.mqtt) for plc_config in graph.plc_configs]
+            self.scada = SCADA(graph.scada_config, graph, self.mqtt) if graph.scada_config else None
+            self._apply_scan_mode(scan_mode)
+            return
+
+        # Reuse the graph's shared MQTT connection when it has one
+        if graph.mqtt_manager is not None:
+            self.mqtt = graph.mqtt_manager.interface(client_id="sim_control")
+        else:
+            self.mqtt = MQTTInterface(client_id="sim_control")
 
         # Initialize control systems
-        self.plcs = [ModbusPLC(plc_config, graph, self.mqtt) for plc_config in graph.plc_configs]
-        self.scada = ModbusSCADA(graph.scada_config, graph, self.mqtt) if graph.scada_config else None
+        self._create_modbus_controllers(modbus_mode or graph.modbus_config.get("mode", "threaded"))
+        self._apply_scan_mode(scan_mode)
+
+    def _create_modbus_controllers(self, modbus_mode):
+        """Creates the Modbus PLCs and SCADA, hosted according to `modbus_mode`."""
+        graph = self.graph
+        if modbus_mode == "threaded":
+            self.plcs = [ModbusPLC(plc_config, graph, self.mqtt) for plc_config in graph.plc_configs]
+            self.scada = ModbusSCADA(graph.scada_config, graph, self.mqtt) if graph.scada_config else None
+            return
+
+        self.modbus_host = AsyncModbusHost()
+        if modbus_mode == "async":
+            self.plcs = [ModbusPLC(plc_config, graph, self.mqtt, modbus_host=self.modbus_host)
+                         for plc_config in graph.plc_configs]
+            self.scada = (ModbusSCADA(graph.scada_config, graph, self.mqtt, modbus_host=self.modbus_host)
+                          if graph.scada_config else None)
+        elif modbus_mode == "shared":
+            address = {
+                "ip": graph.modbus_config.get("host", "127.0.0.1"),
+                "port": graph.modbus_config.get("port", 5020),
+            }
+            self.plcs = []
+            for i, plc_config in enumerate(graph.plc_configs):
+                unit_id = plc_config.get("unit_id", i + 1)
+                self.plcs.append(ModbusPLC({**plc_config, **address}, graph, self.mqtt,
+                                           modbus_host=self.modbus_host, unit_id=unit_id))
+                logger.info("[SIM] %s served at %s:%s, unit %s",
+                            plc_config['id'], address['ip'], address['port'], unit_id)
+            self.scada = None
+            if graph.scada_config:
+                unit_id = graph.scada_config.get("unit_id", len(self.plcs) + 1)
+                self.scada = ModbusSCADA({**graph.scada_config, **address}, graph, self.mqtt,
+                                         modbus_host=self.modbus_host, unit_id=unit_id)
+        else:
+            raise ValueError(f"Unknown Modbus mode: {modbus_mode}")
+
+        self.modbus_host.start()
+
+    def _controllers(self):
+        """Returns all PLCs plus the SCADA, if present."""
+        return self.plcs + ([self.scada] if self.scada else [])
+
+    def _apply_scan_mode(self, scan_mode):
+        """Overrides the scan mode of every controller when one is given."""
+        if scan_mode is None:
+            return
+        if scan_mode not in ("cyclic", "event"):
+            raise ValueError(f"Unknown scan mode: {scan_mode}")
+        for controller in self._controllers():
+            controller.engine.event_driven = scan_mode == "event"
+
+    def scan_stats(self):
+        """
+        Returns how many rule evaluations the controllers performed and skipped.
+
+        Returns:
+            dict: "rules_evaluated" and "rules_skipped" summed over all controllers.
+        """
+        controllers = self._controllers()
+        return {
+            "rules_evaluated": sum(c.engine.rules_evaluated for c in controllers),
+            "rules_skipped": sum(c.engine.rules_skipped for c in controllers),
+        }
+
+    def step(self):
+        """
+        Runs a single simulation tick and advances the simulated clock.
+        """
+        # Update PLCs
+        t0 = time.perf_counter()
+        for plc in self.plcs:
+            plc.update()
+
+        # Update SCADA if present
+        t1 = time.perf_counter()
+        if self.scada:
+            self.scada.update()
+
+        # Update process graph and publish values
+        t2 = time.perf_counter()
+        self.graph.update()
+        t3 = time.perf_counter()
+        if not self.headless:
+            self.graph.publish()
+
+        t4 = time.perf_counter()
+        self.ticks += 1
+        self.sim_time += self.interval
+        if self.shared_state:
+            self.shared_state.write(self.ticks, self.sim_time)
+
+        if self.metrics:
+            self.metrics.observe((t1 - t0, t2 - t1, t3 - t2, t4 - t3, time.perf_counter() - t4))
 
     def run(self):
         """
@@ -83,35 +198,84 @@ class SimulationThread(threading.Thread):
         and handles optional real-time visualization. Maintains a consistent tick rate.
         """
         self.running = True
-        logging.info("[SIM] Starting simulation loop...")
+        logger.info("[SIM] Starting simulation loop...")
 
         if self.debug:
-            logging.info("[SIM] Debug mode: Starting live graph visualizer...")
+            logger.info("[SIM] Debug mode: Starting live graph visualizer...")
             threading.Thread(target=lambda: render_live_graph(self.graph, self.interval), daemon=True).start()
 
+        # When the next tick is due (one interval after the previous one started)
+        scheduled = time.perf_counter()
+        next_summary = scheduled + self.metrics_log_interval
         while self.running:
-            start_time = time.time()
-
-            # Update PLCs
-            for plc in self.plcs:
-                plc.update()
+            start_time = time.perf_counter()
 
-            # Update SCADA if present
-            if self.scada:
-                self.scada.update()
-
-            # Update process graph and publish values
-            self.graph.update()
-            self.graph.publish()
+            self.step()
 
             # Sleep to maintain fixed update rate
-            elapsed = time.time() - start_time
+            elapsed = time.perf_counter() - start_time
             sleep_time = max(0, self.interval - elapsed)
+
+            if self.metrics:
+                self.metrics.observe_schedule(elapsed, max(0.0, start_time - scheduled), self.interval)
+                if self.metrics_log_interval and start_time >= next_summary:
+                    logger.info("[SIM] Tick metrics: %s", format_summary(self.metrics.summary()))
+                    next_summary = start_time + self.metrics_log_interval
+            scheduled = start_time + self.interval
+
             time.sleep(sleep_time)
 
+    def run_headless(self, ticks=None, duration=None):
+        """
+        Runs the simulation in the calling thread as fast as possible.
+
+        Stops after `ticks` ticks or once `duration` simulated seconds have
+        elapsed, whichever comes first, or when `stop()` is called.
+
+        Args:
+            ticks (int, optional): Number of ticks to run.
+            duration (float, optional): Simulated time (in seconds) to run.
+
+        Returns:
+            dict: Ticks run, simulated and wall-clock seconds, and ticks per second.
+        """
+        if ticks is None and duration is None:
+            raise ValueError("Headless runs need a tick count or a simulated duration.")
+        if duration is not None:
+            duration_ticks = int(round(duration / self.interval))
+            ticks = duration_ticks if ticks is None else min(ticks, duration_ticks)
+
+        self.running = True
+        logger.info("[SIM] Starting headless run of %s ticks...", ticks)
+
+        start_ticks = self.ticks
+        start_sim_time = self.sim_time
+        start_time = time.perf_counter()
+        while self.running and self.ticks - start_ticks < ticks:
+            self.step()
+        wall_time = time.perf_counter() - start_time
+        self.running = False
+
+        ran = self.ticks - start_ticks
+        report = {
+            "ticks": ran,
+            "sim_seconds": self.sim_time - start_sim_time,
+            "wall_seconds": wall_time,
+            "ticks_per_sec": ran / wall_time if wall_time > 0 else float("inf"),
+            **self.scan_stats(),
+        }
+        logger.info("[SIM] Headless run finished: %s ticks in %.3fs (%.1f ticks/s)",
+                    ran, wall_time, report['ticks_per_sec'])
+        if self.metrics:
+            report["metrics"] = self.metrics.summary()
+        return report
+
     def stop(self):
         """
-        Stops the simulation loop on the next iteration.
+        Stops the simulation loop on the next iteration and closes the shared
+        Modbus host, if one serves the controllers.
         """
         self.running = False
-        logging.info("[SIM] Stopping simulation loop...")
+        logger.info("[SIM] Stopping simulation loop...")
+        if self.modbus_host is not None:
+            self.modbus_host.stop()
@@ -8,8 +8,11 @@ Classes:
     Splitter - Splits received volume equally across its outputs.
 """
 
+import logging
 from process_sim.base import ProcessComponent
 
+logger = logging.getLogger(__name__)
+
 class Splitter(ProcessComponent):
     """
     A passive process component that splits input flow evenly between all connected outputs.
@@ -41,7 +44,7 @@ class Splitter(ProcessComponent):
             amount (float): The volume of fluid to distribute.
         """
         if not self.outputs:
-            print(f"[Splitter {self.id}] Warning: No outputs to distribute to.")
+            logger.warning("[Splitter %s] Warning: No outputs to distribute to.", self.id)
             return
 
         # Calculate the amount to send to each output
@@ -49,7 +52,7 @@ class Splitter(ProcessComponent):
         for line in self.outputs:
             if line.target:
                 line.target.transfer(split_amount)
-                print(f"[Splitter {self.id}] Transferred {split_amount} units to {line.target.id}")
+                logger.info("[Splitter %s] Transferred %s units to %s", self.id, split_amount, line.target.id)
 
     def update(self):
         """
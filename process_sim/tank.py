@@ -9,41 +9,24 @@ Classes:
 """
 
 import logging
-import os
 from process_sim.base import ProcessComponent
 from process_sim.interfaces.mqtt_interface import MQTTInterface
 
-# Ensure the 'data' directory exists
-log_dir = os.path.join(os.path.dirname(__file__), "data")
-os.makedirs(log_dir, exist_ok=True)
-
-# Set full path to log file inside data/
-log_path = os.path.join(log_dir, "logs.txt")
-
-# Reset logging if needed
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# Setup logging to file
-logging.basicConfig(
-    level=logging.INFO,
-    filename=log_path,
-    filemode="w",
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
-
-# Optional: Console output to debug
-console = logging.StreamHandler()
-console.setLevel(logging.DEBUG)
-console.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-logging.getLogger().addHandler(console)
+logger = logging.getLogger(__name__)
 
 class Tank(ProcessComponent):
     """
     Tank node that stores fluid volume. Can receive input from connected lines and
     report status via MQTT. Maximum capacity is configurable remotely.
+
+    When the owning graph is compiled into a `VectorizedEngine`, the volume and
+    capacity live in the engine's arrays and the attributes below read and write
+    through to them.
     """
 
+    _engine = None  # VectorizedEngine this tank is bound to, if any
+    _slot = None    # Index of this tank in the engine arrays
+
     def __init__(self, id, name, max_capacity, mqtt_interface: MQTTInterface):
         """
         Args:
@@ -55,6 +38,7 @@ class Tank(ProcessComponent):
         super().__init__(id, name)
         self.max_capacity = max_capacity
         self.current_volume = 0.0
+        self.total_overflow = 0.0  # Volume lost to capacity limits so far
         self.inputs = []
         self.outputs = []
         self.mqtt = mqtt_interface
@@ -62,6 +46,59 @@ class Tank(ProcessComponent):
         # Listen for remote capacity adjustments
         self.mqtt.subscribe(f"set/tank/{self.id}/max_capacity", self.handle_set_max)
 
+    @property
+    def current_volume(self):
+        """Current stored volume."""
+        if self._engine is not None:
+            return float(self._engine.volumes[self._slot])
+        return self._current_volume
+
+    @current_volume.setter
+    def current_volume(self, value):
+        if self._engine is not None:
+            self._engine.volumes[self._slot] = value
+        else:
+            self._current_volume = value
+
+    @property
+    def total_overflow(self):
+        """Cumulative volume lost because the tank was full."""
+        if self._engine is not None:
+            return float(self._engine.overflow[self._slot])
+        return self._total_overflow
+
+    @total_overflow.setter
+    def total_overflow(self, value):
+        if self._engine is not None:
+            self._engine.overflow[self._slot] = value
+        else:
+            self._total_overflow = value
+
+    @property
+    def max_capacity(self):
+        """Maximum volume the tank can hold."""
+        if self._engine is not None:
+            return float(self._engine.capacities[self._slot])
+        return self._max_capacity
+
+    @max_capacity.setter
+    def max_capacity(self, value):
+        if self._engine is not None:
+            self._engine.capacities[self._slot] = value
+        else:
+            self._max_capacity = value
+
+    def bind_engine(self, engine, slot):
+        """
+        Moves this tank's state into a compiled engine's arrays.
+
+        Args:
+            engine (VectorizedEngine): The engine that now owns the state.
+            slot (int): Index of this tank in the engine arrays.
+        """
+        self._engine = engine
+        self._slot = slot
+
     def handle_set_max(self, msg):
         """
         Handle incoming MQTT messages to update the tank's maximum capacity.
@@ -72,7 +109,7 @@ class Tank(ProcessComponent):
         try:
             self.max_capacity = float(msg)
         except ValueError:
-            logging.info(f"[Tank {self.id}] Invalid max_capacity: {msg}")
+            logger.info("[Tank %s] Invalid max_capacity: %s", self.id, msg)
 
     def add_input(self, line):
         """Registers an incoming connection line."""
@@ -93,9 +130,10 @@ class Tank(ProcessComponent):
         self.current_volume = min(self.current_volume + amount, self.max_capacity)
 
         if overflow > 0:
+            self.total_overflow += overflow
             # Log overflow event
             self.mqtt.publish(f"tank/{self.id}/overflow", overflow)
-            logging.info(f"[Tank {self.id}] Overflow detected: {overflow} units lost.")
+            logger.info("[Tank %s] Overflow detected: %s units lost.", self.id, overflow)
     
     def transfer(self, amount):
         """
@@ -107,8 +145,9 @@ class Tank(ProcessComponent):
         if amount < 0:
             raise ValueError("Transfer amount cannot be negative.")
         
+        self.total_overflow += max(0, self.current_volume + amount - self.max_capacity)
         self.current_volume = min(self.current_volume + amount, self.max_capacity)
-        logging.info(f"[Tank {self.id}] Transferred {amount} units. Current volume: {self.current_volume}")
+        logger.info("[Tank %s] Transferred %s units. Current volume: %s", self.id, amount, self.current_volume)
         
 
     def output(self):
@@ -124,10 +163,22 @@ class Tank(ProcessComponent):
         """No periodic logic required for tanks, reserved for future use."""
         pass
 
+    def telemetry(self):
+        """
+        Returns the tank's telemetry as (topic, value) pairs.
+
+        Returns:
+            list: Volume and max capacity topics with their current values.
+        """
+        return [
+            (f"tank/{self.id}/volume", self.current_volume),
+            (f"tank/{self.id}/max_capacity", self.max_capacity),
+        ]
+
     def publish(self):
         """
         Publishes current tank state (volume and max capacity) to MQTT topics.
         """
-        self.mqtt.publish(f"tank/{self.id}/volume", self.current_volume)
-        self.mqtt.publish(f"tank/{self.id}/max_capacity", self.max_capacity)
-        logging.info(f"[Tank {self.id}] Published volume: {self.current_volume}, max_capacity: {self.max_capacity}")
+        for topic, value in self.telemetry():
+            self.mqtt.publish(topic, value)
+        logger.info("[Tank %s] Published volume: %s, max_capacity: %s", self.id, self.current_volume, self.max_capacity)
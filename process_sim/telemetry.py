@@ -0,0 +1,162 @@
+"""
+Telemetry Publisher
+
+This module implements change-only publishing of process telemetry. Instead of
+sending every tank volume and pump state on every tick, each value is only
+published when it has moved past a configurable dead-band since it was last
+sent. One compact aggregate snapshot of the whole plant is additionally
+published per tick for consumers that want every value.
+
+Layout configuration (optional top-level "telemetry" key):
+
+    "telemetry": {
+        "mode": "deadband",
+        "default_deadband": 0,
+        "deadband": {"tank/*/volume": 5, "pump/*/rate": 1},
+        "snapshot_topic": "sim/snapshot"
+    }
+
+Classes:
+    TelemetryPublisher - Dead-band filter and snapshot publisher for a ProcessGraph.
+"""
+
+import json
+import logging
+from fnmatch import fnmatch
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetryPublisher:
+    """
+    Publishes component telemetry only when values change past their dead-band.
+
+    Attributes:
+        mode (str): "deadband" for change-only publishing, "all" to publish every value.
+        deadbands (dict): Topic pattern (fnmatch syntax) -> dead-band for numeric values.
+        default_deadband (float): Dead-band for topics that match no pattern.
+        snapshot_topic (str or None): Topic of the per-tick aggregate snapshot.
+    """
+
+    def __init__(self, mqtt_interface, mode="deadband", deadbands=None, default_deadband=0.0,
+                 snapshot_topic="sim/snapshot"):
+        """
+        Args:
+            mqtt_interface (MQTTInterface): Interface used for the snapshot message.
+            mode (str): "deadband" or "all".
+            deadbands (dict, optional): Topic pattern -> dead-band.
+            default_deadband (float): Dead-band for unmatched topics. 0 publishes any change.
+            snapshot_topic (str or None): Snapshot topic, or None to disable snapshots.
+        """
+        if mode not in ("deadband", "all"):
+            raise ValueError(f"Unknown telemetry mode: {mode}")
+        self.mqtt = mqtt_interface
+        self.mode = mode
+        self.deadbands = deadbands or {}
+        self.default_deadband = default_deadband
+        self.snapshot_topic = snapshot_topic
+        self.published = 0
+        self.suppressed = 0
+        self.failed = 0           # values the interface did not send (rate limited or offline)
+        self._last_sent = {}      # topic -> last published value
+        self._topic_bands = {}    # topic -> resolved dead-band (pattern match cache)
+
+    @classmethod
+    def from_config(cls, config, mqtt_interface):
+        """
+        Builds a publisher from the layout's "telemetry" section.
+
+        Args:
+            config (dict): Telemetry configuration.
+            mqtt_interface (MQTTInterface): Interface used for the snapshot message.
+
+        Returns:
+            TelemetryPublisher: The configured publisher.
+        """
+        return cls(
+            mqtt_interface,
+            mode=config.get("mode", "deadband"),
+            deadbands=config.get("deadband", {}),
+            default_deadband=config.get("default_deadband", 0.0),
+            snapshot_topic=config.get("snapshot_topic", "sim/snapshot"),
+        )
+
+    def _deadband_for(self, topic):
+        """Returns the dead-band of a topic, resolving patterns once per topic."""
+        band = self._topic_bands.get(topic)
+        if band is None:
+            band = self.default_deadband
+            for pattern, value in self.deadbands.items():
+                if fnmatch(topic, pattern):
+                    band = value
+                    break
+            self._topic_bands[topic] = band
+        return band
+
+    def should_publish(self, topic, value):
+        """
+        Decides whether a value should be published.
+
+        Numeric values are sent when they differ from the last sent value by more
+        than the topic's dead-band (any change if the dead-band is 0). Other
+        values are sent whenever they change. Only values passed to `mark_sent`
+        count as sent, so a value that failed to go out is offered again.
+
+        Args:
+            topic (str): Telemetry topic.
+            value: Current value.
+
+        Returns:
+            bool: True if the value should be published.
+        """
+        if topic not in self._last_sent:
+            return True
+
+        last = self._last_sent[topic]
+        if isinstance(value, (int, float)) and isinstance(last, (int, float)):
+            band = self._deadband_for(topic)
+            return abs(value - last) > band if band > 0 else value != last
+        return value != last
+
+    def mark_sent(self, topic, value):
+        """
+        Records a value as the last one the broker received for a topic.
+
+        Args:
+            topic (str): Telemetry topic.
+            value: The published value.
+        """
+        self._last_sent[topic] = value
+
+    def publish(self, graph):
+        """
+        Publishes changed telemetry of every component, then the snapshot.
+
+        Args:
+            graph (ProcessGraph): The graph whose components are published.
+        """
+        snapshot = {}
+        for node in graph.nodes.values():
+            if not hasattr(node, "telemetry"):
+                continue
+            values = {}
+            for topic, value in node.telemetry():
+                values[topic.rsplit("/", 1)[-1]] = value
+                if self.mode == "all" or self.should_publish(topic, value):
+                    try:
+                        sent = node.mqtt.publish(topic, value)
+                    except Exception:
+                        logger.exception("[TELEMETRY] Failed to publish %s", topic)
+                        sent = False
+                    if sent:
+                        self.mark_sent(topic, value)
+                        self.published += 1
+                    else:
+                        self.failed += 1
+                else:
+                    self.suppressed += 1
+            snapshot[node.id] = values
+
+        if self.snapshot_topic:
+            self.mqtt.publish(self.snapshot_topic, json.dumps(snapshot, separators=(",", ":")))
+            logger.debug("[TELEMETRY] Snapshot of %s components published", len(snapshot))
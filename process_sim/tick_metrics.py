@@ -0,0 +1,194 @@
+"""
+Simulation Tick Metrics
+
+This module records how long each phase of a simulation tick takes and how
+well the loop keeps to its interval, and renders the figures as Prometheus
+text or a one-line log summary.
+
+Every tick adds one observation to a latency histogram per phase (PLC scans,
+SCADA scan, graph update, graph publish, shared-state write) and one for the
+whole tick. The real-time loop also counts:
+
+  - overruns:   ticks that took longer than the interval
+  - late ticks: ticks that started more than `LATE_TOLERANCE` of an interval
+                after they were due, one interval after the previous tick
+                started (after an overrun, or when the loop thread was held up)
+
+and keeps the lateness of the last tick as a gauge.
+
+All figures live in one flat float64 array, so they can be placed in shared
+memory (see SharedStateWriter) and scraped by the dashboard process. Updates
+take no lock: a reader may see one observation half applied, which is
+harmless for monotonic counters.
+
+Classes:
+    TickMetrics - Per-phase histograms, overrun and late-tick counters.
+
+Functions:
+    format_summary - Formats a `TickMetrics.summary()` dictionary as one log line.
+"""
+
+from bisect import bisect_left
+
+import numpy as np
+
+PHASES = ("plcs", "scada", "update", "publish", "shared_state")
+
+# Histogram bucket upper bounds in seconds (Prometheus "le"); +Inf is implicit
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LATE_TOLERANCE = 0.1  # fraction of the interval a tick may start after it was due
+SUMMARY_SECONDS = 60.0  # default period of the log summary
+
+_SERIES = PHASES + ("tick",)
+_ROW = len(BUCKETS) + 2  # bucket counts (the last one +Inf), then the sum of observations
+_TICKS, _OVERRUNS, _LATE, _LAG, _INTERVAL, _LAST = range(len(_SERIES) * _ROW, len(_SERIES) * _ROW + 6)
+SIZE = _LAST + 1
+NBYTES = SIZE * 8
+
+
+def _quantile(counts, q):
+    """Returns the upper bound of the bucket holding quantile `q` (inf in the +Inf bucket)."""
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+    index = int(np.searchsorted(np.cumsum(counts), q * total))
+    return BUCKETS[index] if index < len(BUCKETS) else float("inf")
+
+
+class TickMetrics:
+    """
+    Tick timing histograms and schedule counters.
+
+    Attributes:
+        values (np.ndarray): All figures, `SIZE` float64 values.
+    """
+
+    def __init__(self, buffer=None, offset=0):
+        """
+        Args:
+            buffer (buffer, optional): Memory holding the values (e.g. a shared-memory
+                segment). Defaults to a private zeroed array.
+            offset (int): Byte offset of the values in `buffer`.
+        """
+        if buffer is None:
+            self.values = np.zeros(SIZE, dtype=np.float64)
+        else:
+            self.values = np.ndarray(SIZE, dtype=np.float64, buffer=buffer, offset=offset)
+        self._histograms = self.values[:len(_SERIES) * _ROW].reshape(len(_SERIES), _ROW)
+        self._last_summary = np.zeros(SIZE, dtype=np.float64)
+
+    def observe(self, durations):
+        """
+        Records one tick.
+
+        Args:
+            durations (sequence): Seconds spent in each of `PHASES`, in order.
+        """
+        histograms = self._histograms
+        total = 0.0
+        for row, seconds in enumerate(durations):
+            histograms[row, bisect_left(BUCKETS, seconds)] += 1
+            histograms[row, -1] += seconds
+            total += seconds
+        histograms[-1, bisect_left(BUCKETS, total)] += 1
+        histograms[-1, -1] += total
+        self.values[_TICKS] += 1
+        self.values[_LAST] = total
+
+    def observe_schedule(self, elapsed, lag, interval):
+        """
+        Records how a real-time tick kept to the schedule.
+
+        Args:
+            elapsed (float): Seconds the tick took.
+            lag (float): Seconds the tick started after it was due.
+            interval (float): Target seconds per tick.
+        """
+        values = self.values
+        values[_INTERVAL] = interval
+        values[_LAG] = lag
+        if elapsed > interval:
+            values[_OVERRUNS] += 1
+        if lag > LATE_TOLERANCE * interval:
+            values[_LATE] += 1
+
+    def to_prometheus(self, prefix="securesim"):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): Prefix of every metric name.
+
+        Returns:
+            str: Metrics text, one sample per line.
+        """
+        values = self.values.copy()
+        histograms = values[:len(_SERIES) * _ROW].reshape(len(_SERIES), _ROW)
+        lines = []
+
+        def histogram(name, help_text, rows):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for label, row in rows:
+                selector = f"{{{label}}}" if label else ""
+                cumulative = np.cumsum(row[:-1])
+                for bound, count in zip(BUCKETS + ("+Inf",), cumulative):
+                    lines.append(f'{name}_bucket{{{label + "," if label else ""}le="{bound}"}} {int(count)}')
+                lines.append(f"{name}_sum{selector} {float(row[-1])!r}")
+                lines.append(f"{name}_count{selector} {int(cumulative[-1])}")
+
+        def sample(name, kind, help_text, value):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value!r}")
+
+        histogram(f"{prefix}_tick_phase_seconds", "Time spent in each phase of a simulation tick.",
+                  [(f'phase="{phase}"', histograms[row]) for row, phase in enumerate(PHASES)])
+        histogram(f"{prefix}_tick_seconds", "Duration of whole simulation ticks.", [("", histograms[-1])])
+        sample(f"{prefix}_ticks_total", "counter", "Simulation ticks run.", int(values[_TICKS]))
+        sample(f"{prefix}_tick_overruns_total", "counter", "Ticks that took longer than the interval.",
+               int(values[_OVERRUNS]))
+        sample(f"{prefix}_late_ticks_total", "counter", "Ticks that started late.", int(values[_LATE]))
+        sample(f"{prefix}_tick_lag_seconds", "gauge", "How late the last tick started.",
+               float(values[_LAG]))
+        sample(f"{prefix}_tick_interval_seconds", "gauge", "Target time per tick.", float(values[_INTERVAL]))
+        sample(f"{prefix}_last_tick_seconds", "gauge", "Duration of the last tick.", float(values[_LAST]))
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """
+        Summarizes the ticks recorded since the previous call.
+
+        Returns:
+            dict: "ticks", "overruns", "late_ticks", current "lag_ms", "tick_mean_ms",
+            "tick_p99_ms" (bucket upper bound) and "phase_mean_ms" per phase.
+        """
+        current = self.values.copy()
+        delta = current - self._last_summary
+        self._last_summary = current
+        histograms = delta[:len(_SERIES) * _ROW].reshape(len(_SERIES), _ROW)
+        ticks = int(delta[_TICKS])
+
+        def mean_ms(row):
+            return row[-1] / ticks * 1000 if ticks else 0.0
+
+        return {
+            "ticks": ticks,
+            "overruns": int(delta[_OVERRUNS]),
+            "late_ticks": int(delta[_LATE]),
+            "lag_ms": float(current[_LAG]) * 1000,
+            "tick_mean_ms": mean_ms(histograms[-1]),
+            "tick_p99_ms": _quantile(histograms[-1, :-1], 0.99) * 1000,
+            "phase_mean_ms": {phase: mean_ms(histograms[row]) for row, phase in enumerate(PHASES)},
+        }
+
+
+def format_summary(summary):
+    """
+    Formats a `TickMetrics.summary()` dictionary as one log line.
+    """
+    phases = " ".join(f"{phase} {ms:.3f}" for phase, ms in summary["phase_mean_ms"].items())
+    return (f"{summary['ticks']} ticks, {summary['overruns']} overruns, {summary['late_ticks']} late "
+            f"(lag {summary['lag_ms']:.1f} ms); tick mean {summary['tick_mean_ms']:.3f} ms, "
+            f"p99 <= {summary['tick_p99_ms']:g} ms; phase means (ms): {phases}")
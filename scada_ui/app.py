@@ -8,14 +8,17 @@ from flask import Flask
 from scada_ui.routes.dashboard import dashboard_bp
 from scada_ui.routes.logs import logs_bp
 from scada_ui.routes.components import components_bp
-from process_sim.layout_parser import load_layout
-from process_sim.graph_visualizer import render_process_graph_to_file
+from process_sim.logging_config import setup_logging, DEFAULT_LOG_PATH
+from scada_ui.services.graph_image import graph_image
+
+# The simulation owns data/logs.txt (and rotates it); the dashboard process keeps its own log
+UI_LOG_PATH = os.path.join(os.path.dirname(DEFAULT_LOG_PATH), "ui_logs.txt")
 
 
 def update_graph_loop():
-    graph = load_layout("Process_sim.json")
+    # The image only shows the layout: re-render it (in the worker process) only when the layout changes
     while True:
-        render_process_graph_to_file(graph, output_path="scada_ui/static/img/graph.png")
+        graph_image.refresh()
         time.sleep(1)
 
 def create_app():
@@ -31,5 +34,7 @@ def create_app():
     return app
 
 if __name__ == "__main__":
+    setup_logging(log_path=UI_LOG_PATH)
     app = create_app()
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # No reloader: it would start a second process logging to (and rotating) the same file
+    app.run(debug=True, port=5000, use_reloader=False)
\ No newline at end of file
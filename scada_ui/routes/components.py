@@ -1,5 +1,5 @@
-import json
 from flask import Blueprint, render_template
+from scada_ui.services.layout_service import layout_service
 from scada_ui.auth import auth
 
 components_bp = Blueprint('components', __name__)
@@ -7,6 +7,4 @@ components_bp = Blueprint('components', __name__)
 @components_bp.route("/components")
 @auth.login_required
 def components():
-    with open('Process_sim.json', 'r') as f:
-        layout = json.load(f)
-    return render_template("components.html", nodes=layout["nodes"])
\ No newline at end of file
+    return render_template("components.html", nodes=layout_service.layout()["nodes"])
\ No newline at end of file
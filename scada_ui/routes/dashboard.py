@@ -1,10 +1,18 @@
-import json
-from flask import Blueprint, render_template, jsonify
-from scada_ui.services.graph_state import get_modbus_state
+import queue
+from flask import Blueprint, render_template, jsonify, Response, request
+from scada_ui.services import graph_state
+from scada_ui.services.graph_state import get_modbus_state, broadcaster, changes_since
+from scada_ui.services.layout_service import layout_service
+from scada_ui.services.graph_image import graph_image
+from scada_ui.services.topology import topology_service
 from scada_ui.auth import auth
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+STREAM_KEEPALIVE_SECONDS = 15
+HISTORY_DEFAULT_POINTS = 500
+HISTORY_MAX_POINTS = 5000
+
 @dashboard_bp.route("/")
 @auth.login_required
 def dashboard():
@@ -13,13 +21,89 @@ def dashboard():
 @dashboard_bp.route("/api/state")
 @auth.login_required
 def api_state():
-    # Poll the Process_sim.json to understand how many pumps and tanks exist
-    with open('Process_sim.json', 'r') as f:
-        layout = json.load(f)
+    return jsonify(build_state())
+
+@dashboard_bp.route("/api/stream")
+@auth.login_required
+def api_stream():
+    # Server-sent events: one full snapshot, then the deltas fanned out by the broadcaster
+    client = broadcaster.subscribe()
+    snapshot = broadcaster.encode("snapshot", build_state())
+
+    def generate():
+        try:
+            yield snapshot
+            while True:
+                try:
+                    event = client.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield b": keep-alive\n\n"
+                    continue
+                if event is None:
+                    return  # too far behind; the browser reconnects with a fresh snapshot
+                yield event
+        finally:
+            broadcaster.unsubscribe(client)
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@dashboard_bp.route("/api/topology")
+@auth.login_required
+def api_topology():
+    # Nodes, edges and positions; serialized once per layout version
+    payload, version = topology_service.get()
+    response = Response(payload, mimetype="application/json")
+    response.set_etag(version)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+@dashboard_bp.route("/api/delta")
+@auth.login_required
+def api_delta():
+    # Values changed after sequence ?since=<seq> (all known values when omitted)
+    delta, seq = changes_since(request.args.get("since", 0, type=int))
+    return jsonify({"seq": seq, "changes": delta})
+
+@dashboard_bp.route("/api/history")
+@auth.login_required
+def api_history():
+    # Trend data: ?ids=tank1,pump1&from=<epoch s>&to=<epoch s>&max_points=<n>, min/max/mean per point
+    ids = request.args.get("ids")
+    max_points = request.args.get("max_points", HISTORY_DEFAULT_POINTS, type=int)
+    history = graph_state.historian.query(
+        series_ids=ids.split(",") if ids else None,
+        start=request.args.get("from", type=float),
+        end=request.args.get("to", type=float),
+        max_points=min(max(max_points, 1), HISTORY_MAX_POINTS),
+    )
+    return jsonify(history)
+
+@dashboard_bp.route("/api/metrics")
+@auth.login_required
+def api_metrics():
+    # Simulation tick metrics (phase timing histograms, overruns, late ticks) in Prometheus text format
+    metrics = graph_state.tick_metrics()
+    if metrics is None:
+        return "Tick metrics unavailable", 503
+    return Response(metrics.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@dashboard_bp.route("/graph.png")
+@auth.login_required
+def graph_png():
+    # Rendered once per layout version; browsers revalidate with If-None-Match and get a 304
+    png, etag = graph_image.get()
+    if png is None:
+        return "Graph image unavailable", 503
+    response = Response(png, mimetype="image/png")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
 
-    # Extract pumps and tanks from the JSON
-    pumps = {pump['id']: pump for pump in layout['nodes'] if pump['type'] == 'Pump'}
-    tanks = {tank['id']: tank for tank in layout['nodes'] if tank['type'] == 'Tank'}
+def build_state():
+    # Pumps and tanks of the layout (cached, reloaded only when the file changes)
+    pumps = layout_service.pumps()
+    tanks = layout_service.tanks()
 
     # Create a mapping of pumps and tanks to their current state via Modbus
     state = {}
@@ -34,4 +118,4 @@ def api_state():
         tank_state = get_modbus_state(f"tank/{tank_id}/volume")  # Fetch the volume using MQTT
         state[tank_id] = {'name': tank['name'], 'volume': tank_state}
 
-    return jsonify(state)
+    return state
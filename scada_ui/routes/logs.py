@@ -1,9 +1,16 @@
 import os
-from flask import Blueprint, render_template, send_file
+import json
+import time
+from flask import Blueprint, render_template, send_file, request, jsonify, Response, stream_with_context
 from scada_ui.auth import auth
+from scada_ui.services.log_tail import read_log_chunk
 
 logs_bp = Blueprint('logs', __name__)
 
+LOG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'logs.txt'))
+STREAM_POLL_SECONDS = 0.5
+STREAM_KEEPALIVE_SECONDS = 15
+
 @logs_bp.route("/logs")
 @auth.login_required
 def logs():
@@ -12,7 +19,35 @@ def logs():
 @logs_bp.route("/logs/live")
 @auth.login_required
 def get_logs():
-    log_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'logs.txt'))
-    if os.path.exists(log_path):
-        return send_file(log_path, mimetype="text/plain")
-    return "Log file not found", 404
+    # ?since=<cursor> returns only the lines written after the cursor ("<inode>:<byte offset>")
+    since = request.args.get("since")
+    if since is None:
+        if os.path.exists(LOG_PATH):
+            return send_file(LOG_PATH, mimetype="text/plain")
+        return "Log file not found", 404
+
+    text, cursor, reset = read_log_chunk(LOG_PATH, since)
+    return jsonify({"lines": text.splitlines(), "cursor": cursor, "reset": reset})
+
+@logs_bp.route("/logs/stream")
+@auth.login_required
+def stream_logs():
+    # Server-sent events; the event ID is the cursor so reconnects resume where they left off
+    since = request.headers.get("Last-Event-ID") or request.args.get("since")
+
+    def generate(cursor):
+        last_sent = time.monotonic()
+        while True:
+            text, cursor, reset = read_log_chunk(LOG_PATH, cursor)
+            if text or reset:
+                payload = json.dumps({"lines": text.splitlines(), "reset": reset})
+                yield f"id: {cursor}\ndata: {payload}\n\n"
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent > STREAM_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            else:
+                time.sleep(STREAM_POLL_SECONDS)
+
+    return Response(stream_with_context(generate(since)), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
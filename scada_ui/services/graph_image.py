@@ -0,0 +1,127 @@
+"""
+Render-on-change cache of the layout graph image.
+
+The PNG only depends on the layout, so it is rendered once per layout version
+(the layout's content hash), kept in memory and served with that hash as its
+ETag. Rendering runs in a single worker process, so matplotlib never holds the
+GIL of the process answering requests. The worker is only started by the first
+render and is shut down when the interpreter exits.
+
+Classes:
+    GraphImageCache - Renders, caches and returns the PNG of the current layout.
+
+Functions:
+    render_layout_png - Renders a layout dictionary to PNG bytes.
+"""
+
+import atexit
+import io
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from process_sim.layout_parser import build_graph
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from process_sim.graph_visualizer import render_process_graph_to_file
+from scada_ui.services.layout_service import layout_service
+
+
+def render_layout_png(layout):
+    """
+    Renders the static process diagram of a layout.
+
+    Args:
+        layout (dict): Parsed layout JSON.
+
+    Returns:
+        bytes: The encoded PNG.
+    """
+    graph = build_graph(layout, mqtt_factory=OfflineMQTTInterface)
+    buffer = io.BytesIO()
+    render_process_graph_to_file(graph, output_path=buffer)
+    return buffer.getvalue()
+
+
+class GraphImageCache:
+    """
+    Keeps the PNG of the current layout version in memory.
+
+    While a new version renders, the previous image keeps being served.
+    """
+
+    def __init__(self, layout_service, use_process=True):
+        """
+        Args:
+            layout_service (LayoutService): Source of the layout and its version.
+            use_process (bool): Render in a worker process instead of a thread.
+        """
+        self.layout_service = layout_service
+        self.renders = 0
+        self.use_process = use_process
+        self._executor = None     # started by the first render
+        self._lock = threading.Lock()
+        self._image = None        # (version, png bytes)
+        self._pending = None      # (version, future)
+
+    def refresh(self):
+        """
+        Starts a render if the layout changed since the last one.
+
+        Returns:
+            Future or None: The running render, if any.
+        """
+        version = self.layout_service.current_version()
+        with self._lock:
+            if self._image and self._image[0] == version:
+                return None
+            if self._pending and self._pending[0] == version:
+                return self._pending[1]
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=1) if self.use_process else ThreadPoolExecutor(max_workers=1)
+                atexit.register(self.close)
+            future = self._executor.submit(render_layout_png, self.layout_service.layout())
+            self._pending = (version, future)
+        future.add_done_callback(lambda done, v=version: self._store(v, done))
+        return future
+
+    def close(self):
+        """
+        Shuts down the render worker, if one was started.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pending = None
+        if executor is not None:
+            atexit.unregister(self.close)
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _store(self, version, future):
+        if future.exception() is not None:
+            with self._lock:
+                if self._pending and self._pending[0] == version:
+                    self._pending = None
+            return
+        with self._lock:
+            self._image = (version, future.result())
+            self.renders += 1
+            if self._pending and self._pending[0] == version:
+                self._pending = None
+
+    def get(self, timeout=60):
+        """
+        Returns the image of the current layout, rendering it if needed.
+
+        Only waits for a render when no earlier image exists yet.
+
+        Returns:
+            tuple: (png bytes, etag), or (None, None) if rendering failed.
+        """
+        future = self.refresh()
+        if self._image is None and future is not None:
+            future.exception(timeout=timeout)
+        image = self._image
+        if image is None:
+            return None, None
+        return image[1], image[0]
+
+
+graph_image = GraphImageCache(layout_service)
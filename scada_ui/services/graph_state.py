@@ -1,22 +1,112 @@
+import logging
+import os
+import threading
+import time
 from scada_ui.services.mqtt_interface import MQTTInterface
+from scada_ui.services.state_broadcaster import StateBroadcaster
+from scada_ui.services.historian import Historian
+from process_sim.shared_state import SharedStateReader, ENV_VAR as SHARED_STATE_ENV_VAR
 
-mqtt = MQTTInterface()
+logger = logging.getLogger(__name__)
+
+SHARED_STATE_POLL_SECONDS = 0.25
+HISTORY_SAMPLE_SECONDS = 1.0
+
+# Field kept in the history for each kind of component
+HISTORY_FIELDS = {"tank": "volume", "pump": "state"}
+
+mqtt = None
+historian = None  # Trend history served by /api/history, created with the series known below
 latest_values = {}
+broadcaster = StateBroadcaster()  # Pushes changes to dashboards connected to /api/stream
+
+# Change sequence for /api/delta: every changed topic remembers the sequence number of its last change
+sequence = 0
+changed_at = {}
+_sequence_lock = threading.Lock()
 
 def handle_mqtt_message(topic, message):
-    if message is not None:
-        latest_values[topic] = message  # Cache latest non-null message
-
-# Subscribe to all known process topics at startup
-topics_to_subscribe = [
-    "pump/pump1/state", "pump/pump2/state", "pump/pump3/state",
-    "pump/pump4/state", "pump/pump5/state", "pump/pump6/state",
-    "tank/tank1/volume", "tank/tank2/volume", "tank/tank3/volume",
-    "tank/tank4/volume", "tank/tank5/volume", "tank/tank6/volume"
-]
-
-for topic in topics_to_subscribe:
-    mqtt.subscribe(topic, lambda msg, t=topic: handle_mqtt_message(t, msg))
+    global sequence
+    if message is not None and latest_values.get(topic) != message:
+        with _sequence_lock:
+            latest_values[topic] = message  # Cache latest non-null message
+            sequence += 1
+            changed_at[topic] = sequence
+        # "pump/pump1/state" -> pump1.state
+        _, component_id, field = topic.split("/", 2)
+        broadcaster.update(component_id, field, message)
+
+def poll_shared_state(reader, interval=SHARED_STATE_POLL_SECONDS):
+    # Feeds new ticks from the simulation's shared-memory segment into the same cache as MQTT
+    last_sequence = None
+    while True:
+        try:
+            snapshot = reader.read()
+        except TimeoutError:
+            # The simulation kept the segment busy through every retry: keep the last state and poll again
+            logger.warning("[SHARED-STATE] No consistent snapshot of %s, retrying", shared_state_name)
+            time.sleep(interval)
+            continue
+        if snapshot["sequence"] != last_sequence:
+            last_sequence = snapshot["sequence"]
+            sample = {}
+            for component_id, fields in snapshot["values"].items():
+                kind = "tank" if "volume" in fields else "pump"
+                sample[component_id] = fields[HISTORY_FIELDS[kind]]
+                for field, value in fields.items():
+                    if isinstance(value, float):
+                        value = round(value, 2)
+                    handle_mqtt_message(f"{kind}/{component_id}/{field}", value)
+            historian.record(time.time(), sample)  # one history row per new tick
+        time.sleep(interval)
+
+def sample_history(topics, interval=HISTORY_SAMPLE_SECONDS):
+    # Without shared memory there are no ticks to follow: record the cached values at a fixed rate
+    while True:
+        sample = {}
+        for topic in topics:
+            if topic in latest_values:
+                sample[topic.split("/")[1]] = latest_values[topic]
+        historian.record(time.time(), sample)
+        time.sleep(interval)
+
+shared_state_name = os.environ.get(SHARED_STATE_ENV_VAR)
+if shared_state_name:
+    # Read live state straight from the simulation process, without a broker round-trip
+    reader = SharedStateReader(shared_state_name)
+    historian = Historian(reader.tank_ids + reader.pump_ids)
+    threading.Thread(target=poll_shared_state, args=(reader,), daemon=True).start()
+else:
+    mqtt = MQTTInterface()
+
+    # Subscribe to all known process topics at startup
+    topics_to_subscribe = [
+        "pump/pump1/state", "pump/pump2/state", "pump/pump3/state",
+        "pump/pump4/state", "pump/pump5/state", "pump/pump6/state",
+        "tank/tank1/volume", "tank/tank2/volume", "tank/tank3/volume",
+        "tank/tank4/volume", "tank/tank5/volume", "tank/tank6/volume"
+    ]
+
+    for topic in topics_to_subscribe:
+        mqtt.subscribe(topic, lambda msg, t=topic: handle_mqtt_message(t, msg))
+
+    historian = Historian([topic.split("/")[1] for topic in topics_to_subscribe])
+    threading.Thread(target=sample_history, args=(topics_to_subscribe,), daemon=True).start()
+
+def changes_since(since):
+    # Returns ({component_id: {field: value}} changed after sequence `since`, current sequence)
+    delta = {}
+    with _sequence_lock:
+        current = sequence
+        changed = [topic for topic, seq in changed_at.items() if seq > since]
+    for topic in changed:
+        _, component_id, field = topic.split("/", 2)
+        delta.setdefault(component_id, {})[field] = latest_values[topic]
+    return delta, current
+
+def tick_metrics():
+    # The simulation's tick metrics, only shared along with the state in shared memory
+    return reader.metrics() if shared_state_name else None
 
 def get_modbus_state(topic):
     # Return cached value or "unknown" if not yet received
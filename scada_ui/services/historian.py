@@ -0,0 +1,150 @@
+"""
+In-memory time-series historian for the dashboard's trend queries.
+
+Every recorded sample is one row: a timestamp plus one value per series (tank
+volumes, and pump states as 1.0 = open / 0.0 = closed). Rows go into
+preallocated NumPy ring buffers, so memory is fixed at start-up and the oldest
+samples are overwritten once the buffer is full.
+
+Range queries locate their rows with a binary search on the timestamps and,
+when the range holds more than `max_points` rows, reduce them server-side into
+`max_points` buckets of min / max / mean with `ufunc.reduceat`.
+
+Classes:
+    Historian - Ring-buffered samples with range queries and downsampling.
+"""
+
+import threading
+
+import numpy as np
+
+# Samples kept per series: 24 hours at one sample per second
+DEFAULT_CAPACITY = 86400
+
+
+def to_number(value):
+    """Converts a published value ("open"/"closed", bools, numbers) to a float, or NaN."""
+    if value == "open":
+        return 1.0
+    if value == "closed":
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class Historian:
+    """
+    Fixed-size history of samples for a fixed set of series.
+
+    Timestamps must be recorded in non-decreasing order (e.g. wall-clock time of
+    each tick); queries rely on it for their binary search.
+    """
+
+    def __init__(self, series_ids, capacity=DEFAULT_CAPACITY):
+        """
+        Args:
+            series_ids (list): Series recorded, e.g. component IDs.
+            capacity (int): Samples kept before the oldest are overwritten.
+        """
+        self.series_ids = list(series_ids)
+        self.capacity = capacity
+        self._column = {series_id: i for i, series_id in enumerate(self.series_ids)}
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._values = np.full((capacity, len(self.series_ids)), np.nan, dtype=np.float64)
+        self._head = 0   # next row to write
+        self._count = 0  # rows in use
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def record(self, timestamp, values):
+        """
+        Appends one sample.
+
+        Args:
+            timestamp (float): Time of the sample in seconds.
+            values (dict): Series ID -> value; missing or unknown series are stored as NaN.
+        """
+        row = np.full(len(self.series_ids), np.nan)
+        for series_id, value in values.items():
+            column = self._column.get(series_id)
+            if column is not None:
+                row[column] = to_number(value)
+        with self._lock:
+            self._times[self._head] = timestamp
+            self._values[self._head] = row
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def _segments(self):
+        """Returns the filled rows as up to two slices, oldest first."""
+        if self._count < self.capacity:
+            return [slice(0, self._count)]
+        return [slice(self._head, self.capacity), slice(0, self._head)]
+
+    def _select(self, start, end, columns):
+        """Copies the timestamps and columns of the rows with start <= t <= end."""
+        times, values = [], []
+        with self._lock:
+            for segment in self._segments():
+                segment_times = self._times[segment]
+                lo = np.searchsorted(segment_times, start, side="left")
+                hi = np.searchsorted(segment_times, end, side="right")
+                if lo < hi:
+                    rows = np.arange(segment.start + lo, segment.start + hi)
+                    times.append(self._times[rows])
+                    values.append(self._values[np.ix_(rows, columns)])
+        if not times:
+            return np.empty(0), np.empty((0, len(columns)))
+        return np.concatenate(times), np.concatenate(values)
+
+    def query(self, series_ids=None, start=None, end=None, max_points=500):
+        """
+        Returns the samples of a time range, downsampled to at most `max_points`.
+
+        Each returned point is a bucket of consecutive samples with its first
+        timestamp and the min, max and mean of the series over the bucket
+        (NaN samples are ignored; a bucket with none left reports None).
+
+        Args:
+            series_ids (list, optional): Series to return. Defaults to all; unknown IDs are skipped.
+            start (float, optional): First timestamp included. Defaults to the oldest sample.
+            end (float, optional): Last timestamp included. Defaults to the newest sample.
+            max_points (int): Maximum number of points per series.
+
+        Returns:
+            dict: {"t": [...], "series": {series_id: {"min": [...], "max": [...], "mean": [...]}}}
+        """
+        series_ids = [s for s in (series_ids or self.series_ids) if s in self._column]
+        columns = [self._column[s] for s in series_ids]
+        times, values = self._select(-np.inf if start is None else start,
+                                     np.inf if end is None else end, columns)
+
+        max_points = max(int(max_points), 1)
+        if len(times) > max_points:
+            # Equal-count buckets: bucket i starts at row floor(i * n / max_points)
+            starts = (np.arange(max_points) * len(times)) // max_points
+            present = ~np.isnan(values)
+            counts = np.add.reduceat(present, starts, axis=0)
+            sums = np.add.reduceat(np.where(present, values, 0.0), starts, axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = sums / counts
+            mins = np.fmin.reduceat(values, starts, axis=0)
+            maxs = np.fmax.reduceat(values, starts, axis=0)
+            times = times[starts]
+        else:
+            means = mins = maxs = values
+
+        def column_list(array, i):
+            return [None if np.isnan(v) else v for v in array[:, i].tolist()]
+
+        return {
+            "t": times.tolist(),
+            "series": {
+                series_id: {"min": column_list(mins, i), "max": column_list(maxs, i), "mean": column_list(means, i)}
+                for i, series_id in enumerate(series_ids)
+            },
+        }
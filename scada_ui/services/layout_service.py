@@ -0,0 +1,95 @@
+"""
+Cached layout model shared by the dashboard routes.
+
+The layout JSON is parsed once and kept together with per-type node indexes.
+Each access only stats the file; it is re-read when its modification time or
+size changes, and re-indexed only when its content hash changes.
+
+Classes:
+    LayoutService - Parses, indexes and caches one layout file.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_LAYOUT_PATH = os.environ.get("SECURESIM_LAYOUT", "Process_sim.json")
+
+
+class LayoutService:
+    """
+    Cached, change-invalidated view of a layout file.
+
+    Attributes:
+        path (str): Path of the layout JSON file.
+        version (str): Content hash of the currently loaded layout.
+    """
+
+    def __init__(self, path=DEFAULT_LAYOUT_PATH):
+        """
+        Args:
+            path (str): Path of the layout JSON file.
+        """
+        self.path = path
+        self.version = None
+        self._stat = None
+        self._layout = {}
+        self._by_type = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Reloads the layout if the file changed since the last access."""
+        stat = os.stat(self.path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key == self._stat:
+            return
+
+        with self._lock:
+            if key == self._stat:
+                return
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            version = hashlib.sha1(raw).hexdigest()
+            if version != self.version:
+                layout = json.loads(raw)
+                by_type = {}
+                for node in layout.get("nodes", []):
+                    by_type.setdefault(node["type"], {})[node["id"]] = node
+                self._layout, self._by_type, self.version = layout, by_type, version
+            self._stat = key
+
+    def layout(self):
+        """
+        Returns:
+            dict: The parsed layout. Treat as read-only; it is shared between requests.
+        """
+        self._refresh()
+        return self._layout
+
+    def nodes_of_type(self, node_type):
+        """
+        Args:
+            node_type (str): "Tank", "Pump" or "Splitter".
+
+        Returns:
+            dict: Node ID -> node definition.
+        """
+        self._refresh()
+        return self._by_type.get(node_type, {})
+
+    def pumps(self):
+        """Returns pump ID -> pump definition."""
+        return self.nodes_of_type("Pump")
+
+    def tanks(self):
+        """Returns tank ID -> tank definition."""
+        return self.nodes_of_type("Tank")
+
+    def current_version(self):
+        """Returns the content hash of the layout, reloading it first if the file changed."""
+        self._refresh()
+        return self.version
+
+
+layout_service = LayoutService()
@@ -0,0 +1,79 @@
+"""
+Incremental reads of the simulation log file.
+
+Readers keep a cursor of the form "<inode>:<offset>". The inode identifies the
+file the offset belongs to, so a rotation is noticed even when the new file has
+already grown past the old offset.
+
+Functions:
+    read_log_chunk - Returns the complete lines written after a cursor.
+"""
+
+import os
+
+# Upper bound of one response, so a first load of a large log stays small
+MAX_CHUNK_BYTES = 256 * 1024
+
+
+def _parse_cursor(since):
+    # "<inode>:<offset>", or a bare offset from an older client (inode unknown)
+    if since is None:
+        return None, None
+    inode, _, offset = str(since).rpartition(":")
+    try:
+        return (int(inode) if inode else None), int(offset)
+    except ValueError:
+        return None, None
+
+
+def read_log_chunk(log_path, since=None, max_bytes=MAX_CHUNK_BYTES):
+    """
+    Reads the complete lines written to the log after cursor `since`.
+
+    Args:
+        log_path (str): Path of the log file.
+        since (str, optional): Cursor returned by the previous call. None (or a
+            negative offset) starts near the end of the file, at most `max_bytes` back.
+        max_bytes (int): Maximum number of bytes to read.
+
+    Returns:
+        tuple: (text, next_cursor, reset). `reset` is True when the file was
+        rotated or truncated since the previous call and reading restarted at 0.
+    """
+    inode, offset = _parse_cursor(since)
+    try:
+        f = open(log_path, "rb")
+    except FileNotFoundError:
+        return "", "0", offset is not None and offset > 0
+
+    with f:
+        stat = os.fstat(f.fileno())
+        size = stat.st_size
+        reset = False
+        if offset is None or offset < 0:
+            offset = max(size - max_bytes, 0)
+            skip_partial = offset > 0
+        else:
+            skip_partial = False
+            if offset > size or (inode is not None and inode != stat.st_ino):
+                offset, reset = 0, True
+
+        f.seek(offset)
+        data = f.read(min(size - offset, max_bytes))
+
+    def cursor(position):
+        return f"{stat.st_ino}:{position}"
+
+    if skip_partial:
+        # Started mid-file: drop the partial first line
+        newline = data.find(b"\n")
+        if newline < 0:
+            return "", cursor(offset), reset
+        offset += newline + 1
+        data = data[newline + 1:]
+
+    # Only hand out complete lines; the rest is returned on the next call
+    end = data.rfind(b"\n") + 1
+    if end == 0 and len(data) >= max_bytes:
+        end = len(data)  # a single line longer than max_bytes
+    return data[:end].decode("utf-8", errors="replace"), cursor(offset + end), reset
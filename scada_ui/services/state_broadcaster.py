@@ -0,0 +1,103 @@
+"""
+Fan-out of dashboard state changes to connected browsers.
+
+Telemetry updates are collected as pending changes and flushed as one delta at
+most every `interval` seconds. Each delta is serialized into a server-sent
+event once and the same bytes are queued for every client, so the cost of an
+update does not grow with the work each dashboard would otherwise redo.
+
+Classes:
+    StateBroadcaster - Coalesces state changes and fans them out to client queues.
+"""
+
+import json
+import queue
+import threading
+import time
+
+
+class StateBroadcaster:
+    """
+    Coalescing publish/subscribe hub for dashboard state deltas.
+
+    Clients that fall `max_backlog` events behind are dropped; their browser
+    reconnects and starts again from a full snapshot.
+    """
+
+    def __init__(self, interval=0.25, max_backlog=100):
+        """
+        Args:
+            interval (float): Minimum seconds between two deltas.
+            max_backlog (int): Events queued per client before it is dropped.
+        """
+        self.interval = interval
+        self.max_backlog = max_backlog
+        self.events_sent = 0
+        self._pending = {}
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def update(self, component_id, field, value):
+        """
+        Records a changed value to be sent with the next delta.
+
+        Args:
+            component_id (str): Component ID, e.g. "pump1".
+            field (str): Field name, e.g. "state" or "volume".
+            value: New value.
+        """
+        with self._lock:
+            self._pending.setdefault(component_id, {})[field] = value
+        self._wakeup.set()
+
+    def subscribe(self):
+        """
+        Registers a client.
+
+        Returns:
+            queue.Queue: Receives encoded server-sent events (bytes), or None when dropped.
+        """
+        client = queue.Queue(maxsize=self.max_backlog)
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        """Removes a client queue."""
+        with self._lock:
+            self._clients.discard(client)
+
+    @staticmethod
+    def encode(event, data):
+        """Serializes one server-sent event."""
+        return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self._flush()
+            time.sleep(self.interval)
+
+    def _flush(self):
+        with self._lock:
+            delta, self._pending = self._pending, {}
+            clients = list(self._clients)
+        if not delta:
+            return
+
+        payload = self.encode("delta", delta)
+        for client in clients:
+            try:
+                client.put_nowait(payload)
+            except queue.Full:
+                self.unsubscribe(client)
+                try:
+                    client.get_nowait()
+                except queue.Empty:
+                    pass
+                client.put_nowait(None)
+        self.events_sent += 1
@@ -0,0 +1,130 @@
+"""
+JSON topology of the layout for the browser-side plant viewer.
+
+The topology (nodes, edges and 2D positions) only depends on the layout, so it
+is computed and serialized once per layout version. Node positions come from
+the layout's "position" entries; missing ones are computed once, with a spring
+layout for small plants and a linear-time layered layout for large ones.
+
+Classes:
+    TopologyService - Caches the serialized topology per layout version.
+
+Functions:
+    build_topology - Builds the topology dictionary of a layout.
+"""
+
+import json
+import threading
+from collections import deque
+
+import networkx as nx
+
+from scada_ui.services.layout_service import layout_service
+
+# Above this many nodes the O(n^2) spring layout is replaced by a layered layout
+SPRING_LAYOUT_MAX_NODES = 300
+
+
+def _layered_positions(nodes, edges):
+    """Places nodes by breadth-first depth from the sources (x) and order within a depth (y)."""
+    successors = {node["id"]: [] for node in nodes}
+    indegree = {node["id"]: 0 for node in nodes}
+    for edge in edges:
+        if edge["source"] in successors and edge["target"] in indegree:
+            successors[edge["source"]].append(edge["target"])
+            indegree[edge["target"]] += 1
+
+    depth = {}
+    queue = deque()
+    # Sources first, then any node left unreached (e.g. inside a cycle) as a new root
+    for node_id in sorted(successors, key=lambda n: indegree[n] != 0):
+        if node_id in depth:
+            continue
+        depth[node_id] = 0
+        queue.append(node_id)
+        while queue:
+            current = queue.popleft()
+            for target in successors[current]:
+                if target not in depth:
+                    depth[target] = depth[current] + 1
+                    queue.append(target)
+
+    rows = {}
+    positions = {}
+    for node in nodes:
+        level = depth[node["id"]]
+        row = rows.get(level, 0)
+        rows[level] = row + 1
+        positions[node["id"]] = [float(level), float(-row)]
+    return positions
+
+
+def build_topology(layout):
+    """
+    Builds the topology of a layout.
+
+    Args:
+        layout (dict): Parsed layout JSON.
+
+    Returns:
+        dict: {"nodes": [{id, type, name, x, y, max_capacity?, flow_rate?}],
+               "edges": [{id, name, source, target}]}
+    """
+    nodes = layout.get("nodes", [])
+    edges = layout.get("edges", [])
+
+    positions = {node["id"]: node["position"] for node in nodes if node.get("position")}
+    if len(positions) < len(nodes):
+        if len(nodes) <= SPRING_LAYOUT_MAX_NODES:
+            G = nx.DiGraph()
+            G.add_nodes_from(node["id"] for node in nodes)
+            G.add_edges_from((edge["source"], edge["target"]) for edge in edges)
+            positions = {node_id: list(map(float, xy)) for node_id, xy in nx.spring_layout(G, seed=42).items()}
+        else:
+            positions = _layered_positions(nodes, edges)
+
+    topology_nodes = []
+    for node in nodes:
+        x, y = positions[node["id"]]
+        entry = {"id": node["id"], "type": node["type"], "name": node["name"], "x": x, "y": y}
+        for key in ("max_capacity", "flow_rate"):
+            if key in node:
+                entry[key] = node[key]
+        topology_nodes.append(entry)
+
+    topology_edges = [{"id": edge["id"], "name": edge.get("name", ""), "source": edge["source"],
+                       "target": edge["target"]} for edge in edges]
+    return {"nodes": topology_nodes, "edges": topology_edges}
+
+
+class TopologyService:
+    """
+    Serialized topology of the current layout, rebuilt only when the layout changes.
+    """
+
+    def __init__(self, layout_service):
+        """
+        Args:
+            layout_service (LayoutService): Source of the layout and its version.
+        """
+        self.layout_service = layout_service
+        self._cached = None  # (version, json bytes)
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Returns:
+            tuple: (topology JSON bytes, layout version).
+        """
+        version = self.layout_service.current_version()
+        cached = self._cached
+        if cached is None or cached[0] != version:
+            with self._lock:
+                cached = self._cached
+                if cached is None or cached[0] != version:
+                    payload = json.dumps(build_topology(self.layout_service.layout()), separators=(",", ":"))
+                    cached = self._cached = (version, payload.encode())
+        return cached[1], cached[0]
+
+
+topology_service = TopologyService(layout_service)
@@ -0,0 +1,115 @@
+// Browser-side plant viewer.
+//
+// The topology (nodes, edges, positions) is fetched once from /api/topology and
+// drawn on a canvas; afterwards only changed values are applied, either pushed
+// by the dashboard's event stream or polled from /api/delta?since=<seq>.
+
+class PlantViewer {
+    constructor(canvas) {
+        this.canvas = canvas;
+        this.ctx = canvas.getContext("2d");
+        this.nodes = new Map();
+        this.edges = [];
+        this.seq = 0;
+        this.drawPending = false;
+    }
+
+    async load() {
+        const res = await fetch("/api/topology");
+        const topology = await res.json();
+        this.nodes = new Map(topology.nodes.map(node => [node.id, { ...node }]));
+        this.edges = topology.edges;
+        this.computeTransform();
+        this.requestDraw();
+    }
+
+    computeTransform() {
+        const xs = [...this.nodes.values()].map(n => n.x);
+        const ys = [...this.nodes.values()].map(n => n.y);
+        const minX = Math.min(...xs), maxX = Math.max(...xs);
+        const minY = Math.min(...ys), maxY = Math.max(...ys);
+        const pad = 40;
+        const w = this.canvas.width - 2 * pad, h = this.canvas.height - 2 * pad;
+        const scale = Math.min(w / ((maxX - minX) || 1), h / ((maxY - minY) || 1));
+        // Layout y grows upwards, canvas y downwards
+        this.toCanvas = (node) => [pad + (node.x - minX) * scale, pad + (maxY - node.y) * scale];
+    }
+
+    // changes: {component_id: {field: value}}
+    applyChanges(changes) {
+        let changed = false;
+        for (const [id, fields] of Object.entries(changes)) {
+            const node = this.nodes.get(id);
+            if (node) {
+                Object.assign(node, fields);
+                changed = true;
+            }
+        }
+        if (changed) this.requestDraw();
+    }
+
+    startPolling(intervalMs = 1000) {
+        setInterval(async () => {
+            const res = await fetch(`/api/delta?since=${this.seq}`);
+            const data = await res.json();
+            this.seq = data.seq;
+            this.applyChanges(data.changes);
+        }, intervalMs);
+    }
+
+    requestDraw() {
+        if (this.drawPending) return;
+        this.drawPending = true;
+        requestAnimationFrame(() => {
+            this.drawPending = false;
+            this.draw();
+        });
+    }
+
+    draw() {
+        const ctx = this.ctx;
+        const small = this.nodes.size > 200;
+        const r = small ? 3 : 18;
+        ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
+
+        ctx.strokeStyle = "#999";
+        ctx.lineWidth = 1;
+        ctx.beginPath();
+        for (const edge of this.edges) {
+            const source = this.nodes.get(edge.source), target = this.nodes.get(edge.target);
+            if (!source || !target) continue;
+            const [x1, y1] = this.toCanvas(source), [x2, y2] = this.toCanvas(target);
+            ctx.moveTo(x1, y1);
+            ctx.lineTo(x2, y2);
+        }
+        ctx.stroke();
+
+        ctx.font = "11px Arial";
+        ctx.textAlign = "center";
+        for (const node of this.nodes.values()) {
+            const [x, y] = this.toCanvas(node);
+            if (node.type === "Tank") {
+                const level = Math.max(0, Math.min(1, Number(node.volume) / (node.max_capacity || 1))) || 0;
+                ctx.fillStyle = "#dfe4ea";
+                ctx.fillRect(x - r, y - r, 2 * r, 2 * r);
+                ctx.fillStyle = "#70a1ff";
+                ctx.fillRect(x - r, y + r - 2 * r * level, 2 * r, 2 * r * level);
+                ctx.strokeStyle = "#2f3542";
+                ctx.strokeRect(x - r, y - r, 2 * r, 2 * r);
+            } else if (node.type === "Pump") {
+                ctx.fillStyle = node.state === "open" ? "#2ed573" : node.state === "closed" ? "#ff4757" : "#a4b0be";
+                ctx.beginPath();
+                ctx.arc(x, y, r * 0.7, 0, 2 * Math.PI);
+                ctx.fill();
+            } else {
+                ctx.fillStyle = "#2f3542";
+                ctx.fillRect(x - r / 3, y - r / 3, 2 * r / 3, 2 * r / 3);
+            }
+            if (!small) {
+                ctx.fillStyle = "#2f3542";
+                const value = node.type === "Tank" && node.volume !== undefined ? ` (${node.volume})` : "";
+                ctx.fillText(node.name + value, x, y + r + 12);
+            }
+        }
+    }
+}
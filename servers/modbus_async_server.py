@@ -0,0 +1,256 @@
+"""
+Asyncio Modbus TCP Host
+
+This module serves the Modbus endpoints of many virtual PLCs from a single asyncio
+event loop running in one thread, instead of one `ModbusTCPServer` thread per PLC.
+Endpoints can each keep their own port, or share one port and be selected by the
+Modbus unit ID of each request. Register values live in compact array-backed banks.
+
+Supported function codes: 3 (read holding registers), 4 (read input registers,
+always 0), 6 (write single register) and 16 (write multiple registers).
+
+Classes:
+    RegisterBank - Array-backed holding registers with the ModbusServerWrapper API.
+    AsyncModbusHost - One event loop serving any number of register banks.
+"""
+
+import asyncio
+import logging
+import struct
+import threading
+from array import array
+
+logger = logging.getLogger("modbus_server")
+
+# Modbus exception codes
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+
+# MBAP length field: unit ID plus a PDU of 1 (function code) to 253 bytes
+MIN_MBAP_LENGTH = 2
+MAX_MBAP_LENGTH = 254
+
+
+class RegisterBank:
+    """
+    Holding registers of one PLC endpoint.
+
+    Exposes the same methods as `ModbusServerWrapper` (read/write/sync, update
+    hook, start), so controllers can use either interchangeably.
+    """
+
+    def __init__(self, size=100):
+        """
+        Args:
+            size (int): Number of holding registers.
+        """
+        self.data = array('H', [0] * size)
+        self.update_callback = None
+
+    def set_update_hook(self, callback_fn):
+        """
+        Registers a callback function to be called whenever a register is written externally.
+
+        Args:
+            callback_fn (callable): Function with signature callback(address, value)
+        """
+        self.update_callback = callback_fn
+
+    def _on_change(self, address, value):
+        if self.update_callback:
+            self.update_callback(address, value)
+
+    def read_register(self, address):
+        """Returns the value of a register."""
+        return self.data[address]
+
+    def write_register(self, address, value):
+        """Writes a value to a register and triggers the write callback."""
+        self.data[address] = _clamp(value)
+        self._on_change(address, value)
+
+    def sync_register(self, address, value):
+        """
+        Internal write path: stores a value only if it changed, without the write callback.
+
+        Returns:
+            bool: True if the register value changed.
+        """
+        value = _clamp(value)
+        if self.data[address] == value:
+            return False
+        self.data[address] = value
+        return True
+
+    def start(self):
+        """No-op: the bank is served by the `AsyncModbusHost` it was added to."""
+        pass
+
+
+def _clamp(value):
+    """Clamps a value to the unsigned 16-bit register range."""
+    return min(max(int(value), 0), 0xFFFF)
+
+
+class AsyncModbusHost:
+    """
+    Serves many register banks from one asyncio event loop in a single thread.
+
+    Each (host, port) pair is one listening socket. A socket with a single bank
+    answers every unit ID; a socket shared by several banks routes each request
+    by its unit ID.
+    """
+
+    def __init__(self):
+        self._routes = {}    # (host, port) -> {unit_id: RegisterBank}
+        self._servers = []
+        self._clients = set()
+        self._loop = asyncio.new_event_loop()
+        self._thread = None
+
+    def add_endpoint(self, host="127.0.0.1", port=5020, unit_id=None, size=100):
+        """
+        Creates a register bank served on the given address.
+
+        Args:
+            host (str): IP address to bind.
+            port (int): Port to listen on.
+            unit_id (int, optional): Unit ID selecting this bank when the port is shared.
+            size (int): Number of holding registers.
+
+        Returns:
+            RegisterBank: The new bank.
+        """
+        bank = RegisterBank(size)
+        key = (host, port)
+        new_port = key not in self._routes
+        self._routes.setdefault(key, {})[unit_id] = bank
+
+        if new_port and self._thread is not None:
+            asyncio.run_coroutine_threadsafe(self._listen(host, port), self._loop).result()
+        return bank
+
+    def start(self):
+        """
+        Starts the event loop thread and opens every configured port.
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        for host, port in list(self._routes):
+            asyncio.run_coroutine_threadsafe(self._listen(host, port), self._loop).result()
+        logger.info("[MODBUS] Async host serving %s port(s) on one event loop", len(self._routes))
+
+    def stop(self):
+        """
+        Closes all listening sockets and stops the event loop.
+        """
+        if self._thread is None:
+            return
+
+        async def close():
+            for server in self._servers:
+                server.close()
+            # Drop open client connections so their handlers finish before the loop stops
+            for writer in list(self._clients):
+                writer.close()
+            while self._clients:
+                await asyncio.sleep(0)
+            self._servers.clear()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    async def _listen(self, host, port):
+        """Opens one listening socket."""
+        banks = self._routes[(host, port)]
+        server = await asyncio.start_server(
+            lambda reader, writer: self._serve_client(banks, reader, writer), host, port)
+        self._servers.append(server)
+        logger.info("[MODBUS] Async endpoint listening on %s:%s", host, port)
+
+    def _select_bank(self, banks, unit_id):
+        """Returns the bank addressed by a unit ID, or None."""
+        bank = banks.get(unit_id)
+        if bank is None and len(banks) == 1:
+            bank = next(iter(banks.values()))
+        return bank
+
+    async def _serve_client(self, banks, reader, writer):
+        """Handles one client connection until it closes."""
+        self._clients.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                transaction_id, protocol_id, length, unit_id = struct.unpack(">HHHB", header)
+                if protocol_id != 0 or not MIN_MBAP_LENGTH <= length <= MAX_MBAP_LENGTH:
+                    # Not Modbus TCP, or no way to find the next frame: drop the connection
+                    logger.warning("[MODBUS] Malformed frame (protocol %s, length %s), closing connection",
+                                   protocol_id, length)
+                    break
+                pdu = await reader.readexactly(length - 1)
+
+                bank = self._select_bank(banks, unit_id)
+                if bank is None:
+                    # Unknown unit: Modbus gateways answer "target device failed to respond"
+                    response = bytes([pdu[0] | 0x80, 0x0B])
+                else:
+                    response = self._handle_pdu(bank, pdu)
+
+                writer.write(struct.pack(">HHHB", transaction_id, protocol_id, len(response) + 1, unit_id) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    def _handle_pdu(self, bank, pdu):
+        """
+        Executes one request PDU against a bank.
+
+        Returns:
+            bytes: Response PDU (or exception response).
+        """
+        function = pdu[0]
+
+        def error(code):
+            return bytes([function | 0x80, code])
+
+        if function in (3, 4):
+            if len(pdu) < 5:
+                return error(ILLEGAL_DATA_VALUE)
+            address, count = struct.unpack(">HH", pdu[1:5])
+            if not 1 <= count <= 125:
+                return error(ILLEGAL_DATA_VALUE)
+            if address + count > len(bank.data):
+                return error(ILLEGAL_DATA_ADDRESS)
+            values = bank.data[address:address + count] if function == 3 else [0] * count
+            return struct.pack(f">BB{count}H", function, count * 2, *values)
+
+        if function == 6:
+            if len(pdu) < 5:
+                return error(ILLEGAL_DATA_VALUE)
+            address, value = struct.unpack(">HH", pdu[1:5])
+            if address >= len(bank.data):
+                return error(ILLEGAL_DATA_ADDRESS)
+            bank.write_register(address, value)
+            return pdu[:5]
+
+        if function == 16:
+            if len(pdu) < 6:
+                return error(ILLEGAL_DATA_VALUE)
+            address, count, byte_count = struct.unpack(">HHB", pdu[1:6])
+            if not 1 <= count <= 123 or byte_count != count * 2 or len(pdu) < 6 + byte_count:
+                return error(ILLEGAL_DATA_VALUE)
+            if address + count > len(bank.data):
+                return error(ILLEGAL_DATA_ADDRESS)
+            for offset, value in enumerate(struct.unpack(f">{count}H", pdu[6:6 + byte_count])):
+                bank.write_register(address + offset, value)
+            return pdu[:5]
+
+        return error(ILLEGAL_FUNCTION)
@@ -13,41 +13,10 @@ Classes:
 
 import logging
 import threading
-import os
 from modbus_tcp_server.network import ModbusTCPServer
 from modbus_tcp_server.data_source import BaseDataSource
 
-logging.basicConfig()
 logger = logging.getLogger("modbus_server")
-logger.setLevel(logging.INFO)
-
-# Ensure the 'data' directory exists
-log_dir = os.path.join(os.path.dirname(__file__), "data")
-os.makedirs(log_dir, exist_ok=True)
-
-# Set full path to log file inside data/
-log_path = os.path.join(log_dir, "logs.txt")
-
-# Reset logging if needed
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# Setup logging to file
-logging.basicConfig(
-    level=logging.INFO,
-    filename=log_path,
-    filemode="w",
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
-
-# Optional: Console output to debug
-console = logging.StreamHandler()
-console.setLevel(logging.DEBUG)
-console.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-logging.getLogger().addHandler(console)
-
-# Test logging
-logging.info("Logger initialized successfully")
 
 class CustomDataSource(BaseDataSource):
     """
@@ -142,12 +111,31 @@ class ModbusServerWrapper:
         self.data[address] = value
         self._on_change(address, value)
 
+    def sync_register(self, address, value):
+        """
+        Internal write path used to mirror simulation state into a register.
+
+        Unlike `write_register`, this does not trigger the write callback, and the
+        register is only touched if its value actually changed.
+
+        Args:
+            address (int): Register address
+            value (int): Value to store
+
+        Returns:
+            bool: True if the register value changed.
+        """
+        if self.data[address] == value:
+            return False
+        self.data[address] = value
+        return True
+
     def start(self):
         """
         Starts the Modbus server in a separate daemon thread.
         """
         def run():
-            logger.info(f"[MODBUS] Starting Modbus TCP server on {self.host}:{self.port}")
+            logger.info("[MODBUS] Starting Modbus TCP server on %s:%s", self.host, self.port)
             self.server.run()
 
         thread = threading.Thread(target=run, daemon=True)
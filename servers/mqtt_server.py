@@ -6,23 +6,32 @@ It is used for communication between simulation components and control logic.
 
 Usage:
     Run this script directly to start the broker:
-    $ python mqtt_server.py
+    $ python mqtt_server.py [--host HOST] [--port PORT]
 
 Functions:
     mqttServer - Asynchronously starts the MQTT broker.
 """
 
+import argparse
 import asyncio
 from mqttools.broker import Broker
 
-async def mqttServer():
+async def mqttServer(host="127.0.0.1", port=1883):
     """
-    Starts an MQTT broker on localhost (127.0.0.1) at port 1883.
+    Starts an MQTT broker, by default on localhost (127.0.0.1) at port 1883.
     This broker allows publish/subscribe communication between process components.
+
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on.
     """
-    print("[MQTT] Starting MQTT broker on 127.0.0.1:1883...")
-    broker = Broker(('127.0.0.1', 1883))
+    print(f"[MQTT] Starting MQTT broker on {host}:{port}...")
+    broker = Broker((host, port))
     await broker.serve_forever()
 
 if __name__ == '__main__':
-    asyncio.run(mqttServer())
+    parser = argparse.ArgumentParser(description="Local MQTT broker")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=1883, help="Port to listen on")
+    args = parser.parse_args()
+    asyncio.run(mqttServer(args.host, args.port))
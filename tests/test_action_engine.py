@@ -0,0 +1,129 @@
+import sys
+import os
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process_sim.layout_parser import build_graph
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from control_logic.plc import PLC
+from process_sim.simulation_runner import SimulationThread
+
+LAYOUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'Process_sim.json')
+
+def load_graph():
+    with open(LAYOUT_PATH, 'r') as f:
+        layout = json.load(f)
+    return build_graph(layout, mqtt_factory=OfflineMQTTInterface)
+
+def pump_states(graph):
+    return {node_id: node.get_state() for node_id, node in graph.nodes.items() if hasattr(node, "get_state")}
+
+def test_compiled_scan_matches_rule_walk():
+    reference = load_graph()
+    compiled = load_graph()
+    mqtt = OfflineMQTTInterface()
+    reference_plcs = [PLC(config, reference, mqtt) for config in reference.plc_configs]
+    compiled_plcs = [PLC(config, compiled, mqtt) for config in compiled.plc_configs]
+
+    for _ in range(50):
+        for plc in reference_plcs:
+            for action in plc.actions:
+                plc.engine.evaluate_and_execute(action)
+        for plc in compiled_plcs:
+            plc.update()
+        assert pump_states(reference) == pump_states(compiled)
+        reference.update()
+        compiled.update()
+
+def test_unknown_register_is_dropped():
+    graph = load_graph()
+    plc = PLC({
+        "id": "plc9", "ip": "127.0.0.1", "port": 5999,
+        "devices": [{"id": "tank1", "plc_input_register": 0}],
+        "actions": [
+            {"trigger": {"register": 7, "condition": "==", "value": 1},
+             "effect": {"target": "pump1", "action": "open"}},
+            {"trigger": {"register": 0, "condition": ">", "value": 10},
+             "effect": {"target": "pump1", "action": "open"}},
+        ],
+    }, graph, OfflineMQTTInterface())
+
+    assert len(plc.engine._program) == 1
+    plc.update()
+    assert graph.nodes["pump1"].get_state() == "open"
+
+def tank_volumes(graph):
+    return {node_id: node.current_volume for node_id, node in graph.nodes.items() if hasattr(node, "current_volume")}
+
+def scan_modes():
+    return [SimulationThread(load_graph(), headless=True, scan_mode=mode) for mode in ("cyclic", "event")]
+
+def rule_count(sim):
+    return sum(len(c.engine._program) for c in sim._controllers())
+
+def test_event_scan_matches_cyclic_on_layout():
+    cyclic, event = scan_modes()
+    for tick in range(500):
+        cyclic.step()
+        event.step()
+        assert pump_states(cyclic.graph) == pump_states(event.graph), tick
+        assert tank_volumes(cyclic.graph) == tank_volumes(event.graph), tick
+
+    total = 500 * rule_count(cyclic)
+    assert cyclic.scan_stats() == {"rules_evaluated": total, "rules_skipped": 0}
+    stats = event.scan_stats()
+    assert stats["rules_evaluated"] + stats["rules_skipped"] == total
+    assert stats["rules_skipped"] > stats["rules_evaluated"]
+
+def test_event_scan_restores_overridden_targets():
+    cyclic, event = scan_modes()
+    for tick in range(300):
+        if tick % 25 == 10:
+            # An operator or attacker flips pumps behind the controllers' backs
+            for sim in (cyclic, event):
+                for pump_id in ("pump5", "pump6"):
+                    pump = sim.graph.nodes[pump_id]
+                    pump.set_state("closed" if pump.get_state() == "open" else "open")
+        cyclic.step()
+        event.step()
+        assert pump_states(cyclic.graph) == pump_states(event.graph), tick
+        assert tank_volumes(cyclic.graph) == tank_volumes(event.graph), tick
+
+def test_event_scan_skips_unchanged_rules():
+    graph = load_graph()
+    plc = PLC({
+        "id": "plc9", "ip": "127.0.0.1", "port": 5999, "scan_mode": "event",
+        "devices": [{"id": "tank1", "plc_input_register": 0}, {"id": "tank2", "plc_input_register": 1}],
+        "actions": [
+            {"trigger": {"register": 0, "condition": ">", "value": -1},
+             "effect": {"target": "pump1", "action": "close"}},
+            {"trigger": {"register": 1, "condition": ">", "value": -1},
+             "effect": {"target": "pump2", "action": "close"}},
+        ],
+    }, graph, OfflineMQTTInterface())
+    engine = plc.engine
+    assert engine.event_driven
+
+    plc.update()
+    assert (engine.rules_evaluated, engine.rules_skipped) == (2, 0)
+    plc.update()
+    assert (engine.rules_evaluated, engine.rules_skipped) == (2, 2)
+
+    # A write to a target re-runs the rules acting on it
+    graph.nodes["pump1"].set_state("open")
+    plc.update()
+    assert (engine.rules_evaluated, engine.rules_skipped) == (3, 3)
+    assert graph.nodes["pump1"].get_state() == "closed"
+
+    # So does a change of an input register
+    graph.nodes["tank2"].current_volume += 1
+    plc.update()
+    assert (engine.rules_evaluated, engine.rules_skipped) == (4, 4)
+
+if __name__ == "__main__":
+    test_compiled_scan_matches_rule_walk()
+    test_unknown_register_is_dropped()
+    test_event_scan_matches_cyclic_on_layout()
+    test_event_scan_restores_overridden_targets()
+    test_event_scan_skips_unchanged_rules()
+    print("Action engine tests passed.")
@@ -0,0 +1,75 @@
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from attacks.capture_store import CaptureWriter, CaptureReader, INDEX_ENTRY, index_path
+from attacks.Replay import open_capture
+
+TOPICS = ["tank/tank1/volume", "pump/pump1/state"]
+
+def write_capture(path, count=2500, **kwargs):
+    with CaptureWriter(path, block_records=100, **kwargs) as writer:
+        for i in range(count):
+            writer.write(1000.0 + i * 0.1, TOPICS[i % 2], str(i))
+    return writer
+
+def test_round_trip_with_time_window_and_topics():
+    for name in ("capture.jsonl", "capture.jsonl.gz"):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, name)
+            write_capture(path)
+            with CaptureReader(path) as reader:
+                assert reader.compressed == name.endswith(".gz")
+                assert len(reader) == 2500 and len(reader.blocks) == 25
+                assert reader.time_range() == (1000.0, 1000.0 + 2499 * 0.1)
+                window = list(reader.messages(start=1100.0, end=1110.0, topics=["tank/tank1/volume"]))
+            assert [m["payload"] for m in window] == [str(i) for i in range(1000, 1101, 2)]
+
+def test_uncompressed_capture_is_plain_jsonl():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "capture.jsonl")
+        write_capture(path, count=3)
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        assert lines[2] == {"timestamp": 1000.2, "topic": TOPICS[0], "payload": "2"}
+
+def test_flush_interval_writes_partial_blocks():
+    now = [0.0]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "capture.jsonl")
+        writer = CaptureWriter(path, block_records=1000, flush_interval=1.0, clock=lambda: now[0])
+        writer.write(1.0, TOPICS[0], "a")
+        assert os.path.getsize(path) == 0
+        now[0] = 1.5
+        writer.write(2.0, TOPICS[0], "b")
+        assert os.path.getsize(index_path(path)) == INDEX_ENTRY.size
+        writer.close()
+
+def test_unindexed_tail_is_still_read():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "capture.jsonl.gz")
+        write_capture(path, count=250)
+        # Simulate a crash: the index lost its last entry and the data its last bytes
+        with open(index_path(path), "r+b") as f:
+            f.truncate(INDEX_ENTRY.size * 2 + 5)
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 5)
+        payloads = [m["payload"] for m in open_capture(path)]
+        assert payloads[:200] == [str(i) for i in range(200)] and len(payloads) > 200
+
+def test_legacy_json_capture_is_still_replayable():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "captured_data.json")
+        with open(path, "w") as f:
+            json.dump([{"timestamp": 1.0 + i, "topic": TOPICS[i % 2], "payload": str(i)} for i in range(5)], f, indent=4)
+        assert [m["payload"] for m in open_capture(path, start=2.0, topics=[TOPICS[0]])] == ["2", "4"]
+
+if __name__ == "__main__":
+    test_round_trip_with_time_window_and_topics()
+    test_uncompressed_capture_is_plain_jsonl()
+    test_flush_interval_writes_partial_blocks()
+    test_unindexed_tail_is_still_read()
+    test_legacy_json_capture_is_still_replayable()
+    print("Capture store tests passed.")
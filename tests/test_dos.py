@@ -0,0 +1,85 @@
+import sys
+import os
+import asyncio
+import random
+import socket
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mqttools.broker import Broker
+from attacks.DoS import LoadGenerator, parse_payload_size
+from process_sim.interfaces.write_buffer import MAX_BUFFERED_BYTES
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def test_payload_size_distributions():
+    rng = random.Random(1)
+    assert parse_payload_size("64")(rng) == 64
+    sizes = [parse_payload_size("uniform:10-20")(rng) for _ in range(1000)]
+    assert min(sizes) == 10 and max(sizes) == 20
+    sizes = [parse_payload_size("exp:100")(rng) for _ in range(10000)]
+    assert min(sizes) >= 1 and 80 < sum(sizes) / len(sizes) < 120
+
+def test_fanout_topics():
+    generator = LoadGenerator(topics=["a", "b"], fanout=3, count=1)
+    assert generator.topics == ["a/0", "a/1", "a/2", "b/0", "b/1", "b/2"]
+
+def test_load_against_broker():
+    port = free_port()
+
+    async def run():
+        broker = asyncio.create_task(Broker(("127.0.0.1", port)).serve_forever())
+        await asyncio.sleep(0.2)
+        try:
+            paced = await LoadGenerator(port=port, clients=4, rate=2000, duration=None, count=1000,
+                                        payload_size="uniform:1-256", seed=3).run()
+            flood = await LoadGenerator(port=port, clients=4, rate=None, duration=None, count=5000).run()
+        finally:
+            broker.cancel()
+        return paced, flood
+
+    paced, flood = asyncio.run(run())
+    assert paced["sent"] == 1000 and paced["connected"] == 4 and paced["errors"] == 0
+    assert 0.4 < paced["duration"] < 2.0
+    assert flood["sent"] == 5000 and flood["disconnects"] == 0
+    assert paced["unsent_bytes"] == 0 and flood["unsent_bytes"] == 0
+
+def test_stalled_broker_applies_backpressure():
+    port = free_port()
+
+    async def run():
+        done = asyncio.Event()
+
+        async def stalled(reader, writer):
+            # Accept the connection (MQTT 5 CONNACK), then never read another byte
+            await reader.read(1024)
+            writer.write(bytes([0x20, 0x03, 0x00, 0x00, 0x00]))
+            await done.wait()
+            writer.close()
+
+        server = await asyncio.start_server(stalled, "127.0.0.1", port)
+        try:
+            return await LoadGenerator(port=port, clients=1, rate=None, duration=0.5, payload_size=1024).run()
+        finally:
+            done.set()
+            server.close()
+
+    report = asyncio.run(run())
+    # Only what the kernel socket buffers hold gets through; the rest is never generated
+    assert report["connected"] == 1
+    assert report["sent"] * 1024 < 64 * 1024 * 1024
+    assert 0 < report["unsent_bytes"] <= MAX_BUFFERED_BYTES + 2048
+
+def test_connect_errors_are_counted():
+    report = asyncio.run(LoadGenerator(port=free_port(), clients=2, duration=0.1).run())
+    assert report["connect_errors"] == 2 and report["sent"] == 0
+
+if __name__ == "__main__":
+    test_payload_size_distributions()
+    test_fanout_topics()
+    test_load_against_broker()
+    test_stalled_broker_applies_backpressure()
+    test_connect_errors_are_counted()
+    print("DoS load generator tests passed.")
@@ -0,0 +1,87 @@
+import sys
+import os
+import json
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process_sim.ensemble import perturb_layout, merge_summaries, run_ensemble
+
+LAYOUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'Process_sim.json')
+
+def load_layout():
+    with open(LAYOUT_PATH, 'r') as f:
+        return json.load(f)
+
+def test_perturb_layout_changes_only_intended_parameters():
+    layout = load_layout()
+    original = json.dumps(layout, sort_keys=True)
+    perturbed = perturb_layout(layout, random.Random(7), spread=0.2)
+    assert json.dumps(layout, sort_keys=True) == original  # input left untouched
+
+    node_types = {node["id"]: node["type"] for node in layout["nodes"]}
+    for before, after in zip(layout["nodes"], perturbed["nodes"]):
+        changed = {key for key in before if before[key] != after[key]}
+        if before["type"] == "Tank":
+            assert changed <= {"initial_capacity"}
+            assert 0.0 <= after["initial_capacity"] <= before.get("max_capacity", 1000)
+        elif before["type"] == "Pump":
+            assert changed == {"flow_rate"}
+            assert 0.8 <= after["flow_rate"] / before["flow_rate"] <= 1.2
+        else:
+            assert not changed
+    assert perturbed["edges"] == layout["edges"]
+
+    for plc_before, plc_after in zip(layout["plcs"], perturbed["plcs"]):
+        registers = {dev["plc_input_register"]: node_types[dev["id"]] for dev in plc_before["devices"]}
+        assert plc_after["devices"] == plc_before["devices"]
+        for before, after in zip(plc_before["actions"], plc_after["actions"]):
+            assert after["effect"] == before["effect"]
+            assert {k: v for k, v in after["trigger"].items() if k != "value"} == \
+                {k: v for k, v in before["trigger"].items() if k != "value"}
+            if registers.get(before["trigger"]["register"]) != "Tank":
+                assert after["trigger"]["value"] == before["trigger"]["value"]
+            elif before["trigger"]["value"]:
+                assert 0.8 <= after["trigger"]["value"] / before["trigger"]["value"] <= 1.2
+
+    # The same seed gives the same layout
+    assert perturb_layout(layout, random.Random(7), spread=0.2) == perturbed
+    assert perturb_layout(layout, random.Random(8), spread=0.2) != perturbed
+
+def test_merge_summaries():
+    summaries = [
+        {"overflow": {"tank1": 0.0, "tank2": 10.0}, "time_to_full": {"tank1": None, "tank2": 5.0},
+         "duty_cycle": {"pump1": 0.5}},
+        {"overflow": {"tank1": 4.0, "tank2": 20.0}, "time_to_full": {"tank1": None, "tank2": 9.0},
+         "duty_cycle": {"pump1": 1.0}},
+        {"overflow": {"tank1": 2.0, "tank2": 0.0}, "time_to_full": {"tank1": 3.0, "tank2": None},
+         "duty_cycle": {"pump1": 0.0}},
+    ]
+    merged = merge_summaries(summaries)
+    assert merged["runs"] == 3
+    assert merged["overflow"]["tank1"] == {"mean": 2.0, "min": 0.0, "max": 4.0}
+    assert merged["overflow"]["tank2"] == {"mean": 10.0, "min": 0.0, "max": 20.0}
+    assert merged["time_to_full"]["tank1"] == {"filled_fraction": 1 / 3, "mean": 3.0, "min": 3.0, "max": 3.0}
+    assert merged["time_to_full"]["tank2"] == {"filled_fraction": 2 / 3, "mean": 7.0, "min": 5.0, "max": 9.0}
+    assert merged["duty_cycle"]["pump1"] == {"mean": 0.5, "min": 0.0, "max": 1.0}
+    assert merged["overflow_total"] == {"mean": 12.0, "min": 2.0, "max": 24.0}
+
+    assert merge_summaries([]) == {"runs": 0, "overflow": {}, "time_to_full": {}, "duty_cycle": {}}
+
+def test_run_ensemble_is_reproducible():
+    def run():
+        merged, summaries = run_ensemble(LAYOUT_PATH, runs=2, ticks=20, seed=42, workers=1)
+        for summary in summaries:
+            summary.pop("ticks_per_sec")  # wall-clock dependent
+        return merged, summaries
+
+    merged, summaries = run()
+    assert merged["runs"] == 2
+    assert [s["run"] for s in summaries] == [0, 1]
+    assert summaries[0]["seed"] != summaries[1]["seed"]
+    assert run() == (merged, summaries)
+
+if __name__ == "__main__":
+    test_perturb_layout_changes_only_intended_parameters()
+    test_merge_summaries()
+    test_run_ensemble_is_reproducible()
+    print("Ensemble tests passed.")
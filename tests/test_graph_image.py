@@ -0,0 +1,54 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scada_ui.services.layout_service import LayoutService
+from scada_ui.services.graph_image import GraphImageCache
+
+LAYOUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'Process_sim.json')
+
+def test_image_is_rendered_once_per_layout_version():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "layout.json")
+        shutil.copy(LAYOUT_PATH, path)
+        cache = GraphImageCache(LayoutService(path), use_process=False)
+
+        png, etag = cache.get()
+        assert png.startswith(b"\x89PNG")
+        assert etag == cache.layout_service.version
+        for _ in range(5):
+            assert cache.get() == (png, etag)
+        assert cache.renders == 1
+
+        with open(path, "a") as f:
+            f.write("\n")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+        cache.refresh().result()
+        for _ in range(100):
+            if cache.renders == 2:
+                break
+            time.sleep(0.01)
+        new_png, new_etag = cache.get()
+        assert new_etag != etag and cache.renders == 2
+
+def test_render_process_starts_on_first_render():
+    cache = GraphImageCache(LayoutService(LAYOUT_PATH))
+    assert cache._executor is None  # nothing is spawned at import
+    try:
+        png, _ = cache.get()
+        assert png.startswith(b"\x89PNG")
+        executor = cache._executor
+        assert executor is not None
+        assert cache.get()[0] == png and cache._executor is executor
+    finally:
+        cache.close()
+    assert cache._executor is None
+    cache.close()  # closing twice is harmless
+
+if __name__ == "__main__":
+    test_image_is_rendered_once_per_layout_version()
+    test_render_process_starts_on_first_render()
+    print("Graph image cache tests passed.")
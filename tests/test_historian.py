@@ -0,0 +1,53 @@
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scada_ui.services.historian import Historian
+
+def test_range_query_returns_raw_samples():
+    historian = Historian(["tank1", "pump1"], capacity=100)
+    for t in range(10):
+        historian.record(float(t), {"tank1": t * 10, "pump1": "open" if t % 2 else "closed"})
+    result = historian.query(["tank1", "pump1"], start=3, end=5)
+    assert result["t"] == [3.0, 4.0, 5.0]
+    assert result["series"]["tank1"]["mean"] == [30.0, 40.0, 50.0]
+    assert result["series"]["pump1"]["max"] == [1.0, 0.0, 1.0]
+
+def test_ring_overwrites_oldest_samples():
+    historian = Historian(["tank1"], capacity=5)
+    for t in range(12):
+        historian.record(float(t), {"tank1": t})
+    assert len(historian) == 5
+    result = historian.query()
+    assert result["t"] == [7.0, 8.0, 9.0, 10.0, 11.0]
+    assert historian.query(start=9.5)["series"]["tank1"]["mean"] == [10.0, 11.0]
+
+def test_downsampling_keeps_min_max_and_mean():
+    historian = Historian(["tank1", "tank2"], capacity=1000)
+    for t in range(1000):
+        historian.record(float(t), {"tank1": t % 10, "tank2": None if t < 500 else 1})
+    result = historian.query(max_points=10)
+    assert len(result["t"]) == 10 and result["t"][0] == 0.0 and result["t"][1] == 100.0
+    tank1 = result["series"]["tank1"]
+    assert tank1["min"] == [0.0] * 10 and tank1["max"] == [9.0] * 10 and tank1["mean"] == [4.5] * 10
+    # Gaps (NaN) are ignored; buckets without any sample report None
+    assert result["series"]["tank2"]["mean"] == [None] * 5 + [1.0] * 5
+
+def test_large_query_is_fast():
+    historian = Historian([f"tank{i}" for i in range(12)], capacity=86400)
+    values = {f"tank{i}": i for i in range(12)}
+    for t in range(86400 + 1000):
+        historian.record(float(t), values)
+    start = time.perf_counter()
+    result = historian.query(start=1000, end=30000, max_points=500)
+    elapsed = time.perf_counter() - start
+    assert len(result["t"]) == 500
+    assert elapsed < 0.1
+
+if __name__ == "__main__":
+    test_range_query_returns_raw_samples()
+    test_ring_overwrites_oldest_samples()
+    test_downsampling_keeps_min_max_and_mean()
+    test_large_query_is_fast()
+    print("Historian tests passed.")
@@ -0,0 +1,56 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process_sim.layout_generator import generate_layout, layout_stats
+from process_sim.layout_parser import build_graph
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from process_sim.simulation_runner import SimulationThread
+
+def run(layout, vectorized=False):
+    graph = build_graph(layout, vectorized=vectorized, mqtt_factory=OfflineMQTTInterface)
+    sim = SimulationThread(graph, headless=True)
+    return sim, sim.run_headless(ticks=50)
+
+def test_chain_counts():
+    stats = layout_stats(generate_layout(10, "chain", rules_per_pump=4))
+    assert stats["tanks"] == 10 and stats["pumps"] == 9 and stats["splitters"] == 0
+    assert stats["lines"] == 18 and stats["rules"] == 36 and stats["plcs"] == 1
+
+def test_tree_uses_splitters():
+    stats = layout_stats(generate_layout(13, "tree", branching=3))
+    assert stats["pumps"] == 4 and stats["splitters"] == 4
+    assert stats["lines"] == 4 * 2 + 12
+
+def test_recycle_adds_return_pumps():
+    stats = layout_stats(generate_layout(11, "recycle", loop_every=5))
+    assert stats["pumps"] == 10 + 2
+
+def test_plcs_fit_register_banks():
+    layout = generate_layout(500)
+    assert len(layout["plcs"]) == 10
+    for plc in layout["plcs"]:
+        assert max(device["plc_input_register"] for device in plc["devices"]) < 100
+    try:
+        generate_layout(500, plcs=2)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_generated_layouts_run():
+    for topology in ("chain", "tree", "recycle"):
+        for vectorized in (False, True):
+            layout = generate_layout(40, topology, plcs=3)
+            sim, report = run(layout, vectorized)
+            assert report["ticks"] == 50
+            assert len(sim.plcs) == 3
+            # Every generated rule is bound to a device register
+            assert report["rules_evaluated"] == 50 * (layout_stats(layout)["rules"] + 1)  # plus the SCADA overflow rule
+
+if __name__ == "__main__":
+    test_chain_counts()
+    test_tree_uses_splitters()
+    test_recycle_adds_return_pumps()
+    test_plcs_fit_register_banks()
+    test_generated_layouts_run()
+    print("Layout generator tests passed.")
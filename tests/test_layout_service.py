@@ -0,0 +1,53 @@
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scada_ui.services.layout_service import LayoutService
+
+LAYOUT = {
+    "nodes": [
+        {"id": "tank1", "type": "Tank", "name": "Tank 1"},
+        {"id": "pump1", "type": "Pump", "name": "Pump 1", "flow_rate": 10},
+    ],
+    "edges": [],
+}
+
+def test_layout_is_parsed_once_and_reloaded_on_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "layout.json")
+        with open(path, "w") as f:
+            json.dump(LAYOUT, f)
+
+        service = LayoutService(path)
+        first = service.layout()
+        assert list(service.pumps()) == ["pump1"]
+        assert list(service.tanks()) == ["tank1"]
+        assert service.layout() is first
+
+        changed = dict(LAYOUT, nodes=LAYOUT["nodes"] + [{"id": "pump2", "type": "Pump", "name": "Pump 2"}])
+        with open(path, "w") as f:
+            json.dump(changed, f)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+
+        assert service.layout() is not first
+        assert list(service.pumps()) == ["pump1", "pump2"]
+
+def test_touch_without_content_change_keeps_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "layout.json")
+        with open(path, "w") as f:
+            json.dump(LAYOUT, f)
+
+        service = LayoutService(path)
+        first = service.layout()
+        version = service.version
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+        assert service.layout() is first
+        assert service.current_version() == version
+
+if __name__ == "__main__":
+    test_layout_is_parsed_once_and_reloaded_on_change()
+    test_touch_without_content_change_keeps_cache()
+    print("Layout service tests passed.")
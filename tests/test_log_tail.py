@@ -0,0 +1,62 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scada_ui.services.log_tail import read_log_chunk
+
+def offset_of(cursor):
+    return int(cursor.rpartition(":")[2])
+
+def test_only_new_complete_lines_are_returned():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "logs.txt")
+        with open(path, "w") as f:
+            f.write("first\nsecond\npart")
+
+        text, cursor, reset = read_log_chunk(path, "0")
+        assert text == "first\nsecond\n" and not reset
+        assert read_log_chunk(path, cursor) == ("", cursor, False)
+
+        with open(path, "a") as f:
+            f.write("ial\nthird\n")
+        text, cursor, _ = read_log_chunk(path, cursor)
+        assert text == "partial\nthird\n"
+        assert offset_of(cursor) == os.path.getsize(path)
+
+def test_initial_read_is_bounded_and_rotation_resets():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "logs.txt")
+        with open(path, "w") as f:
+            f.writelines(f"line {i}\n" for i in range(1000))
+
+        text, cursor, _ = read_log_chunk(path, None, max_bytes=100)
+        assert text.splitlines()[-1] == "line 999"
+        assert len(text) <= 100 and text.startswith("line ")
+        assert offset_of(cursor) == os.path.getsize(path)
+
+        with open(path, "w") as f:
+            f.write("rotated\n")
+        text, cursor, reset = read_log_chunk(path, cursor)
+        assert reset and text == "rotated\n" and offset_of(cursor) == 8
+
+def test_rotation_to_a_larger_file_resets():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "logs.txt")
+        with open(path, "w") as f:
+            f.write("old\n")
+        _, cursor, _ = read_log_chunk(path, "0")
+
+        # Rotate the way RotatingFileHandler does; the new file is already past the old offset
+        os.rename(path, path + ".1")
+        with open(path, "w") as f:
+            f.write("new 1\nnew 2\n")
+        text, cursor, reset = read_log_chunk(path, cursor)
+        assert reset and text == "new 1\nnew 2\n"
+        assert read_log_chunk(path, cursor) == ("", cursor, False)
+
+if __name__ == "__main__":
+    test_only_new_complete_lines_are_returned()
+    test_initial_read_is_bounded_and_rotation_resets()
+    test_rotation_to_a_larger_file_resets()
+    print("Log tail tests passed.")
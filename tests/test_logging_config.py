@@ -0,0 +1,39 @@
+import sys
+import os
+import logging
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process_sim.logging_config import setup_logging, stop_logging, SamplingFilter
+
+def test_sampling_keeps_one_in_n_per_template():
+    sampler = SamplingFilter({"process_sim.tank": 10})
+    logger = logging.getLogger("process_sim.tank")
+
+    def record(msg, level=logging.INFO, name="process_sim.tank"):
+        return logger.makeRecord(name, level, __file__, 0, msg, ("tank1", 5), None)
+
+    kept = sum(sampler.filter(record("[Tank %s] Transferred %s units")) for _ in range(100))
+    assert kept == 10
+    assert sampler.filter(record("[Tank %s] Overflow detected: %s units lost."))
+    assert all(sampler.filter(record("[Tank %s] %s", logging.WARNING)) for _ in range(5))
+    assert all(sampler.filter(record("[ENGINE] %s %s", name="control_logic.plc")) for _ in range(5))
+
+def test_queued_records_reach_file_with_subsystem_levels():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "logs.txt")
+        setup_logging(log_path=log_path, level="INFO", levels={"process_sim.pump": "WARNING"}, console=False)
+        logging.getLogger("process_sim.tank").info("[Tank %s] Transferred %s units", "tank1", 5)
+        logging.getLogger("process_sim.pump").info("[Pump %s] Published rate", "pump1")
+        stop_logging()
+        logging.getLogger("process_sim.pump").setLevel(logging.NOTSET)
+
+        with open(log_path) as f:
+            contents = f.read()
+        assert "[Tank tank1] Transferred 5 units" in contents
+        assert "pump1" not in contents
+
+if __name__ == "__main__":
+    test_sampling_keeps_one_in_n_per_template()
+    test_queued_records_reach_file_with_subsystem_levels()
+    print("Logging config tests passed.")
@@ -0,0 +1,98 @@
+import sys
+import os
+import socket
+import struct
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from servers.modbus_async_server import AsyncModbusHost
+from process_sim.layout_parser import build_graph
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from process_sim.simulation_runner import SimulationThread
+
+LAYOUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'Process_sim.json')
+
+def request(sock, transaction_id, unit_id, pdu):
+    sock.sendall(struct.pack(">HHHB", transaction_id, 0, len(pdu) + 1, unit_id) + pdu)
+    header = sock.recv(7)
+    length = struct.unpack(">HHHB", header)[2]
+    return sock.recv(length - 1)
+
+def test_shared_port_routes_by_unit_id():
+    host = AsyncModbusHost()
+    plc1 = host.add_endpoint(port=5731, unit_id=1)
+    plc2 = host.add_endpoint(port=5731, unit_id=2)
+    writes = []
+    plc2.set_update_hook(lambda address, value: writes.append((address, value)))
+    host.start()
+    try:
+        plc1.sync_register(0, 11)
+        plc2.sync_register(0, 22)
+        sock = socket.create_connection(("127.0.0.1", 5731))
+
+        assert request(sock, 1, 1, struct.pack(">BHH", 3, 0, 1)) == struct.pack(">BBH", 3, 2, 11)
+        assert request(sock, 2, 2, struct.pack(">BHH", 3, 0, 1)) == struct.pack(">BBH", 3, 2, 22)
+
+        # External write reaches only the addressed bank and fires its hook
+        assert request(sock, 3, 2, struct.pack(">BHH", 6, 4, 1)) == struct.pack(">BHH", 6, 4, 1)
+        assert writes == [(4, 1)]
+        assert plc1.read_register(4) == 0
+
+        # Unknown unit and out-of-range address are answered with exceptions
+        assert request(sock, 4, 9, struct.pack(">BHH", 3, 0, 1)) == bytes([0x83, 0x0B])
+        assert request(sock, 5, 1, struct.pack(">BHH", 3, 99, 5)) == bytes([0x83, 0x02])
+        sock.close()
+    finally:
+        host.stop()
+
+def test_malformed_frames_close_the_connection():
+    host = AsyncModbusHost()
+    host.add_endpoint(port=5733)
+    host.start()
+    try:
+        # Length 0, length 1 (empty PDU) and a foreign protocol ID
+        for protocol_id, length in ((0, 0), (0, 1), (1, 6)):
+            sock = socket.create_connection(("127.0.0.1", 5733))
+            sock.settimeout(5)
+            sock.sendall(struct.pack(">HHHB", 1, protocol_id, length, 1) + struct.pack(">BHH", 3, 0, 1))
+            assert sock.recv(7) == b""
+            sock.close()
+
+        # The host keeps serving well-formed requests
+        sock = socket.create_connection(("127.0.0.1", 5733))
+        assert request(sock, 2, 1, struct.pack(">BHH", 3, 0, 1)) == struct.pack(">BBH", 3, 2, 0)
+        sock.close()
+    finally:
+        host.stop()
+
+def test_sync_register_skips_unchanged_values():
+    host = AsyncModbusHost()
+    bank = host.add_endpoint(port=5732)
+    assert bank.sync_register(3, 7)
+    assert not bank.sync_register(3, 7)
+    assert bank.sync_register(3, 70000) and bank.read_register(3) == 0xFFFF
+
+def test_simulation_stop_closes_the_host():
+    with open(LAYOUT_PATH, 'r') as f:
+        layout = json.load(f)
+    port = layout["plcs"][0]["port"]
+
+    headless = SimulationThread(build_graph(layout, mqtt_factory=OfflineMQTTInterface), headless=True)
+    assert headless.modbus_host is None
+    headless.stop()
+
+    sim = SimulationThread(build_graph(layout, mqtt_factory=OfflineMQTTInterface), modbus_mode="async")
+    socket.create_connection(("127.0.0.1", port)).close()
+    sim.stop()
+    try:
+        socket.create_connection(("127.0.0.1", port)).close()
+    except ConnectionRefusedError:
+        return
+    raise AssertionError("Modbus port still open after stop()")
+
+if __name__ == "__main__":
+    test_shared_port_routes_by_unit_id()
+    test_malformed_frames_close_the_connection()
+    test_sync_register_skips_unchanged_values()
+    test_simulation_stop_closes_the_host()
+    print("Async Modbus host tests passed.")
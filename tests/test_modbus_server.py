@@ -0,0 +1,77 @@
+import sys
+import os
+import json
+import socket
+import struct
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from servers.modbus_server import ModbusServerWrapper
+from control_logic.plc_modbus import ModbusPLC
+from process_sim.layout_parser import build_graph
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+
+LAYOUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'Process_sim.json')
+
+def write_register(port, address, value):
+    # Function 6 (write single register), retried until the server thread is listening
+    for _ in range(50):
+        try:
+            sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+            break
+        except OSError:
+            time.sleep(0.1)
+    with sock:
+        sock.sendall(struct.pack(">HHHBBHH", 1, 0, 6, 1, 6, address, value))
+        return sock.recv(12)
+
+def test_sync_register_skips_unchanged_values():
+    server = ModbusServerWrapper(port=5741)
+    writes = []
+    server.set_update_hook(lambda address, value: writes.append((address, value)))
+    assert server.sync_register(3, 7)
+    assert not server.sync_register(3, 7)
+    assert server.read_register(3) == 7
+    assert writes == []
+
+    server.write_register(3, 8)
+    assert writes == [(3, 8)]
+
+def test_external_write_reaches_mapped_devices():
+    with open(LAYOUT_PATH, 'r') as f:
+        graph = build_graph(json.load(f), mqtt_factory=OfflineMQTTInterface)
+    plc = ModbusPLC({
+        "id": "plc9", "ip": "127.0.0.1", "port": 5742,
+        "devices": [{"id": "pump1", "plc_input_register": 0}, {"id": "pump2", "plc_input_register": 0},
+                    {"id": "tank1", "plc_input_register": 1}],
+        "actions": [],
+    }, graph, OfflineMQTTInterface())
+    pumps = {node_id: node for node_id, node in graph.nodes.items() if hasattr(node, "get_state")}
+    for pump in pumps.values():
+        pump.set_state("closed")
+    volumes = {node_id: node.current_volume for node_id, node in graph.nodes.items()
+               if hasattr(node, "current_volume")}
+
+    assert write_register(5742, 0, 1) == struct.pack(">HHHBBHH", 1, 0, 6, 1, 6, 0, 1)
+    assert {node_id for node_id, pump in pumps.items() if pump.get_state() == "open"} == {"pump1", "pump2"}
+
+    write_register(5742, 1, 123)
+    volumes["tank1"] = 123.0
+    assert {node_id: node.current_volume for node_id, node in graph.nodes.items()
+            if hasattr(node, "current_volume")} == volumes
+
+    # Unmapped addresses touch nothing
+    write_register(5742, 7, 1)
+    assert {node_id for node_id, pump in pumps.items() if pump.get_state() == "open"} == {"pump1", "pump2"}
+
+    # Mirroring the simulation back does not fire the write hook
+    hooked = []
+    plc.modbus.set_update_hook(lambda address, value: hooked.append(address))
+    graph.nodes["tank1"].current_volume = 55.5
+    plc.push_data_to_registers()
+    assert plc.modbus.read_register(1) == 55 and hooked == []
+
+if __name__ == "__main__":
+    test_sync_register_skips_unchanged_values()
+    test_external_write_reaches_mapped_devices()
+    print("Modbus server tests passed.")
@@ -0,0 +1,66 @@
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process_sim.interfaces.mqtt_manager import MQTTConnectionManager
+
+# No broker listens on this port, so the manager's loop thread gives up straight away
+UNUSED_PORT = 1
+
+def offline_manager(rate_limit=None):
+    manager = MQTTConnectionManager(port=UNUSED_PORT, rate_limit=rate_limit)
+    manager._thread.join(timeout=5)
+    return manager
+
+def test_dispatch_fans_out_to_every_handle():
+    manager = offline_manager()
+    received = []
+    manager.interface("plc1").subscribe("pump/pump1/state", lambda m: received.append(("plc1", m)))
+    manager.interface("scada").subscribe("pump/pump1/state", lambda m: received.append(("scada", m)))
+
+    def broken(message):
+        raise RuntimeError("callback failed")
+    manager.interface("plc2").subscribe("tank/tank1/volume", broken)
+    manager.interface("plc3").subscribe("tank/tank1/volume", lambda m: received.append(("plc3", m)))
+
+    assert manager.dispatch("pump/pump1/state", "open")
+    assert received == [("plc1", "open"), ("scada", "open")]
+
+    # A failing callback does not stop delivery to the others
+    assert manager.dispatch("tank/tank1/volume", "42")
+    assert received[-1] == ("plc3", "42")
+    assert not manager.dispatch("tank/tank2/volume", "1")
+
+def test_limiter_is_scoped_per_handle():
+    manager = offline_manager({"algorithm": "token_bucket", "rate": 0.001, "burst": 2})
+    manager._connected = True
+    tank = manager.interface("tank_tank1")
+    pump = manager.interface("pump_pump1")
+    assert [tank.publish(f"tank/tank1/{field}", "1") for field in ("volume", "overflow", "volume")] == \
+        [True, True, False]
+    # Another handle on the same connection still has its own budget
+    assert pump.publish("pump/pump1/state", "open")
+
+def test_shared_limiter_is_thread_safe():
+    manager = offline_manager({"algorithm": "token_bucket", "rate": 0.001, "burst": 500})
+    allowed = []
+
+    def hammer():
+        allowed.append(sum(manager.allow_message("tank/tank1/volume", "tank_tank1") for _ in range(2000)))
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    refill = (time.monotonic() - start) * 0.001
+    assert 500 <= sum(allowed) <= 500 + refill + 1
+
+if __name__ == "__main__":
+    test_dispatch_fans_out_to_every_handle()
+    test_limiter_is_scoped_per_handle()
+    test_shared_limiter_is_thread_safe()
+    print("MQTT connection manager tests passed.")
@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from defences.rate_limiter import RateLimiter, TokenBucket, KeyedRateLimiter, build_rate_limiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_sliding_window():
+    clock = FakeClock()
+    limiter = RateLimiter(max_messages_per_second=3, clock=clock)
+    assert [limiter.allow_message() for _ in range(4)] == [True, True, True, False]
+    clock.now = 0.99
+    assert not limiter.allow_message()
+    clock.now = 1.0
+    assert [limiter.allow_message() for _ in range(4)] == [True, True, True, False]
+
+def test_token_bucket_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=4, clock=clock)
+    assert sum(bucket.allow_message() for _ in range(10)) == 4
+    clock.now = 1.0
+    assert sum(bucket.allow_message() for _ in range(10)) == 2
+    clock.now = 100.0
+    assert sum(bucket.allow_message() for _ in range(10)) == 4
+
+def test_chatty_topic_does_not_starve_others():
+    clock = FakeClock()
+    limiter = build_rate_limiter({"rate": 2, "scope": "topic"}, clock=clock)
+    assert isinstance(limiter, KeyedRateLimiter)
+    for _ in range(50):
+        limiter.allow_message("tank/tank1/volume", "tank_tank1")
+    assert limiter.allow_message("pump/pump1/state", "pump_pump1")
+
+def test_client_scope_shares_bucket_across_topics():
+    clock = FakeClock()
+    limiter = build_rate_limiter({"algorithm": "token_bucket", "rate": 2, "scope": "client"}, clock=clock)
+    assert limiter.allow_message("a", "c1")
+    assert limiter.allow_message("b", "c1")
+    assert not limiter.allow_message("c", "c1")
+    assert limiter.allow_message("a", "c2")
+
+if __name__ == "__main__":
+    test_sliding_window()
+    test_token_bucket_refills()
+    test_chatty_topic_does_not_starve_others()
+    test_client_scope_shares_bucket_across_topics()
+    print("Rate limiter tests passed.")
@@ -0,0 +1,105 @@
+import sys
+import os
+import asyncio
+import socket
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gmqtt import Client as MQTTClient
+from mqttools.broker import Broker
+from attacks.replay_engine import ReplayEngine, parse_speed, format_report
+from process_sim.interfaces.write_buffer import MAX_BUFFERED_BYTES, disconnect
+
+def make_messages(count, spacing):
+    return [{"timestamp": 1000.0 + i * spacing, "topic": f"tank/tank{i % 3}/volume", "payload": str(i)}
+            for i in range(count)]
+
+def test_time_scaled_replay_keeps_order_and_timing():
+    published = []
+    engine = ReplayEngine(lambda topic, payload: published.append(payload), speed=100)
+    # 200 messages captured over 10 s, replayed in 0.1 s
+    report = asyncio.run(engine.run(make_messages(201, 0.05)))
+    assert published == [str(i) for i in range(201)]
+    assert report["messages"] == 201
+    assert abs(report["intended_duration"] - 0.1) < 1e-9
+    assert 0.09 < report["actual_duration"] < 0.5
+    assert report["error_p50_ms"] < 20
+
+def test_max_rate_replay_batches_without_timing():
+    published = []
+    engine = ReplayEngine(lambda topic, payload: published.append(topic), speed="max", max_batch=500)
+    report = asyncio.run(engine.run(make_messages(10000, 1.0)))
+    assert len(published) == 10000 and report["batches"] == 20
+    assert report["error_mean_ms"] is None
+    assert "at max" in format_report(report)
+
+def test_speed_limits():
+    assert parse_speed("max") is None and parse_speed("0.1") == 0.1 and parse_speed(1000) == 1000.0
+    for bad in ("0.05", "2000"):
+        try:
+            parse_speed(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"speed {bad} accepted")
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def replay_against(messages, stall=False):
+    port = free_port()
+
+    async def run():
+        done = asyncio.Event()
+
+        async def stalled(reader, writer):
+            # Accept the connection (MQTT 5 CONNACK), then never read another byte
+            await reader.read(1024)
+            writer.write(bytes([0x20, 0x03, 0x00, 0x00, 0x00]))
+            await done.wait()
+            writer.close()
+
+        if stall:
+            server = await asyncio.start_server(stalled, "127.0.0.1", port)
+        else:
+            server = asyncio.create_task(Broker(("127.0.0.1", port)).serve_forever())
+            await asyncio.sleep(0.1)
+        client = MQTTClient("replay_test")
+        await client.connect("127.0.0.1", port)
+        try:
+            return await ReplayEngine(client.publish, speed="max", client=client).run(messages)
+        finally:
+            await disconnect(client)
+            done.set()
+            if stall:
+                server.close()
+            else:
+                server.cancel()
+
+    return asyncio.run(run())
+
+def test_max_rate_replay_drains_the_transport():
+    messages = [{"timestamp": 1000.0, "topic": "tank/tank1/volume", "payload": "x" * 256}] * 20000
+    report = replay_against(messages)
+    assert report["messages"] == 20000 and report["unsent_bytes"] == 0
+
+def test_stalled_broker_stops_the_replay():
+    messages = [{"timestamp": 1000.0, "topic": "tank/tank1/volume", "payload": "x" * 1024}] * 200000
+    report = replay_against(messages, stall=True)
+    # Only the kernel socket buffers and one batch over the cap are ever queued
+    assert report["messages"] < 100000
+    assert MAX_BUFFERED_BYTES < report["unsent_bytes"] <= MAX_BUFFERED_BYTES + 500 * 1100
+    assert "never left the buffer" in format_report(report)
+
+def test_empty_capture():
+    report = asyncio.run(ReplayEngine(lambda topic, payload: None).run([]))
+    assert report["messages"] == 0 and report["rate"] == 0.0
+
+if __name__ == "__main__":
+    test_time_scaled_replay_keeps_order_and_timing()
+    test_max_rate_replay_batches_without_timing()
+    test_speed_limits()
+    test_max_rate_replay_drains_the_transport()
+    test_stalled_broker_stops_the_replay()
+    test_empty_capture()
+    print("Replay engine tests passed.")
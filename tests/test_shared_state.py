@@ -0,0 +1,101 @@
+import sys
+import os
+import json
+import logging
+import multiprocessing
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process_sim.layout_parser import build_graph
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from process_sim.shared_state import SharedStateWriter, SharedStateReader, ENV_VAR
+
+LAYOUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'Process_sim.json')
+
+def load_graph():
+    with open(LAYOUT_PATH, 'r') as f:
+        layout = json.load(f)
+    return build_graph(layout, mqtt_factory=OfflineMQTTInterface)
+
+def read_in_child(name, results):
+    reader = SharedStateReader(name)
+    results.put(reader.read())
+    reader.close()
+
+def test_reader_sees_written_tick():
+    graph = load_graph()
+    writer = SharedStateWriter(graph, name=f"securesim_test_{os.getpid()}")
+    try:
+        graph.nodes["tank2"].current_volume = 123.5
+        graph.nodes["pump1"].set_state("closed")
+        writer.write(tick=7, sim_time=7.0)
+
+        reader = SharedStateReader(writer.name)
+        snapshot = reader.read()
+        assert snapshot["tick"] == 7 and snapshot["sim_time"] == 7.0
+        assert snapshot["values"]["tank2"]["volume"] == 123.5
+        assert snapshot["values"]["pump1"]["state"] == "closed"
+        reader.close()
+
+        # Another process reads the same segment
+        results = multiprocessing.Queue()
+        child = multiprocessing.Process(target=read_in_child, args=(writer.name, results))
+        child.start()
+        child_snapshot = results.get(timeout=10)
+        child.join()
+        assert child_snapshot["values"] == snapshot["values"]
+    finally:
+        writer.close()
+
+class FlakyReader:
+    """Times out like a reader racing a busy writer, then reads normally."""
+
+    def __init__(self, reader, timeouts):
+        self.reader = reader
+        self.timeouts = timeouts
+        self.reads = 0
+
+    def read(self):
+        if self.timeouts:
+            self.timeouts -= 1
+            raise TimeoutError("Shared state kept changing while being read")
+        self.reads += 1
+        return self.reader.read()
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+def test_dashboard_poll_survives_read_timeout():
+    graph = load_graph()
+    writer = SharedStateWriter(graph, name=f"securesim_test_poll_{os.getpid()}")
+    graph.nodes["tank2"].current_volume = 321.5
+    writer.write(tick=1, sim_time=1.0)
+    os.environ[ENV_VAR] = writer.name  # the dashboard state attaches to the segment at import
+    from scada_ui.services import graph_state
+    handler = ListHandler()
+    graph_state.logger.addHandler(handler)
+    try:
+
+        reader = FlakyReader(SharedStateReader(writer.name), timeouts=3)
+        threading.Thread(target=graph_state.poll_shared_state, args=(reader, 0.01), daemon=True).start()
+        deadline = time.time() + 10
+        while reader.reads < 2:
+            assert time.time() < deadline, "poll thread stopped after a read timeout"
+            time.sleep(0.01)
+        assert graph_state.latest_values["tank/tank2/volume"] == 321.5
+        assert len([r for r in handler.records if r.levelno == logging.WARNING]) == 3
+    finally:
+        graph_state.logger.removeHandler(handler)
+        os.environ.pop(ENV_VAR, None)
+        writer.close()
+
+if __name__ == "__main__":
+    test_reader_sees_written_tick()
+    test_dashboard_poll_survives_read_timeout()
+    print("Shared state tests passed.")
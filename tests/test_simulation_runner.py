@@ -0,0 +1,78 @@
+import sys
+import os
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process_sim.layout_parser import build_graph
+from process_sim.simulation_runner import SimulationThread
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from process_sim.tick_metrics import TickMetrics
+
+LAYOUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'Process_sim.json')
+
+def make_sim(interval=1.0, **kwargs):
+    with open(LAYOUT_PATH, 'r') as f:
+        layout = json.load(f)
+    graph = build_graph(layout, mqtt_factory=OfflineMQTTInterface)
+    return SimulationThread(graph, interval=interval, headless=True, **kwargs)
+
+def volumes(sim):
+    return {node_id: node.current_volume for node_id, node in sim.graph.nodes.items()
+            if hasattr(node, "current_volume")}
+
+def test_step_advances_the_simulated_clock():
+    sim = make_sim(interval=0.5)
+    for _ in range(3):
+        sim.step()
+    assert sim.ticks == 3
+    assert sim.sim_time == 1.5
+
+def test_run_headless_stops_at_the_first_limit():
+    assert make_sim().run_headless(ticks=40)["ticks"] == 40
+    assert make_sim(interval=0.5).run_headless(duration=30)["ticks"] == 60
+    assert make_sim().run_headless(ticks=25, duration=100)["ticks"] == 25
+    assert make_sim().run_headless(ticks=100, duration=25)["ticks"] == 25
+
+def test_run_headless_needs_a_limit():
+    sim = make_sim()
+    try:
+        sim.run_headless()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("run_headless() without ticks or duration should fail")
+    assert sim.ticks == 0
+
+def test_run_headless_report():
+    sim = make_sim(interval=2.0, metrics=TickMetrics())
+    report = sim.run_headless(ticks=50)
+    assert report["ticks"] == 50
+    assert report["sim_seconds"] == 100.0
+    assert report["wall_seconds"] > 0
+    assert report["ticks_per_sec"] == report["ticks"] / report["wall_seconds"]
+    assert report["rules_evaluated"] > 0 and report["rules_skipped"] >= 0
+    assert {k: report[k] for k in ("rules_evaluated", "rules_skipped")} == sim.scan_stats()
+    assert report["metrics"]["ticks"] == 50
+    assert not sim.running
+
+    # A second run continues from where the first stopped and only reports its own ticks
+    report = sim.run_headless(duration=20)
+    assert report["ticks"] == 10 and report["sim_seconds"] == 20.0
+    assert sim.ticks == 60 and sim.sim_time == 120.0
+
+def test_run_headless_matches_stepping():
+    stepped = make_sim()
+    for _ in range(200):
+        stepped.step()
+    run = make_sim()
+    run.run_headless(ticks=200)
+    assert volumes(run) == volumes(stepped)
+    assert run.scan_stats() == stepped.scan_stats()
+
+if __name__ == "__main__":
+    test_step_advances_the_simulated_clock()
+    test_run_headless_stops_at_the_first_limit()
+    test_run_headless_needs_a_limit()
+    test_run_headless_report()
+    test_run_headless_matches_stepping()
+    print("Simulation runner tests passed.")
@@ -0,0 +1,33 @@
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scada_ui.services.state_broadcaster import StateBroadcaster
+
+def test_changes_are_coalesced_and_shared_by_all_clients():
+    broadcaster = StateBroadcaster(interval=0.05)
+    clients = [broadcaster.subscribe() for _ in range(3)]
+    broadcaster.update("tank1", "volume", 10)
+    broadcaster.update("tank1", "volume", 12)
+    broadcaster.update("pump1", "state", "open")
+
+    events = [client.get(timeout=1) for client in clients]
+    assert events[0] == b'event: delta\ndata: {"tank1":{"volume":12},"pump1":{"state":"open"}}\n\n'
+    assert events[1] is events[0] and events[2] is events[0]
+
+def test_slow_client_is_dropped():
+    broadcaster = StateBroadcaster(interval=0, max_backlog=2)
+    slow = broadcaster.subscribe()
+    for i in range(5):
+        broadcaster.update("tank1", "volume", i)
+        time.sleep(0.05)
+
+    received = [slow.get_nowait() for _ in range(slow.qsize())]
+    assert received[-1] is None
+    assert slow not in broadcaster._clients
+
+if __name__ == "__main__":
+    test_changes_are_coalesced_and_shared_by_all_clients()
+    test_slow_client_is_dropped()
+    print("State broadcaster tests passed.")
@@ -0,0 +1,117 @@
+import sys
+import os
+import json
+import logging
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process_sim.layout_parser import build_graph
+
+LAYOUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'Process_sim.json')
+
+class RecordingMQTT:
+    """Records published messages; `online = False` makes every publish fail like a dropped message."""
+    sent = []
+    online = True
+
+    def __init__(self, client_id=None):
+        self.client_id = client_id
+
+    def publish(self, topic, message, qos=0, retain=False):
+        if not RecordingMQTT.online:
+            return False
+        RecordingMQTT.sent.append((topic, message))
+        return True
+
+    def subscribe(self, topic, callback):
+        pass
+
+def load_graph(telemetry):
+    with open(LAYOUT_PATH, 'r') as f:
+        layout = json.load(f)
+    layout["telemetry"] = telemetry
+    RecordingMQTT.sent = []
+    RecordingMQTT.online = True
+    return build_graph(layout, mqtt_factory=RecordingMQTT)
+
+def published(topic):
+    return [message for t, message in RecordingMQTT.sent if t == topic]
+
+def test_deadband_suppresses_small_changes():
+    graph = load_graph({"deadband": {"tank/*/volume": 5}, "snapshot_topic": None})
+    tank = graph.nodes["tank1"]
+    tank.current_volume = 100
+    graph.publish()
+    for volume in (103, 104.9, 106):
+        tank.current_volume = volume
+        graph.publish()
+    # 103 and 104.9 are within 5 of the last sent 100; 106 is not
+    assert published("tank/tank1/volume") == [100, 106]
+    assert graph.telemetry.suppressed > 0
+
+def test_non_numeric_values_publish_on_change():
+    graph = load_graph({"default_deadband": 1000, "snapshot_topic": None})
+    pump = graph.nodes["pump1"]
+    pump.is_open = True
+    graph.publish()
+    graph.publish()
+    pump.is_open = False
+    graph.publish()
+    assert published("pump/pump1/state") == ["open", "closed"]
+
+def test_snapshot_has_every_component():
+    graph = load_graph({"snapshot_topic": "sim/snapshot"})
+    graph.nodes["tank2"].current_volume = 42
+    graph.publish()
+    graph.publish()
+    snapshots = published("sim/snapshot")
+    assert len(snapshots) == 2
+    snapshot = json.loads(snapshots[-1])
+    assert snapshot["tank2"]["volume"] == 42
+    assert snapshot["pump1"]["state"] in ("open", "closed")
+
+def test_failed_publish_is_retried():
+    graph = load_graph({"deadband": {"tank/*/volume": 5}, "snapshot_topic": None})
+    tank = graph.nodes["tank1"]
+    tank.current_volume = 100
+    graph.publish()
+    telemetry = graph.telemetry
+    published_before = telemetry.published
+
+    # Dropped (rate limited or offline): not counted, not remembered as sent
+    RecordingMQTT.online = False
+    tank.current_volume = 200
+    graph.publish()
+    assert telemetry.published == published_before and telemetry.failed > 0
+
+    # The unchanged value goes out once the interface accepts it again
+    RecordingMQTT.online = True
+    graph.publish()
+    assert published("tank/tank1/volume") == [100, 200]
+
+def test_publish_errors_are_logged():
+    graph = load_graph({"snapshot_topic": None})
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("process_sim.telemetry")
+    logger.addHandler(handler)
+
+    def broken(topic, message, qos=0, retain=False):
+        raise ConnectionError("broker gone")
+
+    try:
+        graph.nodes["tank1"].mqtt.publish = broken
+        graph.publish()
+    finally:
+        logger.removeHandler(handler)
+    errors = [r for r in records if r.levelno == logging.ERROR]
+    assert errors and errors[0].args[0].startswith("tank/tank1/") and errors[0].exc_info
+    assert graph.telemetry.failed >= len(errors)
+
+if __name__ == "__main__":
+    test_deadband_suppresses_small_changes()
+    test_non_numeric_values_publish_on_change()
+    test_snapshot_has_every_component()
+    test_failed_publish_is_retried()
+    test_publish_errors_are_logged()
+    print("Telemetry tests passed.")
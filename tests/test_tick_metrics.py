@@ -0,0 +1,96 @@
+import sys
+import os
+import json
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process_sim.layout_parser import build_graph
+from process_sim.interfaces.mqtt_interface import OfflineMQTTInterface
+from process_sim.shared_state import SharedStateWriter, SharedStateReader
+from process_sim.simulation_runner import SimulationThread
+from process_sim.tick_metrics import TickMetrics, format_summary
+
+LAYOUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'Process_sim.json')
+
+def load_graph():
+    with open(LAYOUT_PATH, 'r') as f:
+        layout = json.load(f)
+    return build_graph(layout, mqtt_factory=OfflineMQTTInterface)
+
+def samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+def test_histograms_and_counters():
+    metrics = TickMetrics()
+    metrics.observe((0.0003, 0.00001, 0.002, 0.001, 0.0))
+    metrics.observe((0.0003, 0.00001, 0.02, 0.001, 0.0))
+    metrics.observe_schedule(elapsed=1.5, lag=0.0, interval=1.0)
+    metrics.observe_schedule(elapsed=0.1, lag=0.5, interval=1.0)
+
+    values = samples(metrics.to_prometheus())
+    assert values['securesim_tick_phase_seconds_bucket{phase="update",le="0.0025"}'] == "1"
+    assert values['securesim_tick_phase_seconds_bucket{phase="update",le="0.025"}'] == "2"
+    assert values['securesim_tick_phase_seconds_bucket{phase="update",le="+Inf"}'] == "2"
+    assert values['securesim_tick_phase_seconds_count{phase="plcs"}'] == "2"
+    assert abs(float(values['securesim_tick_phase_seconds_sum{phase="update"}']) - 0.022) < 1e-12
+    assert values["securesim_tick_seconds_count"] == "2"
+    assert values["securesim_ticks_total"] == "2"
+    assert values["securesim_tick_overruns_total"] == "1"
+    assert values["securesim_late_ticks_total"] == "1"
+    assert values["securesim_tick_lag_seconds"] == "0.5"
+
+def test_summary_covers_ticks_since_last_call():
+    metrics = TickMetrics()
+    for _ in range(10):
+        metrics.observe((0.001, 0.0, 0.002, 0.0, 0.0))
+    summary = metrics.summary()
+    assert summary["ticks"] == 10
+    assert abs(summary["phase_mean_ms"]["update"] - 2.0) < 1e-9
+    assert summary["tick_p99_ms"] == 5.0
+    assert "10 ticks" in format_summary(summary)
+    assert metrics.summary()["ticks"] == 0
+
+def test_loop_counts_overruns():
+    graph = load_graph()
+    metrics = TickMetrics()
+    sim = SimulationThread(graph, interval=0.01, headless=True, metrics=metrics, metrics_log_interval=0)
+    slow_update = graph.update
+    graph.update = lambda: (slow_update(), time.sleep(0.02))
+    sim.start()
+    time.sleep(0.3)
+    sim.stop()
+    sim.join()
+
+    values = samples(metrics.to_prometheus())
+    ticks = int(values["securesim_ticks_total"])
+    assert ticks > 3
+    assert int(values["securesim_tick_overruns_total"]) == ticks
+    assert float(values['securesim_tick_phase_seconds_sum{phase="update"}']) >= 0.02 * ticks
+
+def test_metrics_shared_with_reader():
+    graph = load_graph()
+    writer = SharedStateWriter(graph, name=f"securesim_metrics_test_{os.getpid()}", metrics=True)
+    try:
+        sim = SimulationThread(graph, headless=True, shared_state=writer, metrics=writer.metrics)
+        sim.run_headless(ticks=25)
+        reader = SharedStateReader(writer.name)
+        assert samples(reader.metrics().to_prometheus())["securesim_ticks_total"] == "25"
+        assert reader.read()["tick"] == 25
+        reader.close()
+    finally:
+        writer.close()
+
+    plain = SharedStateWriter(graph, name=f"securesim_plain_test_{os.getpid()}")
+    try:
+        reader = SharedStateReader(plain.name)
+        assert plain.metrics is None and reader.metrics() is None
+        reader.close()
+    finally:
+        plain.close()
+
+if __name__ == "__main__":
+    test_histograms_and_counters()
+    test_summary_covers_ticks_since_last_call()
+    test_loop_counts_overruns()
+    test_metrics_shared_with_reader()
+    print("Tick metrics tests passed.")
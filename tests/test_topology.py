@@ -0,0 +1,29 @@
+import sys
+import os
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scada_ui.services.topology import build_topology
+
+LAYOUT_PATH = os.path.join(os.path.dirname(__file__), '..', 'Process_sim.json')
+
+def test_layout_positions_are_kept():
+    with open(LAYOUT_PATH, 'r') as f:
+        layout = json.load(f)
+    topology = build_topology(layout)
+    tank1 = next(node for node in topology["nodes"] if node["id"] == "tank1")
+    assert (tank1["x"], tank1["y"]) == tuple(layout["nodes"][0]["position"])
+    assert len(topology["edges"]) == len(layout["edges"])
+
+def test_large_layout_without_positions_is_layered():
+    nodes = [{"id": f"n{i}", "type": "Tank", "name": f"N{i}"} for i in range(1000)]
+    edges = [{"id": f"e{i}", "source": f"n{i}", "target": f"n{i + 1}"} for i in range(999)]
+    edges.append({"id": "loop", "source": "n500", "target": "n10"})
+    topology = build_topology({"nodes": nodes, "edges": edges})
+    xs = {node["id"]: node["x"] for node in topology["nodes"]}
+    assert xs["n0"] == 0 and xs["n999"] == 999
+
+if __name__ == "__main__":
+    test_layout_positions_are_kept()
+    test_large_layout_without_positions_is_layered()
+    print("Topology tests passed.")